@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+Benchmark vectorized batch ATS scoring (ATSScorer.score_many) against scoring
+each job posting with ATSScorer.score in a loop.
+
+Usage (from the server directory):
+    python benchmarks/bench_batch_scoring.py [--jobs 1000] [--repeat 3]
+"""
+import os
+import sys
+import glob
+import time
+import random
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.pdf_parser import resume_parser
+from utils.ats_engine import ats_scorer
+from utils.skills_taxonomy import skills_taxonomy
+
+FILLER = (
+    "we are seeking a motivated professional to join our growing team you will collaborate with "
+    "stakeholders deliver projects support customers improve processes report results and mentor "
+    "colleagues in a fast paced environment with competitive benefits"
+).split()
+
+TITLES = ["Software Engineer", "Registered Nurse", "Mechanical Engineer", "Data Analyst", "Project Manager"]
+
+def synthetic_job(rng, skills):
+    lines = [rng.choice(TITLES)]
+    for _ in range(rng.randint(10, 25)):
+        words = [rng.choice(FILLER) for _ in range(rng.randint(8, 16))]
+        for _ in range(rng.randint(0, 2)):
+            words.insert(rng.randint(0, len(words)), rng.choice(skills))
+        lines.append(" ".join(words) + ".")
+    return "\n".join(lines)
+
+def load_resume():
+    pdf_dir = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "server", "resumes")
+    for path in sorted(glob.glob(os.path.join(pdf_dir, "*.pdf"))):
+        with open(path, "rb") as f:
+            result = resume_parser.parse_resume(f.read())
+        if result.get("parsed_successfully"):
+            return os.path.basename(path), result
+    text = "Experience\nBuilt python and sql services\nSkills\npython, sql, docker, aws"
+    return "synthetic", resume_parser.parse_pages([text])
+
+def best_of(repeat, fn):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        timings.append(time.perf_counter() - start)
+    return min(timings), result
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--jobs", type=int, default=1000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    rng = random.Random(42)
+    skills = list(skills_taxonomy.names)
+    jobs = [synthetic_job(rng, skills) for _ in range(args.jobs)]
+    name, resume = load_resume()
+    print(f"Resume: {name}, {len(resume['keywords'])} skills; {len(jobs)} job postings\n")
+
+    loop_time, looped = best_of(args.repeat, lambda: [ats_scorer.score(resume, job) for job in jobs])
+    batch_time, batched = best_of(args.repeat, lambda: ats_scorer.score_many(resume, jobs))
+
+    print(f"  {'score() per posting':<24} {loop_time * 1000:9.1f} ms total  {loop_time / len(jobs) * 1e6:9.1f} us/posting")
+    print(f"  {'score_many()':<24} {batch_time * 1000:9.1f} ms total  {batch_time / len(jobs) * 1e6:9.1f} us/posting")
+    print(f"  speedup: {loop_time / batch_time:.1f}x")
+
+    mismatches = sum(
+        1 for single, batch in zip(looped, batched)
+        if single['match_percentage'] != batch['match_percentage']
+    )
+    print(f"  match_percentage mismatches: {mismatches}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+"""
+Benchmark ResumeParser's matchers against the original substring scans:
+the precompiled header regex for section headers and the Aho–Corasick
+automaton for skill keywords.
+
+Usage (from the server directory):
+    python benchmarks/bench_keyword_matcher.py [--resumes 200] [--sizes 40,1000,5000]
+"""
+import os
+import sys
+import glob
+import time
+import random
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.pdf_parser import resume_parser
+from utils.text_matcher import KeywordAutomaton
+from utils.skills_taxonomy import SkillsTaxonomy, skills_taxonomy
+
+HEADERS = {
+    'experience': ['experience', 'work history', 'employment', 'work experience', 'professional experience'],
+    'education': ['education', 'academic', 'degree', 'university', 'college', 'school'],
+    'skills': ['skills', 'competencies', 'technologies', 'technical skills', 'programming languages']
+}
+
+FILLER = (
+    "led delivered built designed improved managed team project customers reports "
+    "systems quality process patients safety budget stakeholders training results"
+).split()
+
+def legacy_keywords(text, keywords):
+    """Original implementation: one substring scan of the whole text per keyword."""
+    text_lower = text.lower()
+    return {keyword for keyword in keywords if keyword in text_lower}
+
+def legacy_header(line):
+    """Original implementation: rebuild the phrase lists and scan them for every line."""
+    if any(keyword in line for keyword in ['experience', 'work history', 'employment', 'work experience', 'professional experience']):
+        return 'experience'
+    elif any(keyword in line for keyword in ['education', 'academic', 'degree', 'university', 'college', 'school']):
+        return 'education'
+    elif any(keyword in line for keyword in ['skills', 'competencies', 'technologies', 'technical skills', 'programming languages']):
+        return 'skills'
+    return None
+
+def synthetic_taxonomy(size, base):
+    """Pad the shipped skills with made-up multi-word skills up to ``size`` entries."""
+    rng = random.Random(size)
+    skills = list(base)
+    while len(skills) < size:
+        skills.append(" ".join(rng.choice(FILLER) + str(rng.randint(0, 999)) for _ in range(rng.randint(1, 3))))
+    return skills[:size]
+
+def synthetic_resume(rng, skills):
+    lines = []
+    for section in ("Professional Experience", "Education", "Technical Skills"):
+        lines.append(section)
+        for _ in range(rng.randint(8, 20)):
+            words = [rng.choice(FILLER) for _ in range(rng.randint(6, 14))]
+            words.insert(rng.randint(0, len(words)), rng.choice(skills))
+            lines.append(" ".join(words))
+    return "\n".join(lines)
+
+def load_corpus(count, skills):
+    corpus = []
+    pdf_dir = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "server", "resumes")
+    for path in glob.glob(os.path.join(pdf_dir, "*.pdf")):
+        with open(path, "rb") as f:
+            result = resume_parser.parse_resume(f.read())
+        if result.get("parsed_successfully"):
+            corpus.append(result["full_text"])
+    rng = random.Random(42)
+    while len(corpus) < count:
+        corpus.append(synthetic_resume(rng, skills))
+    return corpus
+
+def bench(label, fn, corpus, unit="resume"):
+    start = time.perf_counter()
+    for text in corpus:
+        fn(text)
+    elapsed = time.perf_counter() - start
+    print(f"  {label:<28} {elapsed * 1000:9.1f} ms total  {elapsed / len(corpus) * 1e6:9.1f} us/{unit}")
+    return elapsed
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--resumes", type=int, default=200)
+    parser.add_argument("--sizes", default="40,1000,5000")
+    parser.add_argument("--taxonomy-size", type=int, default=10000)
+    args = parser.parse_args()
+
+    base = list(skills_taxonomy.names)
+    sizes = [int(size) for size in args.sizes.split(",")]
+    corpus = load_corpus(args.resumes, base)
+    total_chars = sum(len(text) for text in corpus)
+    print(f"Corpus: {len(corpus)} resumes, {total_chars / len(corpus):.0f} chars on average\n")
+
+    print("Section headers (per line)")
+    header_matcher = KeywordAutomaton((h, s) for s, headers in HEADERS.items() for h in headers)
+    lines = [line.strip().lower() for text in corpus for line in text.split("\n") if line.strip()]
+    bench("substring scan", legacy_header, lines, unit="line")
+    bench("automaton", header_matcher.find_all, lines, unit="line")
+    bench("regex (ResumeParser)", resume_parser._identify_section_header, lines, unit="line")
+
+    for size in sizes:
+        skills = synthetic_taxonomy(size, base)
+        start = time.perf_counter()
+        matcher = KeywordAutomaton((skill, skill) for skill in skills)
+        build_ms = (time.perf_counter() - start) * 1000
+        print(f"\nKeywords, taxonomy of {size} skills (automaton built in {build_ms:.1f} ms)")
+        legacy = bench("substring scan", lambda text: legacy_keywords(text, skills), corpus)
+        current = bench("automaton", lambda text: matcher.find_all(text.lower()), corpus)
+        print(f"  speedup: {legacy / current:.1f}x")
+
+    # Full taxonomy path: synonyms, case-sensitive abbreviations and canonical names
+    skills = synthetic_taxonomy(args.taxonomy_size, base)
+    start = time.perf_counter()
+    taxonomy = SkillsTaxonomy([("bench", {"version": "bench", "skills": [
+        {"name": skill, "synonyms": [skill + " skills"], "abbreviations": [f"X{index}"]}
+        for index, skill in enumerate(skills)
+    ]})])
+    build_ms = (time.perf_counter() - start) * 1000
+    print(f"\nSkillsTaxonomy.extract, {len(taxonomy)} skills (loaded in {build_ms:.1f} ms)")
+    bench("extract", taxonomy.extract, corpus)
+
+if __name__ == "__main__":
+    main()
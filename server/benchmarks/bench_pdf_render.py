@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+Benchmark in-memory PDF rendering: documents per second in-process and on
+the render worker pool (one job per document, and batched with
+render_documents), normalized per core.
+
+Usage (from the server directory):
+    python benchmarks/bench_pdf_render.py [--documents 200] [--workers 1,2,4] [--batch 25]
+"""
+import os
+import sys
+import time
+import random
+import asyncio
+import hashlib
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.pdf_editor import render_document, render_documents
+from utils.worker_pool import ProcessWorkerPool
+
+WORDS = (
+    "delivered improved managed patients safety budget stakeholders training results "
+    "quality process systems customers reports project team designed built led"
+).split()
+
+def synthetic_document(rng, document_type):
+    if document_type == "cover_letter":
+        paragraphs = [" ".join(rng.choice(WORDS) for _ in range(rng.randint(50, 90))) for _ in range(5)]
+        return "Dear Hiring Manager,\n\n" + "\n\n".join(paragraphs) + "\n\nSincerely,\nAlex Doe"
+    lines = []
+    for section in ("SUMMARY", "SKILLS", "EXPERIENCE", "EDUCATION"):
+        lines.append(section)
+        lines.extend(" ".join(rng.choice(WORDS) for _ in range(rng.randint(8, 18))) for _ in range(rng.randint(3, 8)))
+    return "\n".join(lines)
+
+async def run_pool(workers, jobs, batch=1):
+    pool = ProcessWorkerPool("bench_render", max_workers=workers, max_queue=len(jobs), timeout=60, warmup_modules=("utils.pdf_editor",))
+    await pool.start()
+    try:
+        start = time.perf_counter()
+        if batch > 1:
+            batches = [jobs[index:index + batch] for index in range(0, len(jobs), batch)]
+            await asyncio.gather(*[pool.run(render_documents, chunk) for chunk in batches])
+        else:
+            await asyncio.gather(*[pool.run(render_document, *job) for job in jobs])
+        return time.perf_counter() - start
+    finally:
+        pool.shutdown()
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--documents", type=int, default=200)
+    parser.add_argument("--workers", default="1,2,4")
+    parser.add_argument("--batch", type=int, default=25, help="documents per render_documents call")
+    args = parser.parse_args()
+
+    rng = random.Random(42)
+    jobs = []
+    for index in range(args.documents):
+        document_type = "cover_letter" if index % 2 == 0 else "resume"
+        jobs.append((document_type, synthetic_document(rng, document_type), "Alex Doe"))
+
+    print(f"{args.documents} documents (half cover letters, half resumes), {os.cpu_count()} CPU(s)\n")
+
+    # Identical input must give identical bytes for content-hash storage to deduplicate
+    first = hashlib.sha256(render_document(*jobs[0])).hexdigest()
+    second = hashlib.sha256(render_document(*jobs[0])).hexdigest()
+    print(f"  deterministic output: {first == second}")
+
+    start = time.perf_counter()
+    total_bytes = sum(len(render_document(*job)) for job in jobs)
+    elapsed = time.perf_counter() - start
+    print(f"  {'in-process':<14} {args.documents / elapsed:8.1f} docs/s  {args.documents / elapsed:8.1f} docs/s/core  "
+          f"{total_bytes / args.documents / 1024:.1f} KiB/doc")
+
+    for workers in [int(value) for value in args.workers.split(",")]:
+        for batch in (1, args.batch):
+            elapsed = asyncio.run(run_pool(workers, jobs, batch))
+            rate = args.documents / elapsed
+            label = f"pool x{workers}" + (f" /{batch}" if batch > 1 else "")
+            print(f"  {label:<14} {rate:8.1f} docs/s  {rate / min(workers, os.cpu_count() or 1):8.1f} docs/s/core")
+
+if __name__ == "__main__":
+    main()
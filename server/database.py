@@ -5,6 +5,14 @@ from fastapi import Request
 from typing import Optional
 from dotenv import load_dotenv
 
+from utils.ats_results import ats_result_store
+from utils.llm_cache import llm_cache
+from utils.parse_cache import parse_cache
+from utils.blob_store import blob_store
+from utils.job_queue import document_jobs
+from utils.search_cache import job_search_cache
+from utils.job_index import job_index
+
 # Load environment variables
 load_dotenv()
 
@@ -37,4 +45,15 @@ async def connect_to_mongo():
 
 async def close_mongo_connection():
     if db.client:
-        db.client.close() 
\ No newline at end of file
+        db.client.close()
+
+
+async def ensure_indexes(database):
+    """Create the indexes hot queries rely on (no-op if they already exist)"""
+    await ats_result_store.ensure_indexes(database)
+    await llm_cache.ensure_indexes(database)
+    await parse_cache.ensure_indexes(database)
+    await blob_store.ensure_indexes(database)
+    await document_jobs.ensure_indexes(database)
+    await job_search_cache.ensure_indexes(database)
+    await job_index.ensure_indexes(database)
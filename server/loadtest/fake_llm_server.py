@@ -0,0 +1,182 @@
+#!/usr/bin/env python3
+"""
+OpenAI-compatible stand-in for the Groq chat-completions API, for load tests
+that must not spend real quota.
+
+Each request waits a time-to-first-token drawn from a log-normal
+distribution, then "generates" tokens at a fixed rate, either all at once or
+streamed as server-sent events. A share of requests can be failed with
+429 (including Retry-After), 500 or 503 responses, or hung past the client's
+read timeout.
+
+Usage (from the server directory):
+    python loadtest/fake_llm_server.py --port 8081 --ttft-ms 300 --tokens-per-second 400 --error-rate 0.02
+    GROQ_API_BASE=http://127.0.0.1:8081/v1 GROQ_API_KEY=fake python main.py
+"""
+import json
+import math
+import time
+import random
+import asyncio
+import argparse
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+
+WORDS = (
+    "experienced professional delivered results across teams improving quality safety and customer "
+    "satisfaction while leading projects managing stakeholders and mentoring colleagues in canada"
+).split()
+
+class FakeLLM:
+    """Latency, throughput and failure model of the fake upstream."""
+
+    def __init__(
+        self,
+        ttft_ms: float = 300.0,
+        ttft_sigma: float = 0.5,
+        tokens_per_second: float = 400.0,
+        error_rate: float = 0.0,
+        throttle_rate: float = 0.0,
+        hang_rate: float = 0.0,
+        retry_after: float = 1.0,
+        seed: int = 0
+    ):
+        self.ttft_ms = ttft_ms
+        self.ttft_sigma = ttft_sigma
+        self.tokens_per_second = tokens_per_second
+        self.error_rate = error_rate
+        self.throttle_rate = throttle_rate
+        self.hang_rate = hang_rate
+        self.retry_after = retry_after
+        self.rng = random.Random(seed)
+        self.requests = 0
+
+    def time_to_first_token(self) -> float:
+        # Log-normal with the configured median: long right tail like real providers
+        return self.rng.lognormvariate(math.log(self.ttft_ms / 1000), self.ttft_sigma)
+
+    def completion_tokens(self, max_tokens: int) -> int:
+        return max(1, min(max_tokens, int(self.rng.gauss(max_tokens * 0.6, max_tokens * 0.15))))
+
+    def failure(self):
+        """Pick an injected failure for this request: None, "throttle", "error" or "hang"."""
+        roll = self.rng.random()
+        if roll < self.throttle_rate:
+            return "throttle"
+        roll -= self.throttle_rate
+        if roll < self.error_rate:
+            return "error"
+        roll -= self.error_rate
+        if roll < self.hang_rate:
+            return "hang"
+        return None
+
+def create_app(llm: FakeLLM) -> FastAPI:
+    app = FastAPI(title="Fake LLM")
+
+    @app.get("/stats")
+    async def stats():
+        return {"requests": llm.requests}
+
+    @app.post("/v1/chat/completions")
+    async def chat_completions(request: Request):
+        body = await request.json()
+        llm.requests += 1
+        model = body.get("model", "fake-model")
+        prompt_tokens = sum(len(str(message.get("content", "")).split()) for message in body.get("messages", []))
+        completion_tokens = llm.completion_tokens(int(body.get("max_tokens") or 256))
+        usage = {
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": completion_tokens,
+            "total_tokens": prompt_tokens + completion_tokens
+        }
+
+        failure = llm.failure()
+        if failure == "throttle":
+            return JSONResponse(
+                {"error": {"message": "Rate limit reached", "type": "rate_limit_exceeded"}},
+                status_code=429,
+                headers={"Retry-After": str(llm.retry_after)}
+            )
+        if failure == "error":
+            status_code = llm.rng.choice([500, 503])
+            return JSONResponse({"error": {"message": "Injected failure", "type": "server_error"}}, status_code=status_code)
+        if failure == "hang":
+            await asyncio.sleep(3600)
+
+        await asyncio.sleep(llm.time_to_first_token())
+        words = [llm.rng.choice(WORDS) for _ in range(completion_tokens)]
+        created = int(time.time())
+        completion_id = f"chatcmpl-fake-{llm.requests}"
+
+        if not body.get("stream"):
+            await asyncio.sleep(completion_tokens / llm.tokens_per_second)
+            return {
+                "id": completion_id,
+                "object": "chat.completion",
+                "created": created,
+                "model": model,
+                "choices": [{"index": 0, "message": {"role": "assistant", "content": " ".join(words)}, "finish_reason": "stop"}],
+                "usage": usage
+            }
+
+        async def events():
+            # Emit ~20 chunks per second regardless of token rate
+            per_chunk = max(1, int(llm.tokens_per_second / 20))
+            for start in range(0, len(words), per_chunk):
+                chunk_words = words[start:start + per_chunk]
+                chunk = {
+                    "id": completion_id,
+                    "object": "chat.completion.chunk",
+                    "created": created,
+                    "model": model,
+                    "choices": [{"index": 0, "delta": {"content": " ".join(chunk_words) + " "}, "finish_reason": None}]
+                }
+                yield f"data: {json.dumps(chunk)}\n\n"
+                await asyncio.sleep(len(chunk_words) / llm.tokens_per_second)
+            final = {
+                "id": completion_id,
+                "object": "chat.completion.chunk",
+                "created": created,
+                "model": model,
+                "choices": [{"index": 0, "delta": {}, "finish_reason": "stop"}],
+                "x_groq": {"usage": usage}
+            }
+            yield f"data: {json.dumps(final)}\n\n"
+            yield "data: [DONE]\n\n"
+
+        return StreamingResponse(events(), media_type="text/event-stream")
+
+    return app
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8081)
+    parser.add_argument("--ttft-ms", type=float, default=300.0, help="median time to first token")
+    parser.add_argument("--ttft-sigma", type=float, default=0.5, help="log-normal sigma of time to first token")
+    parser.add_argument("--tokens-per-second", type=float, default=400.0)
+    parser.add_argument("--error-rate", type=float, default=0.0, help="share of requests failed with 500/503")
+    parser.add_argument("--throttle-rate", type=float, default=0.0, help="share of requests failed with 429")
+    parser.add_argument("--hang-rate", type=float, default=0.0, help="share of requests that never answer")
+    parser.add_argument("--retry-after", type=float, default=1.0, help="Retry-After seconds sent with 429s")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    import uvicorn
+
+    llm = FakeLLM(
+        ttft_ms=args.ttft_ms,
+        ttft_sigma=args.ttft_sigma,
+        tokens_per_second=args.tokens_per_second,
+        error_rate=args.error_rate,
+        throttle_rate=args.throttle_rate,
+        hang_rate=args.hang_rate,
+        retry_after=args.retry_after,
+        seed=args.seed
+    )
+    uvicorn.run(create_app(llm), host=args.host, port=args.port, log_level="warning")
+
+if __name__ == "__main__":
+    main()
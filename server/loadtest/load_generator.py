@@ -0,0 +1,197 @@
+#!/usr/bin/env python3
+"""
+Closed-loop load generator for the document generation pipeline.
+
+Modes:
+    pipeline  call routes.resumes.produce_documents in-process (LLM client,
+              cache, retries and PDF rendering; no Mongo or auth needed)
+    http      POST /api/resumes/generate-documents on a running API
+    stream    POST /api/resumes/generate-documents/stream, also measuring
+              time to first token
+    jobs      enqueue on /api/resumes/generate-documents/jobs and poll until done
+
+Point the LLM client at the fake server first:
+    python loadtest/fake_llm_server.py --port 8081 &
+    python loadtest/load_generator.py pipeline --concurrency 16 --requests 200
+
+For the HTTP modes, start the API with GROQ_API_BASE=http://127.0.0.1:8081/v1
+and pass a user's access token with --token.
+"""
+import os
+import sys
+import time
+import asyncio
+import argparse
+import tempfile
+from typing import Awaitable, Callable, List, Optional
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+JOB_DESCRIPTION = (
+    "We are hiring a registered nurse for our acute care unit. Requirements: patient care, "
+    "medication administration, electronic health records, BLS certification and strong communication."
+)
+
+USER_INFO = {
+    "name": "Load Test",
+    "location": "Toronto",
+    "job_preference": "Registered Nurse",
+    "origin_country": "Philippines",
+    "resume_text": "Registered nurse with acute care experience",
+    "resume_keywords": ["patient care", "medication administration", "bls"]
+}
+
+class Results:
+    def __init__(self):
+        self.latencies: List[float] = []
+        self.first_token: List[float] = []
+        self.errors: dict = {}
+
+    def error(self, name: str):
+        self.errors[name] = self.errors.get(name, 0) + 1
+
+def percentile(values: List[float], fraction: float) -> float:
+    if not values:
+        return float("nan")
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(fraction * (len(ordered) - 1))))]
+
+def report(label: str, results: Results, elapsed: float):
+    completed = len(results.latencies)
+    failed = sum(results.errors.values())
+    print(f"\n{label}: {completed} ok, {failed} failed in {elapsed:.1f}s -> {completed / elapsed:.2f} req/s")
+    for name, values in (("latency", results.latencies), ("first token", results.first_token)):
+        if values:
+            print(
+                f"  {name:<12} p50 {percentile(values, 0.5) * 1000:8.0f} ms"
+                f"  p90 {percentile(values, 0.9) * 1000:8.0f} ms"
+                f"  p99 {percentile(values, 0.99) * 1000:8.0f} ms"
+                f"  max {max(values) * 1000:8.0f} ms"
+            )
+    for name, count in sorted(results.errors.items()):
+        print(f"  error {name}: {count}")
+
+async def run_closed_loop(concurrency: int, total: int, one: Callable[[int, Results], Awaitable[None]]) -> Results:
+    """Keep ``concurrency`` requests in flight until ``total`` have been sent."""
+    results = Results()
+    counter = iter(range(total))
+
+    async def worker():
+        for index in counter:
+            start = time.perf_counter()
+            try:
+                await one(index, results)
+            except Exception as e:
+                results.error(type(e).__name__)
+                continue
+            results.latencies.append(time.perf_counter() - start)
+
+    await asyncio.gather(*[worker() for _ in range(concurrency)])
+    return results
+
+def job_description(index: int, unique: bool) -> str:
+    # Unique prompts defeat the LLM cache so every request reaches the upstream
+    return f"{JOB_DESCRIPTION} Posting #{index}." if unique else JOB_DESCRIPTION
+
+async def pipeline_mode(args) -> Results:
+    from routes.resumes import produce_documents
+    from utils.groq_service import groq_service
+    from utils.worker_pool import render_pool
+
+    async def one(index: int, results: Results):
+        await produce_documents("loadtest", USER_INFO, job_description(index, args.unique_prompts), args.document_type)
+
+    try:
+        return await run_closed_loop(args.concurrency, args.requests, one)
+    finally:
+        await groq_service.aclose()
+        render_pool.shutdown()
+
+async def http_mode(args) -> Results:
+    import httpx
+
+    headers = {"Authorization": f"Bearer {args.token}"}
+    limits = httpx.Limits(max_connections=args.concurrency)
+    async with httpx.AsyncClient(base_url=args.base_url, headers=headers, limits=limits, timeout=args.timeout) as client:
+
+        async def plain(index: int, results: Results):
+            response = await client.post("/api/resumes/generate-documents", data={
+                "job_description": job_description(index, args.unique_prompts),
+                "document_type": args.document_type
+            })
+            if response.status_code != 200:
+                raise RuntimeError(f"HTTP {response.status_code}")
+
+        async def stream(index: int, results: Results):
+            start = time.perf_counter()
+            first: Optional[float] = None
+            async with client.stream("POST", "/api/resumes/generate-documents/stream", data={
+                "job_description": job_description(index, args.unique_prompts),
+                "document_type": args.document_type
+            }) as response:
+                if response.status_code != 200:
+                    raise RuntimeError(f"HTTP {response.status_code}")
+                async for line in response.aiter_lines():
+                    if first is None and line.startswith("event: token"):
+                        first = time.perf_counter() - start
+                    if line.startswith("event: error"):
+                        raise RuntimeError("stream error")
+            if first is not None:
+                results.first_token.append(first)
+
+        async def jobs(index: int, results: Results):
+            response = await client.post("/api/resumes/generate-documents/jobs", data={
+                "job_description": job_description(index, args.unique_prompts),
+                "document_type": args.document_type
+            })
+            if response.status_code != 202:
+                raise RuntimeError(f"HTTP {response.status_code}")
+            job_id = response.json()["job_id"]
+            while True:
+                await asyncio.sleep(args.poll_interval)
+                job = (await client.get(f"/api/resumes/generate-documents/jobs/{job_id}")).json()
+                if job["status"] == "completed":
+                    return
+                if job["status"] == "failed":
+                    raise RuntimeError("job failed")
+
+        one = {"http": plain, "stream": stream, "jobs": jobs}[args.mode]
+        return await run_closed_loop(args.concurrency, args.requests, one)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("mode", choices=["pipeline", "http", "stream", "jobs"])
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--requests", type=int, default=100)
+    parser.add_argument("--document-type", default="both", choices=["cover_letter", "optimized_resume", "both"])
+    parser.add_argument("--unique-prompts", action=argparse.BooleanOptionalAction, default=True,
+                        help="vary the job description per request so the LLM cache doesn't absorb the load")
+    parser.add_argument("--llm-base", default="http://127.0.0.1:8081/v1", help="LLM endpoint for pipeline mode")
+    parser.add_argument("--base-url", default="http://127.0.0.1:8000", help="API for the HTTP modes")
+    parser.add_argument("--token", help="access token for the HTTP modes")
+    parser.add_argument("--timeout", type=float, default=120.0)
+    parser.add_argument("--poll-interval", type=float, default=0.5)
+    args = parser.parse_args()
+
+    if args.mode == "pipeline":
+        # Must be set before the service modules are imported
+        os.environ.setdefault("GROQ_API_BASE", args.llm_base)
+        os.environ.setdefault("GROQ_API_KEY", "loadtest")
+        os.environ.setdefault("JWT_SECRET", "loadtest")
+        # Rendered PDFs go to a throwaway blob directory
+        os.environ.setdefault("BLOB_STORE_DIR", tempfile.mkdtemp(prefix="bridgeai-loadtest-"))
+        # The fake server has no quota; don't let the client-side limiter cap throughput
+        os.environ.setdefault("GROQ_RATE_LIMIT_RPM", "1000000")
+        os.environ.setdefault("GROQ_RATE_LIMIT_BURST", "1000")
+        runner = pipeline_mode
+    else:
+        if not args.token:
+            parser.error("--token is required for the HTTP modes")
+        runner = http_mode
+
+    start = time.perf_counter()
+    results = asyncio.run(runner(args))
+    report(f"{args.mode} x{args.concurrency} ({args.document_type})", results, time.perf_counter() - start)
+
+if __name__ == "__main__":
+    main()
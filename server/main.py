@@ -8,7 +8,19 @@ import logging
 import asyncio
 
 from routes import auth, users, resumes, jobs, qualifications, friends, websocket, chat
-from database import get_database
+from database import get_database, ensure_indexes
+from utils.metrics import metrics
+from utils.worker_pool import parse_pool, render_pool
+from utils.browser_pool import browser_pool
+from utils.job_queue import document_jobs
+from utils.groq_service import groq_service
+from utils.jsearch_service import jsearch_service
+from utils.search_cache import job_search_cache
+from utils.job_index import job_index
+from utils.job_harvester import job_harvester
+from utils.llm_cache import llm_cache
+from utils.blob_store import blob_store
+from utils.blob_gc import blob_gc
 
 load_dotenv()
 
@@ -37,12 +49,34 @@ async def lifespan(app: FastAPI):
         logger.info("MongoDB connection successful")
         
         app.mongodb = app.mongodb_client.immigrant_job_finder  # type: ignore[attr-defined]
+        await ensure_indexes(app.mongodb)  # type: ignore[attr-defined]
+        llm_cache.attach(app.mongodb)  # type: ignore[attr-defined]
+        blob_store.attach(app.mongodb)  # type: ignore[attr-defined]
+        job_search_cache.attach(app.mongodb)  # type: ignore[attr-defined]
+        job_index.attach(app.mongodb)  # type: ignore[attr-defined]
         
         # Start WebSocket heartbeat monitor
         from websocket_manager import manager
         app.heartbeat_task = asyncio.create_task(manager.start_heartbeat_monitor())
         logger.info("WebSocket heartbeat monitor started")
         
+        # Warm up the PDF parse and render workers so the first request doesn't pay the import cost
+        await parse_pool.start()
+        await render_pool.start()
+        
+        # Background document generation workers
+        await document_jobs.start(app.mongodb)  # type: ignore[attr-defined]
+        
+        # Sweep unreferenced resumes and generated documents
+        await blob_gc.start()
+        
+        # Pre-fetch the most common job searches
+        await job_harvester.start()
+        
+        # Pre-launch browsers only when the Selenium ATS evaluator is enabled
+        if resumes.ATS_EVALUATOR == "selenium":
+            await browser_pool.start()
+        
     except Exception as e:
         logger.error(f"Failed to connect to MongoDB: {e}")
         raise
@@ -50,6 +84,11 @@ async def lifespan(app: FastAPI):
     yield
     
     # Shutdown
+    # Stop job workers first so interrupted jobs can still be marked failed
+    await document_jobs.shutdown()
+    await blob_gc.shutdown()
+    await job_harvester.shutdown()
+    
     if hasattr(app, 'mongodb_client'):
         app.mongodb_client.close()  # type: ignore[attr-defined]
         logger.info("Disconnected from MongoDB")
@@ -58,6 +97,12 @@ async def lifespan(app: FastAPI):
     if hasattr(app, 'heartbeat_task') and app.heartbeat_task:
         app.heartbeat_task.cancel()
         logger.info("WebSocket heartbeat monitor stopped")
+    
+    parse_pool.shutdown()
+    render_pool.shutdown()
+    await browser_pool.shutdown()
+    await groq_service.aclose()
+    await jsearch_service.aclose()
 
 app = FastAPI(
     title="ImmigrantJobFinder API",
@@ -108,6 +153,11 @@ async def root():
 async def health_check():
     return {"status": "healthy"}
 
+@app.get("/metrics")
+async def get_metrics():
+    """Internal performance metrics (queue depths, latency histograms, cache hit rates)"""
+    return metrics.snapshot()
+
 @app.get("/cors-test")
 async def cors_test():
     """Test endpoint to verify CORS is working"""
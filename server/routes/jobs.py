@@ -1,25 +1,216 @@
 import os
+import json
 import httpx
-from fastapi import APIRouter, Query, HTTPException
-from typing import Optional
+import asyncio
+from fastapi import APIRouter, Query, HTTPException, Request, Depends, status
+from fastapi.responses import StreamingResponse
+from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
+from bson import ObjectId
+from typing import Optional, Dict, Any, List, AsyncIterator, Set, Tuple, Union
 from dotenv import load_dotenv
 
+from utils.auth import get_current_user_id
+from utils.ats_engine import score_jobs
+from utils.worker_pool import parse_pool, PoolOverloadedError, PoolTimeoutError
+from utils.jsearch_service import jsearch_service, JSearchAPIError
+from utils.search_cache import job_search_cache
+from utils.job_index import job_index, job_fingerprint, PAGE_SIZE
+from utils.job_harvester import job_harvester
+
 # Load environment variables
 load_dotenv()
 
 router = APIRouter()
+security = HTTPBearer()
+
+# Pages of one search requested from JSearch at the same time
+PAGE_CONCURRENCY = int(os.getenv("JSEARCH_PAGE_CONCURRENCY", "4"))
+
+def format_job(job: Dict[str, Any]) -> Dict[str, Any]:
+    """Map a JSearch posting to the shape the dashboard expects."""
+    return {
+        "job_title": job.get("job_title", "N/A"),
+        "company_name": job.get("employer_name", "N/A"),
+        "job_city": job.get("job_city", "N/A"),
+        "job_state": job.get("job_state", "N/A"),
+        "job_country": job.get("job_country", "N/A"),
+        "job_apply_link": job.get("job_apply_link", ""),
+        "job_description": job.get("job_description", "No description available"),
+        "job_employment_type": job.get("job_employment_type", "N/A"),
+        "job_salary": job.get("job_salary", "N/A"),
+        "job_posted_at": job.get("job_posted_at", "N/A"),
+        "job_required_skills": job.get("job_required_skills", []),
+        "job_required_experience": job.get("job_required_experience", "N/A"),
+        "job_required_education": job.get("job_required_education", "N/A")
+    }
 
-JSEARCH_API_URL = "https://jsearch.p.rapidapi.com/search"
-RAPIDAPI_KEY = os.getenv("RAPIDAPI_KEY")
+def dedupe_jobs(jobs: List[Dict[str, Any]], seen: Set[str]) -> List[Dict[str, Any]]:
+    """Postings not already in ``seen`` (which is updated)."""
+    unique = []
+    for job in jobs:
+        fingerprint = job_fingerprint(job)
+        if fingerprint not in seen:
+            seen.add(fingerprint)
+            unique.append(job)
+    return unique
 
-if not RAPIDAPI_KEY:
-    # RapidAPI key not configured
-    pass
+def build_search_query(title: Optional[str], location: Optional[str]) -> str:
+    query_parts = []
+    if title:
+        query_parts.append(title)
+    if location:
+        query_parts.append(f"in {location}")
+    
+    if not query_parts:
+        query_parts = ["software", "in Canada"]  # Default search
+    
+    return " ".join(query_parts)
+
+def require_jsearch():
+    if not jsearch_service.is_available():
+        raise HTTPException(status_code=500, detail="RapidAPI key not configured")
+
+async def fetch_upstream(
+    search_query: str,
+    page: int,
+    num_pages: int,
+    country: str,
+    date_posted: str
+) -> List[Dict[str, Any]]:
+    """Formatted postings of ``num_pages`` pages in one JSearch request, recorded in the local job index."""
+    postings = await jsearch_service.search(search_query, page, num_pages, country, date_posted)
+    jobs = [format_job(job) for job in postings]
+    await job_index.upsert(jobs, country, search_query)
+    return jobs
+
+async def fetch_upstream_page(
+    search_query: str,
+    page: int,
+    country: str,
+    date_posted: str
+) -> List[Dict[str, Any]]:
+    """One page of formatted postings straight from JSearch, recorded in the local job index."""
+    return await fetch_upstream(search_query, page, 1, country, date_posted)
+
+async def search_local(
+    search_query: str,
+    page: int,
+    num_pages: int,
+    country: str,
+    date_posted: str,
+    cache_keys: List[str]
+) -> Optional[List[Dict[str, Any]]]:
+    """
+    Every requested page from the local job index, or None when it can't
+    fill them all; decided once per search, so one search never mixes local
+    and upstream pages (whose orders differ). Searches whose ``cache_keys``
+    are all cached, e.g. pre-fetched by the harvester, are left to the
+    search cache, which serves them without the API and counts warm hits
+    """
+    # The index doesn't know posting dates, so date-filtered searches always go upstream
+    if date_posted != "all":
+        return None
+    if await job_search_cache.contains(cache_keys):
+        return None
+    return await job_index.search(search_query, page, country, num_pages)
+
+async def fetch_page(
+    search_query: str,
+    page: int,
+    country: str,
+    date_posted: str,
+    num_pages: int = 1
+) -> List[Dict[str, Any]]:
+    """
+    Fetch and format ``num_pages`` pages of postings in one request from
+    RapidAPI JSearch, through the search cache (identical searches share
+    one upstream call)
+    """
+    async def fetch() -> List[Dict[str, Any]]:
+        return await fetch_upstream(search_query, page, num_pages, country, date_posted)
+    
+    try:
+        key = job_search_cache.make_key(search_query, page, num_pages, country, date_posted)
+        return await job_search_cache.get_or_fetch(key, fetch)
+
+    except JSearchAPIError as e:
+        raise HTTPException(status_code=e.status_code, detail=str(e))
+    except httpx.TimeoutException:
+        raise HTTPException(status_code=408, detail="Request timeout")
+    except httpx.RequestError as e:
+        raise HTTPException(status_code=500, detail=f"Request error: {str(e)}")
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
+
+async def iter_pages(
+    search_query: str,
+    page: int,
+    num_pages: int,
+    country: str,
+    date_posted: str
+) -> AsyncIterator[Tuple[int, Union[List[Dict[str, Any]], HTTPException]]]:
+    """
+    Fetch pages ``page`` to ``page + num_pages - 1`` concurrently (at most
+    PAGE_CONCURRENCY at a time), yielding ``(page, postings)`` in completion
+    order, or ``(page, HTTPException)`` for a page that failed.
+    
+    Each page is its own JSearch request, so this uses ``num_pages``
+    requests of RapidAPI quota where one multi-page request (as in
+    ``fetch_jobs``) is billed as two; it is worth it only when pages are
+    streamed to the client as they arrive. Searches the local job index
+    can answer in full are served from it instead, page by page.
+    """
+    keys = [job_search_cache.make_key(search_query, number, 1, country, date_posted) for number in range(page, page + num_pages)]
+    local = await search_local(search_query, page, num_pages, country, date_posted, keys)
+    if local is not None:
+        for offset in range(num_pages):
+            yield page + offset, local[offset * PAGE_SIZE:(offset + 1) * PAGE_SIZE]
+        return
+    
+    semaphore = asyncio.Semaphore(PAGE_CONCURRENCY)
+    started: Set[int] = set()
+    
+    async def fetch(number: int):
+        async with semaphore:
+            started.add(number)
+            try:
+                return number, await fetch_page(search_query, number, country, date_posted)
+            except HTTPException as e:
+                return number, e
+    
+    tasks = {number: asyncio.create_task(fetch(number)) for number in range(page, page + num_pages)}
+    try:
+        for next_page in asyncio.as_completed(tasks.values()):
+            yield await next_page
+    finally:
+        # Client went away: drop pages not yet requested; requested ones finish into the cache
+        for number, task in tasks.items():
+            if number not in started:
+                task.cancel()
+
+async def fetch_jobs(
+    search_query: str,
+    page: int,
+    num_pages: int,
+    country: str,
+    date_posted: str
+) -> List[Dict[str, Any]]:
+    """
+    Fetch the pages of a search from the local job index if it can answer
+    them all, otherwise in one JSearch request (one quota unit for a single
+    page, two for several), without duplicate postings. A failure fails the
+    whole search.
+    """
+    require_jsearch()
+    
+    key = job_search_cache.make_key(search_query, page, num_pages, country, date_posted)
+    jobs = await search_local(search_query, page, num_pages, country, date_posted, [key])
+    if jobs is None:
+        jobs = await fetch_page(search_query, page, country, date_posted, num_pages)
+    return dedupe_jobs(jobs, set())
 
-HEADERS = {
-    "x-rapidapi-key": RAPIDAPI_KEY,
-    "x-rapidapi-host": "jsearch.p.rapidapi.com"
-}
+# Popular searches are pre-fetched in the background through the same path
+job_harvester.register(build_search_query, fetch_upstream_page)
 
 @router.get("/search")
 async def search_jobs(
@@ -33,78 +224,151 @@ async def search_jobs(
     """
     Search for jobs using RapidAPI JSearch
     """
-    if not RAPIDAPI_KEY:
-        raise HTTPException(status_code=500, detail="RapidAPI key not configured")
+    search_query = build_search_query(title, location)
+    formatted_jobs = await fetch_jobs(search_query, page, num_pages, country, date_posted)
     
-    # Build search query
-    query_parts = []
-    if title:
-        query_parts.append(title)
-    if location:
-        query_parts.append(f"in {location}")
+    return {
+        "results": formatted_jobs,
+        "total_results": len(formatted_jobs),
+        "search_query": search_query,
+        "page": page
+    }
+
+def _ndjson(event: str, data: Dict[str, Any]) -> str:
+    return json.dumps({"event": event, **data}) + "\n"
+
+def _sse(event: str, data: Dict[str, Any]) -> str:
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+@router.get("/search/stream")
+async def stream_search_jobs(
+    title: Optional[str] = Query(None, description="Job title or keywords"),
+    location: Optional[str] = Query(None, description="Job location"),
+    page: int = Query(1, ge=1, description="Page number"),
+    num_pages: int = Query(1, ge=1, le=10, description="Number of pages to fetch"),
+    country: str = Query("ca", description="Country code (default: ca)"),
+    date_posted: str = Query("all", description="Date posted filter (default: all)"),
+    format: str = Query("ndjson", description="ndjson or sse")
+):
+    """
+    Search for jobs, streaming each page's new postings as soon as it arrives
     
-    if not query_parts:
-        query_parts = ["software", "in Canada"]  # Default search
+    Emits a "page" event ({page, results}) per page in arrival order, with
+    postings already sent on an earlier page removed, an "error" event
+    ({page, status_code, detail}) for a page that failed, and a final "done"
+    event ({total_results, search_query, page, failed_pages}). As NDJSON, each
+    line is one event object with an "event" field.
+    
+    Every page is a separate JSearch request, so a stream of ``num_pages``
+    pages costs ``num_pages`` requests of RapidAPI quota; /search fetches
+    the same pages in one request when they needn't arrive incrementally.
+    """
+    if format not in ("ndjson", "sse"):
+        raise HTTPException(status_code=400, detail="format must be ndjson or sse")
+    require_jsearch()
     
-    search_query = " ".join(query_parts)
+    search_query = build_search_query(title, location)
+    encode = _sse if format == "sse" else _ndjson
     
+    async def stream():
+        seen: Set[str] = set()
+        failed_pages = []
+        async for number, result in iter_pages(search_query, page, num_pages, country, date_posted):
+            if isinstance(result, HTTPException):
+                failed_pages.append(number)
+                yield encode("error", {"page": number, "status_code": result.status_code, "detail": result.detail})
+            else:
+                yield encode("page", {"page": number, "results": dedupe_jobs(result, seen)})
+        yield encode("done", {
+            "total_results": len(seen),
+            "search_query": search_query,
+            "page": page,
+            "failed_pages": sorted(failed_pages)
+        })
+    
+    return StreamingResponse(
+        stream(),
+        media_type="text/event-stream" if format == "sse" else "application/x-ndjson",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+def job_text(job: Dict[str, Any]) -> str:
+    """Text of a formatted posting used for scoring."""
+    skills = job.get("job_required_skills") or []
+    return "\n".join([
+        job.get("job_title") or "",
+        ", ".join(skills) if isinstance(skills, list) else str(skills),
+        job.get("job_description") or ""
+    ])
+
+@router.get("/search/ranked")
+async def search_jobs_ranked(
+    request: Request,
+    title: Optional[str] = Query(None, description="Job title or keywords"),
+    location: Optional[str] = Query(None, description="Job location"),
+    page: int = Query(1, ge=1, description="Page number"),
+    num_pages: int = Query(1, ge=1, le=10, description="Number of pages to fetch"),
+    country: str = Query("ca", description="Country code (default: ca)"),
+    date_posted: str = Query("all", description="Date posted filter (default: all)"),
+    credentials: HTTPAuthorizationCredentials = Depends(security)
+):
+    """
+    Search for jobs and rank every result by fit with the user's stored resume
+    """
     try:
-        async with httpx.AsyncClient(timeout=30.0) as client:
-            response = await client.get(
-                JSEARCH_API_URL, 
-                params={
-                    "query": search_query,
-                    "page": str(page),
-                    "num_pages": str(num_pages),
-                    "country": country,
-                    "date_posted": date_posted
-                }, 
-                headers=HEADERS
+        user_id = get_current_user_id(credentials.credentials)
+        db = request.app.mongodb
+        
+        user = await db.users.find_one({"_id": ObjectId(user_id)})
+        if not user or not user.get("resume_text"):
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="No resume found. Please upload a resume first."
             )
-            
-            if response.status_code != 200:
-                raise HTTPException(
-                    status_code=response.status_code, 
-                    detail=f"RapidAPI error: {response.text}"
-                )
-
-        data = response.json()
         
-        # Extract and format job data
-        jobs = data.get("data", [])
-        formatted_jobs = []
+        search_query = build_search_query(title, location)
+        formatted_jobs = await fetch_jobs(search_query, page, num_pages, country, date_posted)
+        
+        resume = {
+            "structured_content": user.get("resume_structured") or {},
+            "keywords": user.get("resume_keywords") or [],
+            "clean_text": user.get("resume_text", "")
+        }
+        # All postings are scored in one vectorized batch off the event loop
+        scores = await parse_pool.run(score_jobs, resume, [job_text(job) for job in formatted_jobs])
         
-        for job in jobs:
-            formatted_job = {
-                "job_title": job.get("job_title", "N/A"),
-                "company_name": job.get("employer_name", "N/A"),
-                "job_city": job.get("job_city", "N/A"),
-                "job_state": job.get("job_state", "N/A"),
-                "job_country": job.get("job_country", "N/A"),
-                "job_apply_link": job.get("job_apply_link", ""),
-                "job_description": job.get("job_description", "No description available"),
-                "job_employment_type": job.get("job_employment_type", "N/A"),
-                "job_salary": job.get("job_salary", "N/A"),
-                "job_posted_at": job.get("job_posted_at", "N/A"),
-                "job_required_skills": job.get("job_required_skills", []),
-                "job_required_experience": job.get("job_required_experience", "N/A"),
-                "job_required_education": job.get("job_required_education", "N/A")
+        ranked_jobs = [
+            {
+                **job,
+                "match_percentage": score["match_percentage"],
+                "skill_coverage": score["skill_coverage"],
+                "missing_skills": score["missing_skills"]
             }
-            formatted_jobs.append(formatted_job)
+            for job, score in zip(formatted_jobs, scores)
+        ]
+        ranked_jobs.sort(key=lambda job: job["match_percentage"], reverse=True)
         
         return {
-            "results": formatted_jobs,
-            "total_results": len(formatted_jobs),
+            "results": ranked_jobs,
+            "total_results": len(ranked_jobs),
             "search_query": search_query,
             "page": page
         }
-
-    except httpx.TimeoutException:
-        raise HTTPException(status_code=408, detail="Request timeout")
-    except httpx.RequestError as e:
-        raise HTTPException(status_code=500, detail=f"Request error: {str(e)}")
+        
+    except HTTPException:
+        raise
+    except PoolOverloadedError:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Job ranking is busy. Please try again shortly."
+        )
+    except PoolTimeoutError:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Job ranking took too long. Please try again shortly."
+        )
     except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Error ranking jobs: {str(e)}")
 
 @router.get("/health")
 async def health_check():
@@ -113,6 +377,6 @@ async def health_check():
     """
     return {
         "status": "healthy",
-        "rapidapi_configured": bool(RAPIDAPI_KEY),
+        "rapidapi_configured": jsearch_service.is_available(),
         "service": "job-search"
     }
@@ -1,13 +1,12 @@
-from fastapi import APIRouter, HTTPException, status, Depends, UploadFile, File, Request, Form, Query
+from fastapi import APIRouter, HTTPException, status, Depends, Request, Form, Query
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from fastapi.responses import FileResponse
+from fastapi.responses import StreamingResponse
 from motor.motor_asyncio import AsyncIOMotorDatabase
 from bson import ObjectId
 import os
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Optional, List, Callable, Awaitable
 import tempfile
-from selenium.webdriver.chrome.service import Service
-from selenium import webdriver
+import asyncio
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
@@ -19,8 +18,17 @@ from datetime import datetime
 import logging
 
 from utils.auth import get_current_user_id, get_current_user
-from utils.pdf_parser import resume_parser
-from utils.pdf_editor import pdf_editor
+from utils.pdf_parser import parse_in_pool, PARSER_VERSION
+from utils.worker_pool import parse_pool, render_pool, PoolOverloadedError, PoolTimeoutError
+from utils.browser_pool import browser_pool
+from utils.job_queue import document_jobs
+from utils.parse_cache import parse_cache
+from utils.ats_engine import ats_scorer, ENGINE_VERSION
+from utils.ats_results import ats_result_store
+from utils.pdf_editor import render_document
+from utils.blob_store import blob_store, is_blob_id
+from utils.uploads import receive_file
+from utils.file_serving import serve_blob, serve_file, IMMUTABLE, REVALIDATE
 from database import get_database
 from models.user import UserResponse
 
@@ -32,7 +40,7 @@ logger = logging.getLogger("ats_eval")
 def get_groq_service():
     try:
         from utils.groq_service import groq_service
-        if groq_service is None:
+        if groq_service is None or not groq_service.is_available():
             raise HTTPException(
                 status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
                 detail="AI document generation service is not available. Please set GROQ_API_KEY environment variable."
@@ -44,13 +52,42 @@ def get_groq_service():
             detail="AI document generation service is not available."
         )
 
-@router.post("/upload")
+async def _run_parse_job(pdf_content: bytes) -> Dict[str, Any]:
+    """Parse a PDF in the parse worker pool so the event loop stays responsive."""
+    try:
+        return await parse_in_pool(parse_pool, pdf_content)
+    except PoolOverloadedError:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Resume parser is busy. Please try again shortly."
+        )
+    except PoolTimeoutError:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail="PDF took too long to parse. Please upload a simpler file."
+        )
+
+async def parse_pdf(pdf_content: bytes, db=None) -> Dict[str, Any]:
+    """Parse a PDF, reusing the cached result when the same file was parsed before."""
+    return await parse_cache.get_or_parse(db, pdf_content, _run_parse_job)
+
+# Uploaded resumes are capped while they stream in
+MAX_RESUME_BYTES = int(os.getenv("MAX_RESUME_UPLOAD_BYTES", str(10 * 1024 * 1024)))
+
+@router.post("/upload", openapi_extra={
+    "requestBody": {
+        "required": True,
+        "content": {"multipart/form-data": {
+            "schema": {"type": "object", "required": ["file"], "properties": {"file": {"type": "string", "format": "binary"}}}
+        }}
+    }
+})
 async def upload_resume(
     request: Request,
-    file: UploadFile = File(...),
     credentials: HTTPAuthorizationCredentials = Depends(security)
 ):
     """Upload and parse a PDF resume."""
+    upload = None
     try:
         # Verify user
         user_id = get_current_user_id(credentials.credentials)
@@ -58,25 +95,21 @@ async def upload_resume(
         # Get database directly from app state
         db = request.app.mongodb
         
-        # Check file type
-        if not file.filename or not file.filename.lower().endswith('.pdf'):
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Only PDF files are allowed"
-            )
-        
-        # Check file size (max 10MB)
-        if file.size and file.size > 10 * 1024 * 1024:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="File size must be less than 10MB"
-            )
-        
-        # Read file content
-        file_content = await file.read()
+        # Stream the file to the blob store's staging area, checking type and size as it arrives
+        upload = await receive_file(
+            request,
+            field="file",
+            max_bytes=MAX_RESUME_BYTES,
+            spool_dir=blob_store.staging_dir(),
+            allowed_suffixes=(".pdf",),
+            magic=b"%PDF-"
+        )
+        filename = upload.filename
         
-        # Parse PDF
-        parse_result = resume_parser.extract_text_from_pdf(file_content)
+        # Parse PDF off the event loop; the bytes are only read on a parse cache miss
+        parse_result = await parse_cache.get_or_parse_digest(
+            db, upload.sha256, lambda: asyncio.to_thread(upload.read), _run_parse_job
+        )
         
         if not parse_result.get('parsed_successfully', False):
             raise HTTPException(
@@ -84,43 +117,39 @@ async def upload_resume(
                 detail=f"Failed to parse PDF: {parse_result.get('error', 'Unknown error')}"
             )
         
-        # Clean and structure the text
-        full_text = parse_result.get('full_text', '')
-        if isinstance(full_text, str):
-            clean_text = resume_parser.get_clean_text(full_text)
-            keywords = resume_parser.extract_keywords(full_text)
-        else:
-            clean_text = ""
-            keywords = []
+        # Clean text and keywords are computed by the parse worker
+        clean_text = parse_result.get('clean_text', '')
+        keywords = parse_result.get('keywords', [])
         
         structured_content = parse_result.get('structured_content', {})
         if not isinstance(structured_content, dict):
             structured_content = {}
         
-        # Save PDF to disk and store path
-        resume_dir = os.path.join(os.getcwd(), "server", "resumes")
-        os.makedirs(resume_dir, exist_ok=True)
-        resume_path = os.path.join(resume_dir, f"{user_id}_{file.filename}")
-        with open(resume_path, "wb") as f:
-            f.write(file_content)
+        # Move the spooled PDF into the blob store; re-uploading the same file reuses the blob
+        resume_blob = await blob_store.put_file(upload.path, upload.sha256, upload.size, "application/pdf")
+        upload = None
 
-        # Update user's resume information - now including the PDF file path
+        # Update user's resume information
         update_data = {
             "resume_text": clean_text,
-            "resume_filename": file.filename,
+            "resume_filename": filename,
             "resume_structured": structured_content,
             "resume_keywords": keywords,
-            "resume_file_path": resume_path  # Save the path!
+            "resume_blob": resume_blob,
+            "resume_file_path": None
         }
         
-        await db.users.update_one(
+        previous = await db.users.find_one_and_update(
             {"_id": ObjectId(user_id)},
-            {"$set": update_data}
+            {"$set": update_data},
+            projection={"resume_blob": 1}
         )
+        # Drop the reference held by the replaced resume
+        await blob_store.release((previous or {}).get("resume_blob"))
         
         return {
             "message": "Resume uploaded and parsed successfully",
-            "filename": file.filename,
+            "filename": filename,
             "text_length": len(clean_text),
             "sections_found": list(structured_content.keys()),
             "keywords_extracted": keywords
@@ -133,6 +162,10 @@ async def upload_resume(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Error processing resume: {str(e)}"
         )
+    finally:
+        # Rejected or failed uploads leave nothing behind
+        if upload is not None:
+            upload.discard()
 
 @router.get("/content")
 async def get_resume_content(
@@ -184,26 +217,30 @@ async def remove_resume(
         # Get database directly from app state
         db = request.app.mongodb
         
-        # Remove resume data - including the PDF file
+        # Remove resume data - including the stored PDF
         update_data = {
             "resume_text": None,
             "resume_filename": None,
             "resume_structured": None,
             "resume_keywords": None,
-            "resume_file_path": None  # Also remove the stored PDF file path
+            "resume_blob": None,
+            "resume_file_path": None
         }
         
-        result = await db.users.update_one(
+        previous = await db.users.find_one_and_update(
             {"_id": ObjectId(user_id)},
-            {"$set": update_data}
+            {"$set": update_data},
+            projection={"resume_text": 1, "resume_blob": 1, "resume_file_path": 1}
         )
         
-        if result.modified_count == 0:
+        if not previous or not (previous.get("resume_text") or previous.get("resume_blob") or previous.get("resume_file_path")):
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="No resume found to remove"
             )
         
+        await blob_store.release(previous.get("resume_blob"))
+        
         return {"message": "Resume removed successfully"}
         
     except HTTPException:
@@ -214,105 +251,132 @@ async def remove_resume(
             detail=f"Error removing resume: {str(e)}"
         )
 
+# "native" scores in-process; "selenium" drives the Hugging Face ATS screener on the browser pool
+ATS_EVALUATOR = os.getenv("ATS_EVALUATOR", "native")
+
 @router.post("/ats-evaluate")
 async def evaluate_resume_ats(
     request: Request,
-    resume_file: UploadFile = File(...),
-    job_description: str = Form(...),
     credentials: HTTPAuthorizationCredentials = Depends(security)
 ):
     """
     Evaluate resume against job description using ATS scoring
     """
+    upload = None
     try:
         # Verify user
         user_id = get_current_user_id(credentials.credentials)
         
-        # Validate file type
-        if not resume_file.filename or not resume_file.filename.lower().endswith('.pdf'):
-            raise HTTPException(status_code=400, detail="Only PDF files are supported")
+        # Same size, type and magic-byte checks as /upload, streamed to disk instead of buffered
+        upload = await receive_file(
+            request,
+            field="resume_file",
+            max_bytes=MAX_RESUME_BYTES,
+            spool_dir=blob_store.staging_dir(),
+            allowed_suffixes=(".pdf",),
+            magic=b"%PDF-",
+            fields=("job_description",)
+        )
+        job_description = upload.fields.get("job_description", "")
+        if not job_description.strip():
+            raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail="job_description is required")
         
-        # Save uploaded file temporarily
-        with tempfile.NamedTemporaryFile(delete=False, suffix='.pdf') as temp_file:
-            content = await resume_file.read()
-            temp_file.write(content)
-            temp_file_path = temp_file.name
+        resume_filename = upload.filename
+        content = await asyncio.to_thread(upload.read)
+        db = request.app.mongodb
         
-        try:
-            # Initialize Chrome driver with headless mode
-            chrome_driver_path = os.path.join(os.getcwd(), "chrome_driver", "chromedriver.exe")
-            if not os.path.exists(chrome_driver_path):
-                raise HTTPException(status_code=500, detail="Chrome driver not found. ATS evaluation cannot proceed.")
-            
-            # Configure Chrome options for headless operation
-            chrome_options = webdriver.ChromeOptions()
-            chrome_options.add_argument("--headless")
-            chrome_options.add_argument("--no-sandbox")
-            chrome_options.add_argument("--disable-dev-shm-usage")
-            chrome_options.add_argument("--disable-gpu")
-            chrome_options.add_argument("--window-size=1920,1080")
-            chrome_options.add_argument("--user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36")
-
-            service = Service(chrome_driver_path)
-            driver = webdriver.Chrome(service=service, options=chrome_options)
-            
-            try:
-                # Navigate to Hugging Face ATS screener
-                driver.get("https://huggingface.co/spaces/santu24/ATS-Resume-Screener")
-                
-                # Wait for iframe and switch to it
-                wait = WebDriverWait(driver, 15)
-                iframe = wait.until(EC.presence_of_element_located((By.ID, "iFrameResizer0")))
-                driver.switch_to.frame(iframe)
-                
-                # Input job description
-                job_description_textarea = wait.until(EC.presence_of_element_located((By.ID, "text_area_1")))
-                job_description_textarea.clear()
-                job_description_textarea.send_keys(job_description)
-                
-                # Upload resume
-                resume_input = wait.until(EC.presence_of_element_located((By.CSS_SELECTOR, '[data-testid="stFileUploaderDropzoneInput"]')))
-                resume_input.send_keys(temp_file_path)
-                time.sleep(3)
-                
-                # Click percentage match button
-                percentage_match_btn = driver.find_elements(By.CSS_SELECTOR, ".st-emotion-cache-7ym5gk.ef3psqc12")[1]
-                percentage_match_btn.click()
-                
-                # Wait for analysis results
-                elements = wait.until(lambda d: len(d.find_elements(By.CSS_SELECTOR, ".st-emotion-cache-vdokb0.e1nzilvr4")) > 5)
-                analysis_div = driver.find_elements(By.CSS_SELECTOR, ".st-emotion-cache-vdokb0.e1nzilvr4")[4]
-                p_tags = analysis_div.find_elements(By.TAG_NAME, "p")
-                
-                # Extract feedback
-                feedback_list = []
-                for p in p_tags:
-                    feedback_list.append(p.text)
-                
-                return {
-                    "success": True,
-                    "feedback": feedback_list,
-                    "resume_filename": resume_file.filename,
-                    "job_description_preview": job_description[:100] + "..." if len(job_description) > 100 else job_description
-                }
-                
-            finally:
-                driver.quit()
-                
-        except Exception as web_error:
-            raise HTTPException(status_code=500, detail=f"ATS evaluation failed: {str(web_error)}")
+        # Identical resume bytes and job description give identical results
+        resume_hash, jd_hash = ats_result_store.make_key(content, job_description)
+        evaluator = "selenium" if ATS_EVALUATOR == "selenium" else f"native:{ENGINE_VERSION}:{PARSER_VERSION}"
+        
+        result = await ats_result_store.find(db, resume_hash, jd_hash, evaluator)
+        if result is not None:
+            result = {
+                **result,
+                "resume_filename": resume_filename,
+                "job_description_preview": job_description[:100] + "..." if len(job_description) > 100 else job_description,
+                "cached": True
+            }
+        elif ATS_EVALUATOR == "selenium":
+            result = await evaluate_with_selenium(content, resume_filename, job_description)
+        else:
+            result = await perform_basic_ats_analysis(content, resume_filename, job_description, db)
+        
+        await ats_result_store.save(db, user_id, resume_hash, jd_hash, evaluator, result)
+        return result
             
     except HTTPException:
         raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"ATS evaluation failed: {str(e)}")
     finally:
-        # Clean up temporary file if it exists
-        if 'temp_file_path' in locals():
-            try:
-                os.unlink(temp_file_path)
-            except:
-                pass
+        if upload is not None:
+            upload.discard()
+
+def _screen_with_browser(driver, resume_path: str, job_description: str) -> list:
+    """Drive the Hugging Face ATS screener on a leased browser and collect its feedback"""
+    # Navigate to Hugging Face ATS screener
+    driver.get("https://huggingface.co/spaces/santu24/ATS-Resume-Screener")
+    
+    # Wait for iframe and switch to it
+    wait = WebDriverWait(driver, 15)
+    iframe = wait.until(EC.presence_of_element_located((By.ID, "iFrameResizer0")))
+    driver.switch_to.frame(iframe)
+    
+    # Input job description
+    job_description_textarea = wait.until(EC.presence_of_element_located((By.ID, "text_area_1")))
+    job_description_textarea.clear()
+    job_description_textarea.send_keys(job_description)
+    
+    # Upload resume
+    resume_input = wait.until(EC.presence_of_element_located((By.CSS_SELECTOR, '[data-testid="stFileUploaderDropzoneInput"]')))
+    resume_input.send_keys(resume_path)
+    time.sleep(3)
+    
+    # Click percentage match button
+    percentage_match_btn = driver.find_elements(By.CSS_SELECTOR, ".st-emotion-cache-7ym5gk.ef3psqc12")[1]
+    percentage_match_btn.click()
+    
+    # Wait for analysis results
+    wait.until(lambda d: len(d.find_elements(By.CSS_SELECTOR, ".st-emotion-cache-vdokb0.e1nzilvr4")) > 5)
+    analysis_div = driver.find_elements(By.CSS_SELECTOR, ".st-emotion-cache-vdokb0.e1nzilvr4")[4]
+    p_tags = analysis_div.find_elements(By.TAG_NAME, "p")
+    
+    # Extract feedback
+    return [p.text for p in p_tags]
+
+async def evaluate_with_selenium(content: bytes, filename: str, job_description: str) -> dict:
+    """Evaluate a resume on a warm browser session from the shared pool"""
+    # Save uploaded file temporarily
+    with tempfile.NamedTemporaryFile(delete=False, prefix='bridgeai_', suffix='.pdf') as temp_file:
+        temp_file.write(content)
+        temp_file_path = temp_file.name
+    
+    try:
+        feedback_list = await browser_pool.run(_screen_with_browser, temp_file_path, job_description)
+        
+        return {
+            "success": True,
+            "feedback": feedback_list,
+            "resume_filename": filename,
+            "job_description_preview": job_description[:100] + "..." if len(job_description) > 100 else job_description
+        }
+            
+    except PoolOverloadedError:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="ATS evaluation is busy. Please try again shortly."
+        )
+    except FileNotFoundError:
+        raise HTTPException(status_code=500, detail="Chrome driver not found. ATS evaluation cannot proceed.")
+    except Exception as web_error:
+        raise HTTPException(status_code=500, detail=f"ATS evaluation failed: {str(web_error)}")
+    finally:
+        # Clean up temporary file
+        try:
+            os.unlink(temp_file_path)
+        except:
+            pass
 
 @router.get("/ats-result/{user_id}")
 async def get_ats_result(
@@ -369,22 +433,10 @@ async def download_resume(
                 detail="No resume found"
             )
         
-        # Get the stored PDF file path
-        resume_file_path = user.get("resume_file_path")
-        if not resume_file_path or not os.path.exists(resume_file_path):
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail="Resume file not found"
-            )
-        
         filename = user.get("resume_filename", "resume.pdf")
         
         # Return the PDF file directly
-        return FileResponse(
-            path=resume_file_path,
-            filename=filename,
-            media_type='application/pdf'
-        )
+        return await resume_file_response(request, user, filename, "attachment")
         
     except HTTPException:
         raise
@@ -394,6 +446,96 @@ async def download_resume(
             detail=f"Error downloading resume: {str(e)}"
         )
 
+async def resume_file_response(request: Request, user: Dict[str, Any], filename: str, disposition: str, headers: Optional[Dict[str, str]] = None):
+    """Serve a user's uploaded resume; resumes uploaded before the blob store still live at ``resume_file_path``"""
+    # The URL stays the same across re-uploads, so clients revalidate with the ETag
+    if user.get("resume_blob"):
+        return await serve_blob(request, user["resume_blob"], filename, 'application/pdf', disposition, REVALIDATE, headers)
+    
+    resume_file_path = user.get("resume_file_path")
+    if not resume_file_path or not os.path.exists(resume_file_path):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Resume file not found"
+        )
+    return serve_file(request, resume_file_path, filename, 'application/pdf', disposition, REVALIDATE, headers)
+
+async def load_user_info(db, user_id: str) -> Dict[str, Any]:
+    """Get the profile fields document generation needs, or 404 without a resume"""
+    user = await db.users.find_one({"_id": ObjectId(user_id)})
+    if not user or not user.get("resume_text"):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="No resume found. Please upload a resume first."
+        )
+    
+    return {
+        "name": user.get("name", ""),
+        "location": user.get("location", ""),
+        "job_preference": user.get("job_preference", ""),
+        "origin_country": user.get("origin_country", ""),
+        "resume_text": user.get("resume_text", ""),
+        "resume_keywords": user.get("resume_keywords", [])
+    }
+
+async def _no_progress(stage: str, **data: Any):
+    pass
+
+async def produce_documents(
+    user_id: str,
+    user_info: Dict[str, Any],
+    job_description: str,
+    document_type: str,
+    report: Callable[..., Awaitable[None]] = _no_progress
+) -> List[Dict[str, Any]]:
+    """Generate the requested documents; for "both" the two run concurrently"""
+    
+    async def cover_letter() -> Dict[str, Any]:
+        content = await generate_cover_letter(user_info, job_description)
+        await report("cover_letter_written")
+        path = await create_latex_pdf(content, "cover_letter", user_info["name"], user_id)
+        document = {
+            "type": "cover_letter",
+            "filename": f"{user_info['name'].replace(' ', '_')}_Cover_Letter.pdf",
+            "path": path
+        }
+        await report("cover_letter_ready", file=document)
+        return document
+    
+    async def optimized_resume() -> Dict[str, Any]:
+        content = await generate_optimized_resume(user_info, job_description)
+        await report("optimized_resume_written")
+        path = await create_latex_pdf(content, "resume", user_info["name"], user_id)
+        document = {
+            "type": "optimized_resume",
+            "filename": f"{user_info['name'].replace(' ', '_')}_Optimized_Resume.pdf",
+            "path": path
+        }
+        await report("optimized_resume_ready", file=document)
+        return document
+    
+    tasks = []
+    if document_type in ["cover_letter", "both"]:
+        tasks.append(cover_letter())
+    if document_type in ["optimized_resume", "both"]:
+        tasks.append(optimized_resume())
+    
+    return list(await asyncio.gather(*tasks))
+
+async def _run_document_job(job: Dict[str, Any], report: Callable[..., Awaitable[None]]) -> Dict[str, Any]:
+    """Job queue handler for "generate_documents" jobs"""
+    payload = job["payload"]
+    files = await produce_documents(str(job["user_id"]), payload["user_info"], payload["job_description"], payload["document_type"], report)
+    return {
+        "success": True,
+        "message": f"Generated {len(files)} document(s) successfully",
+        "files": files
+    }
+
+document_jobs.register("generate_documents", _run_document_job)
+
+DOCUMENT_TYPES = ("cover_letter", "optimized_resume", "both")
+
 @router.post("/generate-documents")
 async def generate_tailored_documents(
     request: Request,
@@ -408,48 +550,10 @@ async def generate_tailored_documents(
         # Verify user
         user_id = get_current_user_id(credentials.credentials)
         
-        # Get database directly from app state
-        db = request.app.mongodb
-        
-        # Get user's resume data
-        user = await db.users.find_one({"_id": ObjectId(user_id)})
-        if not user or not user.get("resume_text"):
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail="No resume found. Please upload a resume first."
-            )
-        
         # Extract user information
-        user_info = {
-            "name": user.get("name", ""),
-            "location": user.get("location", ""),
-            "job_preference": user.get("job_preference", ""),
-            "origin_country": user.get("origin_country", ""),
-            "resume_text": user.get("resume_text", ""),
-            "resume_keywords": user.get("resume_keywords", [])
-        }
+        user_info = await load_user_info(request.app.mongodb, user_id)
         
-        generated_files = []
-        
-        # Generate cover letter if requested
-        if document_type in ["cover_letter", "both"]:
-            cover_letter_content = await generate_cover_letter(user_info, job_description)
-            cover_letter_pdf = await create_latex_pdf(cover_letter_content, "cover_letter", user_info["name"])
-            generated_files.append({
-                "type": "cover_letter",
-                "filename": f"{user_info['name'].replace(' ', '_')}_Cover_Letter.pdf",
-                "path": cover_letter_pdf
-            })
-        
-        # Generate optimized resume if requested
-        if document_type in ["optimized_resume", "both"]:
-            optimized_resume_content = await generate_optimized_resume(user_info, job_description)
-            optimized_resume_pdf = await create_latex_pdf(optimized_resume_content, "resume", user_info["name"])
-            generated_files.append({
-                "type": "optimized_resume",
-                "filename": f"{user_info['name'].replace(' ', '_')}_Optimized_Resume.pdf",
-                "path": optimized_resume_pdf
-            })
+        generated_files = await produce_documents(user_id, user_info, job_description, document_type)
         
         return {
             "success": True,
@@ -465,6 +569,189 @@ async def generate_tailored_documents(
             detail=f"Error generating documents: {str(e)}"
         )
 
+def _job_response(job: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        "job_id": str(job["_id"]),
+        "status": job["status"],
+        "events": [
+            {**event, "at": event["at"].isoformat()} for event in job.get("events", [])
+        ],
+        "result": job.get("result"),
+        "error": job.get("error"),
+        "created_at": job["created_at"].isoformat(),
+        "updated_at": job["updated_at"].isoformat()
+    }
+
+@router.post("/generate-documents/jobs", status_code=status.HTTP_202_ACCEPTED)
+async def enqueue_document_generation(
+    request: Request,
+    job_description: str = Form(...),
+    document_type: str = Form(..., description="cover_letter, optimized_resume, or both"),
+    credentials: HTTPAuthorizationCredentials = Depends(security)
+):
+    """
+    Queue document generation in the background and return a job id to poll or stream
+    """
+    try:
+        user_id = get_current_user_id(credentials.credentials)
+        
+        if document_type not in DOCUMENT_TYPES:
+            raise HTTPException(status_code=400, detail="document_type must be cover_letter, optimized_resume, or both")
+        
+        user_info = await load_user_info(request.app.mongodb, user_id)
+        job = await document_jobs.enqueue("generate_documents", user_id, {
+            "user_info": user_info,
+            "job_description": job_description,
+            "document_type": document_type
+        })
+        
+        return {
+            "success": True,
+            "job_id": str(job["_id"]),
+            "status": job["status"]
+        }
+        
+    except HTTPException:
+        raise
+    except PoolOverloadedError:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Document generation is busy. Please try again shortly."
+        )
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Error queueing document generation: {str(e)}"
+        )
+
+@router.get("/generate-documents/jobs/{job_id}")
+async def get_document_job(
+    job_id: str,
+    credentials: HTTPAuthorizationCredentials = Depends(security)
+):
+    """Get the status, progress events and (once completed) files of a generation job"""
+    user_id = get_current_user_id(credentials.credentials)
+    job = await document_jobs.get(job_id, user_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return _job_response(job)
+
+@router.get("/generate-documents/jobs/{job_id}/events")
+async def stream_document_job(
+    job_id: str,
+    token: str = Query(..., description="Authentication token")
+):
+    """
+    Server-sent events with the job state on every change, ending once it completes or fails
+    
+    Authenticated by query token because EventSource cannot send headers.
+    """
+    user_id = get_current_user_id(token)
+    if not await document_jobs.get(job_id, user_id):
+        raise HTTPException(status_code=404, detail="Job not found")
+    
+    async def events():
+        async for job in document_jobs.watch(job_id, user_id):
+            yield f"event: {job['status']}\ndata: {json.dumps(_job_response(job))}\n\n"
+    
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+# File name suffix and renderer template of each streamed document type
+STREAMED_DOCUMENTS = {
+    "cover_letter": ("Cover_Letter", "cover_letter"),
+    "optimized_resume": ("Optimized_Resume", "resume")
+}
+
+def _sse(event: str, data: Dict[str, Any]) -> str:
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+@router.post("/generate-documents/stream")
+async def stream_tailored_documents(
+    request: Request,
+    job_description: str = Form(...),
+    document_type: str = Form(..., description="cover_letter, optimized_resume, or both"),
+    credentials: HTTPAuthorizationCredentials = Depends(security)
+):
+    """
+    Generate tailored documents, streaming the text as server-sent events while it is written
+    
+    Emits "token" events ({type, text}) as the AI writes, a "document" event with
+    the file once each PDF is rendered, and a final "done" event. For "both" the two
+    documents stream concurrently, interleaved. If generation fails part way, a
+    "discard" event ({type}) says to drop that document's text so far, and the
+    template it falls back to follows as a "token" event.
+    """
+    user_id = get_current_user_id(credentials.credentials)
+    if document_type not in DOCUMENT_TYPES:
+        raise HTTPException(status_code=400, detail="document_type must be cover_letter, optimized_resume, or both")
+    user_info = await load_user_info(request.app.mongodb, user_id)
+    
+    kinds = ["cover_letter", "optimized_resume"] if document_type == "both" else [document_type]
+    events: asyncio.Queue = asyncio.Queue()
+    
+    async def produce(kind: str):
+        suffix, render_type = STREAMED_DOCUMENTS[kind]
+        fallback = fallback_cover_letter if kind == "cover_letter" else fallback_optimized_resume
+        parts = []
+        try:
+            service = get_groq_service()
+            if kind == "cover_letter":
+                chunks = service.stream_cover_letter(user_info, job_description)
+            else:
+                chunks = service.stream_optimized_resume(user_info, job_description)
+            async for text in chunks:
+                parts.append(text)
+                await events.put(_sse("token", {"type": kind, "text": text}))
+        except Exception:
+            # An unfinished stream is never rendered: tell the client to drop it and send the template
+            if parts:
+                await events.put(_sse("discard", {"type": kind}))
+            parts = [fallback(user_info)]
+            await events.put(_sse("token", {"type": kind, "text": parts[0]}))
+        
+        # Render once the full text is known
+        path = await create_latex_pdf("".join(parts), render_type, user_info["name"], user_id)
+        document = {
+            "type": kind,
+            "filename": f"{user_info['name'].replace(' ', '_')}_{suffix}.pdf",
+            "path": path
+        }
+        await events.put(_sse("document", document))
+        return document
+    
+    async def stream():
+        tasks = [asyncio.create_task(produce(kind)) for kind in kinds]
+        finished = asyncio.gather(*tasks)
+        getter = None
+        try:
+            while not (finished.done() and events.empty()):
+                getter = asyncio.create_task(events.get())
+                await asyncio.wait({getter, finished}, return_when=asyncio.FIRST_COMPLETED)
+                if getter.done():
+                    yield getter.result()
+                else:
+                    getter.cancel()
+            files = finished.result()
+            yield _sse("done", {"success": True, "files": files})
+        except Exception as e:
+            yield _sse("error", {"detail": f"Error generating documents: {str(e)}"})
+        finally:
+            # Client disconnected or generation failed: stop the remaining producers
+            if getter is not None:
+                getter.cancel()
+            for task in tasks:
+                task.cancel()
+    
+    return StreamingResponse(
+        stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
 async def generate_cover_letter(user_info: Dict[str, Any], job_description: str) -> str:
     """Generate a tailored cover letter using Groq AI"""
     
@@ -472,8 +759,11 @@ async def generate_cover_letter(user_info: Dict[str, Any], job_description: str)
         response = await get_groq_service().generate_cover_letter(user_info, job_description)
         return response
     except Exception as e:
-        # Fallback cover letter template
-        return f"""
+        return fallback_cover_letter(user_info)
+
+def fallback_cover_letter(user_info: Dict[str, Any]) -> str:
+    """Template cover letter used when the AI service is unavailable"""
+    return f"""
 Dear Hiring Manager,
 
 I am writing to express my strong interest in the position you have advertised. As a {user_info['job_preference']} with experience from {user_info['origin_country']}, I am excited about the opportunity to contribute to your team in {user_info['location']}, Canada.
@@ -495,8 +785,11 @@ async def generate_optimized_resume(user_info: Dict[str, Any], job_description:
         response = await get_groq_service().generate_optimized_resume(user_info, job_description)
         return response
     except Exception as e:
-        # Fallback optimized resume
-        return f"""
+        return fallback_optimized_resume(user_info)
+
+def fallback_optimized_resume(user_info: Dict[str, Any]) -> str:
+    """Template optimized resume used when the AI service is unavailable"""
+    return f"""
 {user_info['name'].upper()}
 {user_info['location']}, Canada
 
@@ -518,22 +811,46 @@ ADDITIONAL INFORMATION
 • Committed to continuous learning and professional development
 """
 
-async def create_latex_pdf(content: str, document_type: str, user_name: str) -> str:
-    """Create a PDF using ReportLab instead of LaTeX"""
+async def render_pdf(content: str, document_type: str, user_name: str) -> bytes:
+    """Render a document to PDF bytes on the render worker pool"""
+    return await render_pool.run(render_document, document_type, content, user_name)
+
+async def create_latex_pdf(content: str, document_type: str, user_name: str, owner: str) -> str:
+    """Render a document with ReportLab and store it for ``owner``; returns its blob id"""
     
+    suffix = "Cover_Letter" if document_type == "cover_letter" else "Optimized_Resume"
+    filename = f"{user_name.replace(' ', '_').replace('/', '_')}_{suffix}.pdf"
     try:
-        if document_type == "cover_letter":
-            pdf_path = pdf_editor.create_cover_letter_pdf(content, user_name, f"{user_name}_Cover_Letter.pdf")
-        else:  # resume
-            pdf_path = pdf_editor.create_resume_pdf(content, user_name, f"{user_name}_Optimized_Resume.pdf")
-        
-        return pdf_path
-        
+        content_type = "application/pdf"
+        blob_id = await blob_store.put(await render_pdf(content, document_type, user_name), content_type)
     except Exception as e:
-        # Fallback: create a simple text file
-        with tempfile.NamedTemporaryFile(mode='w', delete=False, suffix='.txt') as temp_file:
-            temp_file.write(content)
-            return temp_file.name
+        # Fallback: store the plain text
+        filename = filename[:-len(".pdf")] + ".txt"
+        content_type = "text/plain; charset=utf-8"
+        blob_id = await blob_store.put(content.encode("utf-8"), content_type)
+    
+    await blob_store.add_document(owner, blob_id, filename, document_type, content_type)
+    return blob_id
+
+# Cross-origin iframe previews; PDF.js needs the range headers exposed to load incrementally
+PREVIEW_HEADERS = {
+    'Access-Control-Allow-Origin': '*',
+    'Access-Control-Allow-Methods': 'GET',
+    'Access-Control-Allow-Headers': 'Content-Type, Authorization, Range, If-None-Match',
+    'Access-Control-Expose-Headers': 'Accept-Ranges, Content-Range, Content-Length, ETag'
+}
+
+async def generated_document_response(request: Request, user_id: str, blob_id: str, disposition: str, headers: Optional[Dict[str, str]] = None):
+    """Serve one of the user's generated documents, by blob id"""
+    document = await blob_store.find_document(user_id, blob_id) if is_blob_id(blob_id) else None
+    if not document:
+        raise HTTPException(status_code=404, detail="Generated document not found")
+    
+    # Addressed by content hash: the bytes behind this URL never change
+    return await serve_blob(
+        request, blob_id, document["filename"], document.get("content_type", "application/pdf"),
+        disposition, IMMUTABLE, headers
+    )
 
 @router.get("/preview-generated/{file_path:path}")
 async def preview_generated_document(
@@ -546,25 +863,8 @@ async def preview_generated_document(
         # Verify user using token from query parameter
         user_id = get_current_user_id(token)
         
-        # Check if the file exists
-        if not os.path.exists(file_path):
-            raise HTTPException(status_code=404, detail="Generated document not found")
-        
-        # Get filename from path
-        filename = os.path.basename(file_path)
-        
         # Return the PDF file with proper headers for iframe preview
-        return FileResponse(
-            path=file_path,
-            filename=filename,
-            media_type='application/pdf',
-            headers={
-                'Content-Disposition': f'inline; filename="{filename}"',
-                'Access-Control-Allow-Origin': '*',
-                'Access-Control-Allow-Methods': 'GET',
-                'Access-Control-Allow-Headers': 'Content-Type, Authorization'
-            }
-        )
+        return await generated_document_response(request, user_id, file_path, "inline", PREVIEW_HEADERS)
         
     except HTTPException:
         raise
@@ -582,22 +882,8 @@ async def download_generated_document(
         # Verify user
         user_id = get_current_user_id(credentials.credentials)
         
-        # Check if the file exists
-        if not os.path.exists(file_path):
-            raise HTTPException(status_code=404, detail="Generated document not found")
-        
-        # Get filename from path
-        filename = os.path.basename(file_path)
-        
         # Return the PDF file for download
-        return FileResponse(
-            path=file_path,
-            filename=filename,
-            media_type='application/pdf',
-            headers={
-                'Content-Disposition': f'attachment; filename="{filename}"'
-            }
-        )
+        return await generated_document_response(request, user_id, file_path, "attachment")
         
     except HTTPException:
         raise
@@ -617,78 +903,35 @@ async def preview_resume(
         db = request.app.mongodb
         
         user = await db.users.find_one({"_id": ObjectId(user_id)})
-        if not user or not user.get("resume_file_path"):
+        if not user or not (user.get("resume_blob") or user.get("resume_file_path")):
             raise HTTPException(status_code=404, detail="Resume file not found")
         
-        file_path = user["resume_file_path"]
-        if not os.path.exists(file_path):
-            raise HTTPException(status_code=404, detail="Resume file not found")
-        
-        filename = os.path.basename(file_path)
-        return FileResponse(
-            path=file_path,
-            filename=filename,
-            media_type='application/pdf',
-            headers={
-                'Content-Disposition': f'inline; filename="{filename}"',
-                'Access-Control-Allow-Origin': '*',
-                'Access-Control-Allow-Methods': 'GET',
-                'Access-Control-Allow-Headers': 'Content-Type, Authorization'
-            }
-        )
+        filename = user.get("resume_filename") or "resume.pdf"
+        return await resume_file_response(request, user, filename, "inline", PREVIEW_HEADERS)
     except HTTPException:
         raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error previewing resume: {str(e)}")
 
-async def perform_basic_ats_analysis(resume_file: UploadFile, job_description: str, temp_file_path: str) -> dict:
-    """Perform basic ATS analysis when web scraping fails"""
-    try:
-        # Read the resume content
-        with open(temp_file_path, 'rb') as f:
-            resume_content = f.read()
-        
-        # Parse the PDF to extract text
-        parse_result = resume_parser.extract_text_from_pdf(resume_content)
-        resume_text = str(parse_result.get('full_text', '')) if parse_result.get('parsed_successfully') else ''
-        
-        # Basic keyword matching
-        job_keywords = set(job_description.lower().split())  # type: ignore
-        resume_keywords = set(resume_text.lower().split())
-        
-        # Calculate basic match percentage
-        common_keywords = job_keywords.intersection(resume_keywords)
-        match_percentage = len(common_keywords) / len(job_keywords) * 100 if job_keywords else 0
-        
-        # Generate basic feedback
-        feedback = [
-            f"Basic ATS Analysis Results:",
-            f"Keyword Match: {len(common_keywords)} out of {len(job_keywords)} keywords found",
-            f"Match Percentage: {match_percentage:.1f}%",
-            "",
-            "Recommendations:",
-            "• Ensure your resume includes relevant keywords from the job description",
-            "• Use industry-standard terminology",
-            "• Include specific skills and technologies mentioned in the job posting",
-            "• Keep formatting simple and ATS-friendly",
-            "• Avoid graphics, tables, or complex layouts"
-        ]
-        
-        if common_keywords:
-            feedback.append(f"• Found keywords: {', '.join(list(common_keywords)[:10])}")
-        
-        return {
-            "success": True,
-            "feedback": feedback,
-            "resume_filename": resume_file.filename,
-            "job_description_preview": job_description[:100] + "..." if len(job_description) > 100 else job_description,
-            "match_percentage": round(match_percentage, 1),
-            "analysis_type": "basic"
-        }
-        
-    finally:
-        # Clean up temporary file
-        try:
-            os.unlink(temp_file_path)
-        except:
-            pass 
\ No newline at end of file
+async def perform_basic_ats_analysis(resume_content: bytes, filename: str, job_description: str, db=None) -> dict:
+    """Score a resume against a job description with the in-process ATS engine"""
+    parse_result = await parse_pdf(resume_content, db)
+    if not parse_result.get('parsed_successfully'):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Failed to parse PDF: {parse_result.get('error', 'Unknown error')}"
+        )
+    
+    result = ats_scorer.score(parse_result, job_description)
+    
+    return {
+        "success": True,
+        "feedback": result["feedback"],
+        "resume_filename": filename,
+        "job_description_preview": job_description[:100] + "..." if len(job_description) > 100 else job_description,
+        "match_percentage": result["match_percentage"],
+        "skill_coverage": result["skill_coverage"],
+        "matched_skills": result["matched_skills"],
+        "missing_keywords": result["missing_keywords"],
+        "analysis_type": "native"
+    }
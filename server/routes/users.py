@@ -6,6 +6,7 @@ from datetime import datetime
 
 from models.user import UserUpdate, UserResponse
 from utils.auth import get_current_user_id
+from utils.blob_store import blob_store
 from database import get_database
 
 router = APIRouter()
@@ -108,14 +109,18 @@ async def delete_account(
         # Get database directly from app state
         db = request.app.mongodb
         
-        result = await db.users.delete_one({"_id": ObjectId(user_id)})
+        user = await db.users.find_one_and_delete({"_id": ObjectId(user_id)}, projection={"resume_blob": 1})
         
-        if result.deleted_count == 0:
+        if not user:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="User not found"
             )
         
+        # Drop the account's references to stored files
+        await blob_store.release(user.get("resume_blob"))
+        await blob_store.release_documents(user_id)
+        
         return {"message": "Account deleted successfully"}
         
     except HTTPException:
@@ -0,0 +1,6 @@
+import os
+import sys
+
+# Run from any directory: the server modules import each other as top-level packages
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("JWT_SECRET", "test-secret")
@@ -0,0 +1,41 @@
+import pytest
+
+from utils.ats_engine import ats_scorer, score_jobs
+
+RESUME = {
+    "full_text": "Experience Built REST APIs in Python with FastAPI and PostgreSQL. Skills Python, Docker, React",
+    "clean_text": "Experience Built REST APIs in Python with FastAPI and PostgreSQL. Skills Python, Docker, React",
+    "structured_content": {
+        "experience": "Built REST APIs in Python with FastAPI and PostgreSQL on AWS for a logistics team",
+        "skills": "Python, Docker, React, SQL"
+    },
+    "keywords": ["python", "fastapi", "postgresql", "docker", "react", "sql", "aws"]
+}
+
+JOBS = [
+    "Senior backend engineer: Python, FastAPI, PostgreSQL and Redis. Experience with AWS and Kubernetes a plus.",
+    "Frontend developer with React, TypeScript and GraphQL; you will own our design system.",
+    "Data analyst comfortable with SQL, Tableau and stakeholder reporting.",
+    "We are hiring a friendly barista for weekend shifts.",
+    ""
+]
+
+def test_score_many_matches_score():
+    batch = ats_scorer.score_many(RESUME, JOBS)
+    assert len(batch) == len(JOBS)
+    for job_description, fast in zip(JOBS, batch):
+        single = ats_scorer.score(RESUME, job_description)
+        for key in ("match_percentage", "skill_coverage", "term_match"):
+            assert fast[key] == pytest.approx(single[key], abs=0.1), (key, job_description)
+        assert fast["missing_skills"] == single["missing_skills"][:ats_scorer.max_missing]
+        assert fast["engine_version"] == single["engine_version"]
+
+def test_score_many_without_keywords_falls_back_to_text():
+    resume = {**RESUME, "keywords": []}
+    for job_description, fast in zip(JOBS, score_jobs(resume, JOBS)):
+        single = ats_scorer.score(resume, job_description)
+        assert fast["match_percentage"] == pytest.approx(single["match_percentage"], abs=0.1)
+        assert fast["missing_skills"] == single["missing_skills"][:ats_scorer.max_missing]
+
+def test_score_many_of_nothing_is_empty():
+    assert ats_scorer.score_many(RESUME, []) == []
@@ -0,0 +1,47 @@
+import pytest
+from fastapi import FastAPI, Request
+from fastapi.testclient import TestClient
+
+from utils.blob_store import LocalBlobBackend, blob_store
+from utils.file_serving import IMMUTABLE, blob_etag, serve_blob
+
+DATA = bytes(range(256)) * 4
+
+@pytest.fixture
+def client(tmp_path, monkeypatch):
+    backend = LocalBlobBackend(str(tmp_path))
+    blob_id = blob_store.blob_id(DATA)
+    backend._write(blob_id, DATA)
+    monkeypatch.setattr(blob_store, "backend", backend)
+
+    app = FastAPI()
+
+    @app.get("/blob")
+    async def blob(request: Request):
+        return await serve_blob(request, blob_id, "file.pdf", "application/pdf", "inline", IMMUTABLE)
+
+    return TestClient(app), blob_id
+
+def test_range_returns_partial_content(client):
+    http, _ = client
+    response = http.get("/blob", headers={"Range": "bytes=0-9"})
+    assert response.status_code == 206
+    assert response.content == DATA[:10]
+
+def test_range_with_matching_if_range_returns_partial_content(client):
+    http, blob_id = client
+    response = http.get("/blob", headers={"Range": "bytes=10-19", "If-Range": blob_etag(blob_id)})
+    assert response.status_code == 206
+    assert response.content == DATA[10:20]
+    assert response.headers["etag"] == blob_etag(blob_id)
+
+def test_range_with_stale_if_range_returns_whole_file(client):
+    http, _ = client
+    response = http.get("/blob", headers={"Range": "bytes=10-19", "If-Range": '"stale"'})
+    assert response.status_code == 200
+    assert response.content == DATA
+
+def test_matching_if_none_match_returns_not_modified(client):
+    http, blob_id = client
+    response = http.get("/blob", headers={"If-None-Match": blob_etag(blob_id)})
+    assert response.status_code == 304
@@ -0,0 +1,91 @@
+import asyncio
+from datetime import datetime, timedelta
+
+import pytest
+from bson import ObjectId
+
+mongomock_motor = pytest.importorskip("mongomock_motor")
+
+from utils.job_queue import JobQueue
+
+def make_queue(max_attempts=2):
+    queue = JobQueue(name=f"test_jobs_{ObjectId()}", concurrency=1, max_pending=10,
+                     collection_name="jobs", lease_seconds=60, max_attempts=max_attempts)
+    return queue, mongomock_motor.AsyncMongoMockClient()["test"]
+
+async def wait_for_status(queue, job_id, status):
+    for _ in range(100):
+        job = await queue.collection.find_one({"_id": job_id})
+        if job["status"] == status:
+            return job
+        await asyncio.sleep(0.01)
+    raise AssertionError(f"job never reached {status}")
+
+def test_shutdown_requeues_running_job():
+    async def scenario():
+        queue, db = make_queue()
+        started = asyncio.Event()
+
+        async def handler(job, report):
+            started.set()
+            await asyncio.sleep(10)
+
+        queue.register("slow", handler)
+        await queue.start(db)
+        job = await queue.enqueue("slow", str(ObjectId()), {})
+        await started.wait()
+        await queue.shutdown()
+        stored = await queue.collection.find_one({"_id": job["_id"]})
+        assert stored["status"] == "queued"
+        assert "lease_expires_at" not in stored
+
+        # The next start runs it again
+        async def finish(job, report):
+            return {"ok": True}
+        queue.register("slow", finish)
+        await queue.start(db)
+        done = await wait_for_status(queue, job["_id"], "completed")
+        await queue.shutdown()
+        assert done["result"] == {"ok": True}
+        assert done["attempts"] == 2
+
+    asyncio.run(scenario())
+
+def test_shutdown_fails_job_out_of_attempts():
+    async def scenario():
+        queue, db = make_queue(max_attempts=1)
+        started = asyncio.Event()
+
+        async def handler(job, report):
+            started.set()
+            await asyncio.sleep(10)
+
+        queue.register("slow", handler)
+        await queue.start(db)
+        job = await queue.enqueue("slow", str(ObjectId()), {})
+        await started.wait()
+        await queue.shutdown()
+        stored = await queue.collection.find_one({"_id": job["_id"]})
+        assert stored["status"] == "failed"
+
+    asyncio.run(scenario())
+
+def test_recovery_requeues_expired_lease_then_fails_when_out_of_attempts():
+    async def scenario():
+        queue, db = make_queue(max_attempts=2)
+        queue._db = db
+        queue._queue = asyncio.Queue()
+        expired = datetime.utcnow() - timedelta(seconds=1)
+        retry_id, exhausted_id, live_id = ObjectId(), ObjectId(), ObjectId()
+        await queue.collection.insert_many([
+            {"_id": retry_id, "status": "running", "attempts": 1, "lease_expires_at": expired},
+            {"_id": exhausted_id, "status": "running", "attempts": 2, "lease_expires_at": expired},
+            {"_id": live_id, "status": "running", "attempts": 1, "lease_expires_at": datetime.utcnow() + timedelta(seconds=60)}
+        ])
+        await queue._recover()
+        statuses = {doc["_id"]: doc["status"] async for doc in queue.collection.find({})}
+        assert statuses == {retry_id: "queued", exhausted_id: "failed", live_id: "running"}
+        assert queue._queue.get_nowait() == retry_id
+        assert queue._queue.empty()
+
+    asyncio.run(scenario())
@@ -0,0 +1,42 @@
+import asyncio
+
+from utils import pdf_parser
+from utils.pdf_parser import count_pdf_pages, extract_page_range, parse_in_pool
+
+class FakePool:
+    """Runs jobs in-process; ``fail_start`` makes the range job starting there raise."""
+
+    max_workers = 4
+
+    def __init__(self, page_count, fail_start=None):
+        self.page_count = page_count
+        self.fail_start = fail_start
+        self.cancelled = 0
+
+    async def run(self, fn, *args):
+        if fn is count_pdf_pages:
+            return self.page_count
+        if fn is extract_page_range:
+            _, start, stop = args
+            if start == self.fail_start:
+                raise ValueError("corrupt page")
+            try:
+                await asyncio.sleep(0.05)
+            except asyncio.CancelledError:
+                self.cancelled += 1
+                raise
+            return [f"page {index}" for index in range(start, stop)]
+        return fn(*args)
+
+def test_range_failure_returns_unparsed_result_and_cancels_other_ranges(monkeypatch):
+    monkeypatch.setattr(pdf_parser, "PARALLEL_MIN_BYTES", 0)
+    pool = FakePool(page_count=8, fail_start=0)
+    result = asyncio.run(parse_in_pool(pool, b"%PDF-1.4"))
+    assert result["parsed_successfully"] is False
+    assert result["error"] == "corrupt page"
+    assert pool.cancelled == 3
+
+def test_ranges_are_merged_in_page_order(monkeypatch):
+    monkeypatch.setattr(pdf_parser, "PARALLEL_MIN_BYTES", 0)
+    result = asyncio.run(parse_in_pool(FakePool(page_count=8), b"%PDF-1.4"))
+    assert result["full_text"].index("page 0") < result["full_text"].index("page 7")
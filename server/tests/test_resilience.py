@@ -0,0 +1,143 @@
+import asyncio
+
+import pytest
+
+from utils import resilience
+from utils.resilience import AdaptiveTokenBucket, CircuitBreaker, CircuitOpenError, RetryPolicy, call_with_resilience
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+class Upstream(Exception):
+    pass
+
+class BadRequest(Exception):
+    pass
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(resilience.time, "monotonic", clock)
+    return clock
+
+def open_breaker(name, clock, threshold=2):
+    breaker = CircuitBreaker(name, failure_threshold=threshold, recovery_timeout=30.0)
+    for _ in range(threshold):
+        breaker.record_failure()
+    return breaker
+
+def resilient(breaker, call, is_retryable=lambda e: isinstance(e, Upstream)):
+    return call_with_resilience(
+        call,
+        AdaptiveTokenBucket(f"{breaker.name}_limiter", rate=1000.0, capacity=1000.0),
+        breaker,
+        RetryPolicy(max_attempts=3, base_delay=0.0),
+        is_retryable,
+        lambda e: False,
+        lambda e: None
+    )
+
+def test_opens_after_consecutive_failures(clock):
+    breaker = CircuitBreaker("test_opens", failure_threshold=3, recovery_timeout=30.0)
+    breaker.record_failure()
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.CLOSED
+    breaker.record_success()
+    breaker.record_failure()
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.CLOSED
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.OPEN
+    with pytest.raises(CircuitOpenError):
+        breaker.check()
+
+def test_half_open_lets_a_single_probe_through(clock):
+    breaker = open_breaker("test_single_probe", clock)
+    clock.now += 29
+    assert not breaker.allow()
+    clock.now += 1
+    assert breaker.allow()
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+    assert not breaker.allow()
+
+def test_probe_success_closes(clock):
+    breaker = open_breaker("test_probe_success", clock)
+    clock.now += 30
+    assert breaker.allow()
+    breaker.record_success()
+    assert breaker.state == CircuitBreaker.CLOSED
+    assert breaker.allow() and breaker.allow()
+
+def test_probe_failure_reopens(clock):
+    breaker = open_breaker("test_probe_failure", clock)
+    clock.now += 30
+    assert breaker.allow()
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.OPEN
+    assert not breaker.allow()
+    clock.now += 30
+    assert breaker.allow()
+
+def test_cancelled_probe_is_released(clock):
+    breaker = open_breaker("test_cancelled_probe", clock)
+    clock.now += 30
+
+    async def scenario():
+        started = asyncio.Event()
+
+        async def hang():
+            started.set()
+            await asyncio.Event().wait()
+
+        probe = asyncio.ensure_future(resilient(breaker, hang))
+        await started.wait()
+        assert not breaker.allow()
+        probe.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await probe
+
+    asyncio.run(scenario())
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+    assert breaker.allow()
+
+def test_non_retryable_error_releases_probe_without_judging(clock):
+    breaker = open_breaker("test_caller_error", clock)
+    clock.now += 30
+
+    async def bad_request():
+        raise BadRequest()
+
+    with pytest.raises(BadRequest):
+        asyncio.run(resilient(breaker, bad_request))
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+    assert breaker.allow()
+
+def test_retries_then_succeeds_and_closes(clock):
+    breaker = CircuitBreaker("test_retries", failure_threshold=5, recovery_timeout=30.0)
+    calls = []
+
+    async def flaky():
+        calls.append(1)
+        if len(calls) < 3:
+            raise Upstream()
+        return "ok"
+
+    assert asyncio.run(resilient(breaker, flaky)) == "ok"
+    assert len(calls) == 3
+    assert breaker.state == CircuitBreaker.CLOSED
+    assert breaker._failures == 0
+
+def test_open_circuit_fails_fast_without_calling(clock):
+    breaker = open_breaker("test_fail_fast", clock)
+    calls = []
+
+    async def call():
+        calls.append(1)
+
+    with pytest.raises(CircuitOpenError):
+        asyncio.run(resilient(breaker, call))
+    assert calls == []
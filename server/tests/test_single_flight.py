@@ -0,0 +1,101 @@
+import asyncio
+
+import pytest
+
+from utils.llm_cache import LLMCache
+from utils.search_cache import JobSearchCache
+from utils.single_flight import SingleFlight
+
+def test_concurrent_calls_share_one_run():
+    async def scenario():
+        flights = SingleFlight()
+        calls = []
+
+        async def call():
+            calls.append(1)
+            await asyncio.sleep(0.01)
+            return "result"
+
+        results = await asyncio.gather(*[flights.do("key", call) for _ in range(5)])
+        assert calls == [1]
+        assert sorted(shared for _, shared in results) == [False, True, True, True, True]
+        assert {result for result, _ in results} == {"result"}
+        assert "key" not in flights
+
+    asyncio.run(scenario())
+
+def test_leader_exception_reaches_waiters():
+    async def scenario():
+        flights = SingleFlight()
+
+        async def call():
+            await asyncio.sleep(0.01)
+            raise ValueError("upstream failed")
+
+        results = await asyncio.gather(*[flights.do("key", call) for _ in range(3)], return_exceptions=True)
+        assert all(isinstance(result, ValueError) for result in results)
+
+    asyncio.run(scenario())
+
+def test_waiter_takes_over_when_leader_is_cancelled():
+    async def scenario():
+        flights = SingleFlight()
+        calls = []
+
+        async def call():
+            calls.append(1)
+            await asyncio.sleep(0.05)
+            return len(calls)
+
+        leader = asyncio.create_task(flights.do("key", call))
+        await asyncio.sleep(0.01)
+        waiters = [asyncio.create_task(flights.do("key", call)) for _ in range(3)]
+        await asyncio.sleep(0.01)
+        leader.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await leader
+
+        results = await asyncio.gather(*waiters)
+        assert len(calls) == 2
+        assert [result for result, _ in results] == [2, 2, 2]
+        assert sorted(shared for _, shared in results) == [False, True, True]
+
+    asyncio.run(scenario())
+
+def test_llm_cache_coalesces_and_caches():
+    async def scenario():
+        cache = LLMCache(max_entries=8)
+        calls = []
+
+        async def generate():
+            calls.append(1)
+            await asyncio.sleep(0.01)
+            return "text", 42
+
+        texts = await asyncio.gather(*[cache.get_or_generate("key", generate) for _ in range(3)])
+        assert texts == ["text"] * 3
+        assert await cache.get_or_generate("key", generate) == "text"
+        assert calls == [1]
+
+    asyncio.run(scenario())
+
+def test_search_cache_waiter_takes_over_when_leader_is_cancelled():
+    async def scenario():
+        cache = JobSearchCache(max_entries=8)
+        calls = []
+
+        async def fetch():
+            calls.append(1)
+            await asyncio.sleep(0.05)
+            return [{"job_title": f"call {len(calls)}"}]
+
+        leader = asyncio.create_task(cache.get_or_fetch("key", fetch))
+        await asyncio.sleep(0.01)
+        waiters = [asyncio.create_task(cache.get_or_fetch("key", fetch)) for _ in range(3)]
+        await asyncio.sleep(0.01)
+        leader.cancel()
+        results = await asyncio.gather(*waiters)
+        assert results == [[{"job_title": "call 2"}]] * 3
+        assert (await cache.get("key"))["results"] == [{"job_title": "call 2"}]
+
+    asyncio.run(scenario())
@@ -0,0 +1,43 @@
+import asyncio
+from datetime import datetime, timedelta
+
+import pytest
+
+mongomock_motor = pytest.importorskip("mongomock_motor")
+
+from utils.llm_cache import LLMCache
+from utils.parse_cache import ParseCache
+
+def test_entries_are_shared_through_mongo():
+    async def scenario():
+        db = mongomock_motor.AsyncMongoMockClient()["test"]
+        writer, reader = ParseCache(max_entries=8), ParseCache(max_entries=8)
+        await writer.put(db, "key", {"parsed_successfully": True})
+        assert await reader.get(db, "key") == {"parsed_successfully": True}
+        assert (await db.parse_cache.find_one({"_id": "key"}))["created_at"] is not None
+
+    asyncio.run(scenario())
+
+def test_lru_evicts_oldest_entry():
+    async def scenario():
+        cache = ParseCache(max_entries=2)
+        for key in ("a", "b", "c"):
+            await cache.put(None, key, {"key": key})
+        assert await cache.get(None, "a") is None
+        assert await cache.get(None, "c") == {"key": "c"}
+
+    asyncio.run(scenario())
+
+def test_expired_entries_are_misses_in_both_tiers():
+    async def scenario():
+        db = mongomock_motor.AsyncMongoMockClient()["test"]
+        cache = LLMCache(max_entries=8)
+        cache.attach(db)
+        await cache.put("key", "text", 1, 0.1)
+        assert await cache.cached("key") == "text"
+
+        await db.llm_cache.update_one({"_id": "key"}, {"$set": {"expires_at": datetime.utcnow() - timedelta(seconds=1)}})
+        cache._entries["key"]["expires_at"] = datetime.utcnow() - timedelta(seconds=1)
+        assert await cache.cached("key") is None
+
+    asyncio.run(scenario())
@@ -0,0 +1,81 @@
+import hashlib
+import os
+
+import pytest
+from fastapi import FastAPI, Request
+from fastapi.testclient import TestClient
+
+from utils import uploads
+from utils.uploads import receive_file
+
+PDF = b"%PDF-1.4\n" + b"x" * 1000
+
+@pytest.fixture
+def client(tmp_path):
+    app = FastAPI()
+
+    @app.post("/upload")
+    async def upload(request: Request):
+        received = await receive_file(
+            request,
+            field="file",
+            max_bytes=2048,
+            spool_dir=str(tmp_path),
+            allowed_suffixes=(".pdf",),
+            magic=b"%PDF-",
+            fields=("note",)
+        )
+        try:
+            return {
+                "filename": received.filename,
+                "sha256": received.sha256,
+                "size": received.size,
+                "fields": received.fields
+            }
+        finally:
+            received.discard()
+
+    return TestClient(app), tmp_path
+
+def test_accepts_pdf_and_collects_requested_fields(client):
+    http, spool = client
+    response = http.post(
+        "/upload",
+        files={"file": ("resume.pdf", PDF, "application/pdf")},
+        data={"note": "hello", "ignored": "x"}
+    )
+    assert response.status_code == 200
+    body = response.json()
+    assert body["size"] == len(PDF)
+    assert body["sha256"] == hashlib.sha256(PDF).hexdigest()
+    assert body["fields"] == {"note": "hello"}
+    assert os.listdir(spool) == []
+
+def test_rejects_oversized_file(client):
+    http, spool = client
+    response = http.post("/upload", files={"file": ("resume.pdf", PDF * 3, "application/pdf")})
+    assert response.status_code == 413
+    assert os.listdir(spool) == []
+
+def test_rejects_content_without_magic_bytes(client):
+    http, spool = client
+    response = http.post("/upload", files={"file": ("resume.pdf", b"<html></html>", "application/pdf")})
+    assert response.status_code == 400
+    assert response.json()["detail"] == "File content does not match its type"
+    assert os.listdir(spool) == []
+
+def test_rejects_wrong_suffix(client):
+    http, _ = client
+    response = http.post("/upload", files={"file": ("resume.exe", PDF, "application/pdf")})
+    assert response.status_code == 400
+
+def test_rejects_oversized_form_field(client, monkeypatch):
+    monkeypatch.setattr(uploads, "MAX_FORM_FIELD_BYTES", 16)
+    http, spool = client
+    response = http.post(
+        "/upload",
+        files={"file": ("resume.pdf", PDF, "application/pdf")},
+        data={"note": "y" * 100}
+    )
+    assert response.status_code == 413
+    assert os.listdir(spool) == []
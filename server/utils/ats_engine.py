@@ -0,0 +1,324 @@
+import math
+import logging
+import numpy as np
+from scipy import sparse
+from collections import Counter
+from typing import Any, Dict, Iterable, List, Set, Tuple
+
+from utils.skills_taxonomy import SkillsTaxonomy, skills_taxonomy
+from utils.text_matcher import tokenize
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+# Bump whenever scoring changes so stored evaluations are recomputed
+ENGINE_VERSION = "2"
+
+# How much a term found in each resume section counts as evidence
+SECTION_WEIGHTS = {
+    'skills': 1.0,
+    'experience': 1.0,
+    'general': 0.8,
+    'education': 0.6
+}
+
+# Words that carry no signal about fit in job postings
+STOPWORDS = frozenset("""
+a about above across after again against all also am an and any are as at be because been before being
+below between both but by can could did do does doing down during each either etc few for from further
+had has have having he her here hers him his how i if in into is it its itself just may me might more
+most must my no nor not now of off on once only or other our ours out over own per same she should so
+some such than that the their theirs them then there these they this those through to too under until
+up upon us very via was we were what when where which while who whom why will with within without would
+you your yours
+ability able about applicant applicants apply candidate candidates company including job jobs looking
+new opportunity opportunities position positions preferred required requirement requirements
+responsibilities responsible role roles seeking strong team work working year years plus well
+experience experienced skill skills knowledge understanding familiarity proficiency proficient bonus
+excellent good great ideal ideally environment
+""".split())
+
+class ATSScorer:
+    """
+    In-process ATS scoring of a parsed resume against a job description.
+
+    The match blends two signals:
+
+    - skill coverage: share of the taxonomy skills named in the job
+      description that also appear in the resume, each skill weighted by its
+      taxonomy IDF so specialized skills count more than ones shared by many
+      occupations (``skill_coverage`` in results is the unweighted share)
+    - term match: job-description terms weighted with BM25-style saturating
+      term frequency, each credited by the best resume section it appears in
+      (section-length normalized and scaled by ``SECTION_WEIGHTS``)
+
+    Terms get no IDF: scoring sees one posting at a time, with no corpus to
+    count document frequencies in, so ``STOPWORDS`` stands in for the
+    low-IDF vocabulary of job postings instead.
+    """
+
+    def __init__(
+        self,
+        taxonomy: SkillsTaxonomy = skills_taxonomy,
+        k1: float = 1.2,
+        b: float = 0.75,
+        skill_weight: float = 0.6,
+        max_missing: int = 15
+    ):
+        self.taxonomy = taxonomy
+        self.k1 = k1
+        self.b = b
+        self.skill_weight = skill_weight
+        self.max_missing = max_missing
+        self.skill_idf = self.taxonomy_idf(taxonomy)
+
+    @staticmethod
+    def taxonomy_idf(taxonomy: SkillsTaxonomy) -> np.ndarray:
+        """
+        IDF of each skill over occupations, ``ln(1 + N / n)``, where ``n`` is
+        the number of the ``N`` occupations tagged with it (skills without
+        tags count as belonging to all of them)
+        """
+        occupation_count = len({tag for tags in taxonomy.occupations for tag in tags}) or 1
+        return np.array(
+            [math.log(1 + occupation_count / (len(tags) or occupation_count)) for tags in taxonomy.occupations],
+            dtype=np.float64
+        )
+
+    def weighted_coverage(self, job_skills: Set[int], matched_skills: Set[int]) -> float:
+        """IDF-weighted share of ``job_skills`` found in ``matched_skills``."""
+        total = sum(self.skill_idf[skill_id] for skill_id in job_skills)
+        return float(sum(self.skill_idf[skill_id] for skill_id in matched_skills) / total) if total else 0.0
+
+    @staticmethod
+    def _is_term(token: str) -> bool:
+        return len(token) > 1 and token not in STOPWORDS and token.isalnum() and not token.isdigit()
+
+    def terms(self, text: str) -> List[str]:
+        """Lowercased content terms of ``text``."""
+        return [token for token in tokenize(text.lower()) if self._is_term(token)]
+
+    def analyze_job(self, job_description: str) -> Tuple[Set[int], Dict[str, float]]:
+        """
+        Get the skill ids named in a job description and BM25 query-side
+        weights for its remaining terms (repeated terms matter more, with
+        diminishing returns). Tokens inside a skill mention are left to the
+        skill signal so they aren't counted twice.
+        """
+        tokens_lower = tokenize(job_description.lower())
+        tokens = tokenize(job_description)
+        # Lowercasing can change token boundaries for a few Unicode characters
+        spans = self.taxonomy.match_spans(tokens_lower, tokens if len(tokens) == len(tokens_lower) else None)
+        covered = {index for start, end, _ in spans for index in range(start, end)}
+
+        counts = Counter(
+            token for index, token in enumerate(tokens_lower)
+            if index not in covered and self._is_term(token)
+        )
+        k1 = self.k1
+        weights = {term: tf * (k1 + 1) / (tf + k1) for term, tf in counts.items()}
+        return {skill_id for _, _, skill_id in spans}, weights
+
+    def resume_sections(self, parse_result: Dict[str, Any]) -> Dict[str, str]:
+        sections = parse_result.get('structured_content') or {}
+        if not isinstance(sections, dict) or not sections:
+            sections = {'general': parse_result.get('clean_text') or parse_result.get('full_text') or ''}
+        return sections
+
+    def term_evidence(self, sections: Dict[str, str]) -> Dict[str, float]:
+        """
+        Credit in [0, 1] for each resume term: the best section-weighted,
+        length-normalized BM25 saturation across sections. Presence alone
+        earns most of the credit; repetition adds the rest.
+        """
+        section_terms = {name: Counter(self.terms(text)) for name, text in sections.items()}
+        lengths = {name: sum(counts.values()) for name, counts in section_terms.items()}
+        average_length = (sum(lengths.values()) / len(lengths)) if lengths else 0.0
+        k1, b = self.k1, self.b
+
+        evidence: Dict[str, float] = {}
+        for name, counts in section_terms.items():
+            weight = SECTION_WEIGHTS.get(name, SECTION_WEIGHTS['general'])
+            norm = k1 * (1 - b + b * lengths[name] / average_length) if average_length else k1
+            for term, tf in counts.items():
+                saturation = tf / (tf + norm)
+                credit = weight * (0.6 + 0.4 * saturation)
+                if credit > evidence.get(term, 0.0):
+                    evidence[term] = credit
+        return evidence
+
+    def resume_skill_ids(self, parse_result: Dict[str, Any]) -> Set[int]:
+        ids = {self.taxonomy.id_of(name) for name in parse_result.get('keywords') or []}
+        ids.discard(None)
+        if not ids:
+            ids = self.taxonomy.extract_ids(parse_result.get('full_text') or parse_result.get('clean_text') or '')
+        return ids
+
+    def score(self, parse_result: Dict[str, Any], job_description: str) -> Dict[str, Any]:
+        """Score a ResumeParser result against a job description."""
+        sections = self.resume_sections(parse_result)
+        evidence = self.term_evidence(sections)
+        job_skills, job_weights = self.analyze_job(job_description)
+
+        total_weight = sum(job_weights.values())
+        term_score = (
+            sum(weight * evidence.get(term, 0.0) for term, weight in job_weights.items()) / total_weight
+            if total_weight else 0.0
+        )
+
+        resume_skills = self.resume_skill_ids(parse_result)
+        matched_skills = job_skills & resume_skills
+        skill_coverage = len(matched_skills) / len(job_skills) if job_skills else 0.0
+
+        if job_skills:
+            match = self.skill_weight * self.weighted_coverage(job_skills, matched_skills) + (1 - self.skill_weight) * term_score
+        else:
+            match = term_score
+
+        missing_skills = sorted(self.taxonomy.names[skill_id] for skill_id in job_skills - resume_skills)
+        missing_terms = [
+            term for term, _ in sorted(job_weights.items(), key=lambda item: (-item[1], item[0]))
+            if term not in evidence
+        ]
+        missing_keywords = (missing_skills + missing_terms)[:self.max_missing]
+
+        match_percentage = round(match * 100, 1)
+        return {
+            'match_percentage': match_percentage,
+            'skill_coverage': round(skill_coverage * 100, 1),
+            'term_match': round(term_score * 100, 1),
+            'matched_skills': sorted(self.taxonomy.names[skill_id] for skill_id in matched_skills),
+            'missing_skills': missing_skills,
+            'missing_keywords': missing_keywords,
+            'feedback': self.feedback(match_percentage, missing_keywords, matched_skills, sections),
+            'engine_version': ENGINE_VERSION
+        }
+
+    def score_many(self, parse_result: Dict[str, Any], job_descriptions: List[str]) -> List[Dict[str, Any]]:
+        """
+        Score one resume against many job descriptions at once.
+
+        Each job description is tokenized once into a row of two sparse
+        matrices, jobs x terms (BM25 query weights) and jobs x skills
+        (presence). Every job's term match and skill coverage then come from
+        two sparse matrix-vector products against the resume's evidence and
+        skill vectors, with the same blend as ``score``.
+        """
+        if not job_descriptions:
+            return []
+
+        evidence = self.term_evidence(self.resume_sections(parse_result))
+        resume_skills = self.resume_skill_ids(parse_result)
+
+        vocabulary: Dict[str, int] = {}
+        term_rows: List[int] = []
+        term_cols: List[int] = []
+        term_weights: List[float] = []
+        skill_rows: List[int] = []
+        skill_cols: List[int] = []
+        for row, job_description in enumerate(job_descriptions):
+            job_skills, weights = self.analyze_job(job_description)
+            for term, weight in weights.items():
+                term_rows.append(row)
+                term_cols.append(vocabulary.setdefault(term, len(vocabulary)))
+                term_weights.append(weight)
+            skill_rows.extend([row] * len(job_skills))
+            skill_cols.extend(job_skills)
+
+        job_count = len(job_descriptions)
+        terms = sparse.csr_matrix(
+            (np.asarray(term_weights, dtype=np.float64), (term_rows, term_cols)),
+            shape=(job_count, len(vocabulary))
+        )
+        skills = sparse.csr_matrix(
+            (np.ones(len(skill_rows), dtype=np.float64), (skill_rows, skill_cols)),
+            shape=(job_count, len(self.taxonomy))
+        )
+
+        evidence_vector = np.zeros(len(vocabulary), dtype=np.float64)
+        for term, column in vocabulary.items():
+            evidence_vector[column] = evidence.get(term, 0.0)
+        resume_vector = np.zeros(len(self.taxonomy), dtype=np.float64)
+        resume_vector[list(resume_skills)] = 1.0
+
+        total_weight = np.asarray(terms.sum(axis=1)).ravel()
+        term_score = np.divide(terms @ evidence_vector, total_weight, out=np.zeros(job_count), where=total_weight > 0)
+
+        skill_total = np.asarray(skills.sum(axis=1)).ravel()
+        skill_matched = skills @ resume_vector
+        coverage = np.divide(skill_matched, skill_total, out=np.zeros(job_count), where=skill_total > 0)
+        weighted = skills @ sparse.diags(self.skill_idf)
+        weighted_total = np.asarray(weighted.sum(axis=1)).ravel()
+        weighted_coverage = np.divide(weighted @ resume_vector, weighted_total, out=np.zeros(job_count), where=weighted_total > 0)
+
+        match = np.where(
+            skill_total > 0,
+            self.skill_weight * weighted_coverage + (1 - self.skill_weight) * term_score,
+            term_score
+        )
+
+        # Row-wise skills the job names but the resume lacks
+        missing = skills.multiply(1.0 - resume_vector).tocsr()
+        missing.eliminate_zeros()
+        names = self.taxonomy.names
+
+        return [
+            {
+                'match_percentage': round(float(match[row]) * 100, 1),
+                'skill_coverage': round(float(coverage[row]) * 100, 1),
+                'term_match': round(float(term_score[row]) * 100, 1),
+                'missing_skills': sorted(
+                    names[skill_id] for skill_id in missing.indices[missing.indptr[row]:missing.indptr[row + 1]]
+                )[:self.max_missing],
+                'engine_version': ENGINE_VERSION
+            }
+            for row in range(job_count)
+        ]
+
+    def feedback(
+        self,
+        match_percentage: float,
+        missing_keywords: List[str],
+        matched_skills: Iterable[int],
+        sections: Dict[str, str]
+    ) -> List[str]:
+        """Human-readable feedback in the layout the dashboard parses."""
+        matched = sorted(self.taxonomy.names[skill_id] for skill_id in matched_skills)
+        if match_percentage >= 75:
+            verdict = "Your resume is a strong match for this role."
+        elif match_percentage >= 50:
+            verdict = "Your resume covers the core of this role but misses some of what the posting emphasizes."
+        else:
+            verdict = "Your resume is not yet tailored to this role and may be filtered out by an ATS."
+        if matched:
+            verdict += f" Matching skills: {', '.join(matched[:8])}."
+
+        recommendations = []
+        if missing_keywords:
+            recommendations.append(
+                f"Add the missing keywords you genuinely have, such as {', '.join(missing_keywords[:5])}, in context"
+            )
+        if 'skills' not in sections:
+            recommendations.append("Add a dedicated Skills section so ATS parsers can find your skills")
+        if 'experience' not in sections:
+            recommendations.append("Use a clear Experience heading so your work history is recognized")
+        recommendations.append("Mirror the exact terminology used in the job posting")
+        recommendations.append("Keep formatting simple and avoid tables, columns and graphics")
+
+        return [
+            # Half-up, so 64.5 reads as 65% rather than round()'s 64%
+            f"Match Percentage: {math.floor(match_percentage + 0.5)}%",
+            "",
+            f"Missing Keywords: {', '.join(missing_keywords) if missing_keywords else 'None'}",
+            "",
+            f"Final Thoughts: {verdict}",
+            "",
+            "Recommendations: " + " ".join(f"{item}." for item in recommendations)
+        ]
+
+# Global instance
+ats_scorer = ATSScorer()
+
+def score_jobs(parse_result: Dict[str, Any], job_descriptions: List[str]) -> List[Dict[str, Any]]:
+    """Module-level entry point so batch scoring can run in the worker pool."""
+    return ats_scorer.score_many(parse_result, job_descriptions)
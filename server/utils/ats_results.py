@@ -0,0 +1,89 @@
+import re
+import hashlib
+import logging
+from datetime import datetime
+from typing import Any, Dict, Optional, Tuple
+from bson import ObjectId
+
+from utils.metrics import metrics
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+_WHITESPACE_RE = re.compile(r'\s+')
+
+class ATSResultStore:
+    """
+    Persisted ATS evaluations, doubling as a result cache.
+
+    Each document records one user's evaluation keyed by the SHA-256 of the
+    resume bytes, the hash of the normalized job description and the
+    evaluator (including its version). Evaluation results depend only on
+    that content key, so any earlier evaluation of the same resume and job
+    description - by any user - is reused instead of recomputed.
+    """
+
+    def __init__(self, collection_name: str = "ats_results"):
+        self.collection_name = collection_name
+        self.hits = metrics.counter("ats_result_cache_hits_total", "ATS evaluations served from stored results")
+        self.misses = metrics.counter("ats_result_cache_misses_total", "ATS evaluations that had to be computed")
+
+    @staticmethod
+    def normalize_job_description(job_description: str) -> str:
+        """Case and whitespace differences don't change the evaluation."""
+        return _WHITESPACE_RE.sub(' ', job_description).strip().lower()
+
+    def make_key(self, resume_content: bytes, job_description: str) -> Tuple[str, str]:
+        """Get the ``(resume_hash, jd_hash)`` content key of an evaluation."""
+        resume_hash = hashlib.sha256(resume_content).hexdigest()
+        jd_hash = hashlib.sha256(self.normalize_job_description(job_description).encode("utf-8")).hexdigest()
+        return resume_hash, jd_hash
+
+    async def ensure_indexes(self, db):
+        collection = db[self.collection_name]
+        # "Latest result for a user" is a single indexed read
+        await collection.create_index([("user_id", 1), ("created_at", -1)])
+        await collection.create_index([("resume_hash", 1), ("jd_hash", 1), ("evaluator", 1)])
+
+    async def find(self, db, resume_hash: str, jd_hash: str, evaluator: str) -> Optional[Dict[str, Any]]:
+        """Get a stored result for this content key, if any."""
+        try:
+            doc = await db[self.collection_name].find_one(
+                {"resume_hash": resume_hash, "jd_hash": jd_hash, "evaluator": evaluator, "status": "completed"},
+                sort=[("created_at", -1)]
+            )
+        except Exception as e:
+            logger.warning(f"ATS result lookup failed: {e}")
+            return None
+        if doc:
+            self.hits.inc()
+            return doc["result"]
+        self.misses.inc()
+        return None
+
+    async def save(
+        self,
+        db,
+        user_id: str,
+        resume_hash: str,
+        jd_hash: str,
+        evaluator: str,
+        result: Dict[str, Any]
+    ):
+        """Record (or refresh) a user's evaluation so it becomes their latest result."""
+        try:
+            await db[self.collection_name].update_one(
+                {
+                    "user_id": ObjectId(user_id),
+                    "resume_hash": resume_hash,
+                    "jd_hash": jd_hash,
+                    "evaluator": evaluator
+                },
+                {"$set": {"result": result, "status": "completed", "created_at": datetime.utcnow()}},
+                upsert=True
+            )
+        except Exception as e:
+            logger.warning(f"ATS result write failed: {e}")
+
+# Global instance
+ats_result_store = ATSResultStore()
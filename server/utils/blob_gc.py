@@ -0,0 +1,359 @@
+import os
+import json
+import time
+import asyncio
+import logging
+import tempfile
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional
+from dotenv import load_dotenv
+
+from utils.blob_store import BlobStore, blob_store
+from utils.metrics import metrics
+from utils.resilience import AdaptiveTokenBucket
+
+# Load environment variables
+load_dotenv()
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+# Temporary files created with this prefix are swept once older than the grace period
+TEMP_PREFIX = "bridgeai_"
+
+# Where uploaded resumes and generated PDFs were both written before the
+# blob store: "server/resumes" under the server directory it was started from
+LEGACY_RESUME_DIR = os.getenv(
+    "LEGACY_RESUME_DIR",
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "server", "resumes")
+)
+
+# Candidates listed in a dry-run report, per kind
+REPORT_SAMPLE = 20
+
+class BlobGarbageCollector:
+    """
+    Background sweeper for stored files that nothing references.
+
+    Each sweep, in batches of ``batch_size``:
+
+    0. with ``document_retention_seconds``, deletes ``generated_documents``
+       records older than that and drops the references they held;
+    1. reconciles blob reference counts with the documents that hold blob
+       ids (``users.resume_blob`` and ``generated_documents``), repairing
+       counts left wrong by a crash between a write and its record;
+    2. deletes blobs that have had no references for ``grace_seconds``,
+       re-checking the referencing documents first;
+    3. deletes backend files that have no ``blobs`` record;
+    4. deletes files in the pre-blob-store resume directory that no user's
+       ``resume_file_path`` points at (old generated PDFs are no longer
+       reachable by any URL), plus ``bridgeai_`` temporary files.
+
+    Only things untouched for the grace period are considered, so in-flight
+    uploads and generations are never collected. Deletions are paced by a
+    token bucket so a large backlog doesn't compete with user traffic. With
+    ``dry_run`` nothing is changed and the report lists what would be.
+    """
+
+    def __init__(
+        self,
+        store: BlobStore,
+        interval: float,
+        batch_size: int,
+        deletes_per_second: float,
+        grace_seconds: float,
+        dry_run: bool = False,
+        temp_dir: Optional[str] = None,
+        document_retention_seconds: float = 0
+    ):
+        self.store = store
+        self.interval = interval
+        self.batch_size = max(1, batch_size)
+        self.grace = timedelta(seconds=grace_seconds)
+        self.dry_run = dry_run
+        self.document_retention = timedelta(seconds=document_retention_seconds) if document_retention_seconds > 0 else None
+        self.temp_dir = temp_dir or tempfile.gettempdir()
+        self.limiter = AdaptiveTokenBucket("blob_gc", rate=deletes_per_second, capacity=self.batch_size)
+        self._task: Optional[asyncio.Task] = None
+
+        self.bytes_reclaimed = metrics.counter("blob_gc_bytes_reclaimed_total", "Bytes freed by the garbage collector")
+        self.files_deleted = metrics.counter("blob_gc_files_deleted_total", "Blobs and files deleted by the garbage collector")
+        self.refcounts_fixed = metrics.counter("blob_gc_refcounts_fixed_total", "Blob reference counts repaired")
+        self.documents_pruned = metrics.counter("blob_gc_documents_pruned_total", "Generated document records expired")
+        self.sweep_seconds = metrics.histogram("blob_gc_sweep_seconds", "Duration of a garbage collection sweep")
+
+    @property
+    def db(self):
+        return self.store.db
+
+    async def start(self):
+        """Sweep every ``interval`` seconds in the background (0 disables)."""
+        if self._task is not None or self.interval <= 0:
+            return
+        self._task = asyncio.create_task(self._loop())
+        logger.info(f"Blob garbage collector started (every {self.interval:.0f}s{', dry run' if self.dry_run else ''})")
+
+    async def shutdown(self):
+        if self._task is None:
+            return
+        self._task.cancel()
+        await asyncio.gather(self._task, return_exceptions=True)
+        self._task = None
+
+    async def _loop(self):
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                report = await self.sweep()
+                logger.info(f"Blob GC sweep: {json.dumps({k: v for k, v in report.items() if k != 'candidates'})}")
+            except Exception as e:
+                logger.error(f"Blob GC sweep failed: {e}")
+
+    async def sweep(self, dry_run: Optional[bool] = None) -> Dict[str, Any]:
+        """Run one full sweep; returns counts and, for dry runs, sample candidates."""
+        if self.db is None:
+            raise RuntimeError("Blob store is not attached to a database")
+        report: Dict[str, Any] = {
+            "dry_run": self.dry_run if dry_run is None else dry_run,
+            "documents_pruned": 0,
+            "blobs_scanned": 0,
+            "refcounts_fixed": 0,
+            "blobs_deleted": 0,
+            "orphans_deleted": 0,
+            "legacy_files_deleted": 0,
+            "temp_files_deleted": 0,
+            "bytes_reclaimed": 0,
+            "candidates": {}
+        }
+        cutoff = datetime.utcnow() - self.grace
+        start = time.perf_counter()
+        await self._prune_documents(report)
+        await self._reconcile(report, cutoff)
+        await self._collect_released(report, cutoff)
+        await self._collect_orphans(report, cutoff)
+        await self._collect_files(report, cutoff)
+        self.sweep_seconds.observe(time.perf_counter() - start)
+        report["seconds"] = round(time.perf_counter() - start, 3)
+        return report
+
+    def _candidate(self, report: Dict[str, Any], kind: str, name: str, size: int):
+        sample = report["candidates"].setdefault(kind, [])
+        if len(sample) < REPORT_SAMPLE:
+            sample.append({"name": name, "bytes": size})
+
+    def _reclaimed(self, report: Dict[str, Any], key: str, size: int):
+        report[key] += 1
+        report["bytes_reclaimed"] += size
+        if not report["dry_run"]:
+            self.files_deleted.inc()
+            self.bytes_reclaimed.inc(size)
+
+    async def _references(self, blob_ids: List[str]) -> Dict[str, int]:
+        """Count the documents that hold each blob id."""
+        counts = {blob_id: 0 for blob_id in blob_ids}
+        pipeline = [{"$match": {"blob": {"$in": blob_ids}}}, {"$group": {"_id": "$blob", "count": {"$sum": 1}}}]
+        async for row in self.db[self.store.documents_collection].aggregate(pipeline):
+            counts[row["_id"]] += row["count"]
+        async for user in self.db.users.find({"resume_blob": {"$in": blob_ids}}, {"resume_blob": 1}):
+            counts[user["resume_blob"]] += 1
+        return counts
+
+    async def _batches(self, collection, query: Dict[str, Any]):
+        """Page through ``query`` in ``_id`` order without holding a cursor open between batches."""
+        last = None
+        while True:
+            page_query = dict(query) if last is None else {**query, "_id": {"$gt": last}}
+            batch = await collection.find(page_query).sort("_id", 1).limit(self.batch_size).to_list(self.batch_size)
+            if not batch:
+                return
+            yield batch
+            last = batch[-1]["_id"]
+            await asyncio.sleep(0)
+
+    async def _set_refcount(self, doc: Dict[str, Any], refcount: int):
+        update: Dict[str, Any] = {"$set": {"refcount": refcount}}
+        if refcount > 0:
+            update["$unset"] = {"released_at": ""}
+        elif not doc.get("released_at"):
+            update["$set"]["released_at"] = datetime.utcnow()
+        # Only if no put or release happened since the document was read
+        await self.db[self.store.collection_name].update_one({"_id": doc["_id"], "refcount": doc.get("refcount", 0)}, update)
+
+    async def _delete_blob(self, blob_id: str, record_query: Optional[Dict[str, Any]] = None) -> Optional[int]:
+        """
+        Delete a blob's bytes, and with ``record_query`` its unreferenced
+        record; returns the bytes freed, or None if it turned out to be in use.
+
+        ``put`` records a reference before checking for the bytes, so the
+        bytes are moved aside first and only purged once the record is gone
+        (or, for orphans, still absent). A put racing with this either makes
+        the record delete miss, and the bytes are put back, or finds the
+        bytes missing and writes them again.
+        """
+        blobs = self.db[self.store.collection_name]
+        if not await self.store.backend.quarantine(blob_id):
+            if record_query is not None:
+                await blobs.delete_one(record_query)
+            return 0
+        if record_query is not None:
+            in_use = not (await blobs.delete_one(record_query)).deleted_count
+        else:
+            in_use = bool(await blobs.count_documents({"_id": blob_id}, limit=1))
+        if in_use:
+            await self.store.backend.restore(blob_id)
+            return None
+        return await self.store.backend.purge(blob_id)
+
+    async def _prune_documents(self, report: Dict[str, Any]):
+        if self.document_retention is None:
+            return
+        documents = self.db[self.store.documents_collection]
+        query = {"created_at": {"$lt": datetime.utcnow() - self.document_retention}}
+        async for batch in self._batches(documents, query):
+            for document in batch:
+                if report["dry_run"]:
+                    self._candidate(report, "documents", f"{document['owner']}: {document.get('filename')}", 0)
+                    report["documents_pruned"] += 1
+                    continue
+                if (await documents.delete_one({"_id": document["_id"]})).deleted_count:
+                    await self.store.release(document["blob"])
+                    report["documents_pruned"] += 1
+                    self.documents_pruned.inc()
+
+    async def _reconcile(self, report: Dict[str, Any], cutoff: datetime):
+        blobs = self.db[self.store.collection_name]
+        async for batch in self._batches(blobs, {"updated_at": {"$lt": cutoff}}):
+            report["blobs_scanned"] += len(batch)
+            counts = await self._references([doc["_id"] for doc in batch])
+            for doc in batch:
+                actual = counts[doc["_id"]]
+                if actual == doc.get("refcount", 0):
+                    continue
+                report["refcounts_fixed"] += 1
+                if report["dry_run"]:
+                    self._candidate(report, "refcounts", f"{doc['_id']}: {doc.get('refcount', 0)} -> {actual}", 0)
+                    continue
+                await self._set_refcount(doc, actual)
+                self.refcounts_fixed.inc()
+
+    async def _collect_released(self, report: Dict[str, Any], cutoff: datetime):
+        blobs = self.db[self.store.collection_name]
+        query = {"refcount": {"$lte": 0}, "released_at": {"$lt": cutoff}}
+        async for batch in self._batches(blobs, query):
+            counts = await self._references([doc["_id"] for doc in batch])
+            for doc in batch:
+                size = doc.get("size", 0)
+                if counts[doc["_id"]]:
+                    # Still referenced: the count was wrong, not the blob
+                    if not report["dry_run"]:
+                        await self._set_refcount(doc, counts[doc["_id"]])
+                    continue
+                if report["dry_run"]:
+                    self._candidate(report, "blobs", doc["_id"], size)
+                    self._reclaimed(report, "blobs_deleted", size)
+                    continue
+                await self.limiter.acquire()
+                freed = await self._delete_blob(doc["_id"], {"_id": doc["_id"], **query})
+                if freed is not None:
+                    self._reclaimed(report, "blobs_deleted", freed)
+
+    async def _collect_orphans(self, report: Dict[str, Any], cutoff: datetime):
+        blobs = self.db[self.store.collection_name]
+        batch: List[tuple] = []
+
+        async def flush():
+            known = {doc["_id"] async for doc in blobs.find({"_id": {"$in": [entry[0] for entry in batch]}}, {"_id": 1})}
+            for blob_id, size, modified_at in batch:
+                if blob_id in known or modified_at >= cutoff:
+                    continue
+                if report["dry_run"]:
+                    self._candidate(report, "orphans", blob_id, size)
+                    self._reclaimed(report, "orphans_deleted", size)
+                    continue
+                await self.limiter.acquire()
+                freed = await self._delete_blob(blob_id)
+                if freed is not None:
+                    self._reclaimed(report, "orphans_deleted", freed)
+            batch.clear()
+
+        async for entry in self.store.backend.entries():
+            batch.append(entry)
+            if len(batch) >= self.batch_size:
+                await flush()
+        if batch:
+            await flush()
+
+    async def _delete_file(self, report: Dict[str, Any], key: str, path: str, size: int):
+        if report["dry_run"]:
+            self._candidate(report, key, path, size)
+            self._reclaimed(report, key, size)
+            return
+        await self.limiter.acquire()
+        try:
+            os.unlink(path)
+        except FileNotFoundError:
+            return
+        except OSError as e:
+            logger.warning(f"Blob GC could not delete {path}: {e}")
+            return
+        self._reclaimed(report, key, size)
+
+    async def _collect_files(self, report: Dict[str, Any], cutoff: datetime):
+        cutoff_ts = (cutoff - datetime.utcnow()).total_seconds() + time.time()
+
+        # Resumes and generated PDFs from before the blob store, unless a user still points at them
+        legacy = await asyncio.to_thread(_list_files, LEGACY_RESUME_DIR, "", cutoff_ts)
+        if legacy:
+            # Stored paths were absolute but built from the working directory, so compare resolved paths
+            cursor = self.db.users.find({"resume_file_path": {"$type": "string"}}, {"resume_file_path": 1})
+            referenced = {_normalize(user["resume_file_path"]) async for user in cursor}
+            for path, size in legacy:
+                if _normalize(path) not in referenced:
+                    await self._delete_file(report, "legacy_files_deleted", path, size)
+
+        # Temporary files, including uploads abandoned mid-stream in the staging area
+        for directory in {self.temp_dir, self.store.staging_dir()}:
+            for path, size in await asyncio.to_thread(_list_files, directory, TEMP_PREFIX, cutoff_ts):
+                await self._delete_file(report, "temp_files_deleted", path, size)
+
+def _normalize(path: str) -> str:
+    return os.path.normcase(os.path.realpath(path))
+
+def _list_files(directory: str, prefix: str, older_than: float) -> List[tuple]:
+    """``(path, size)`` of regular files in ``directory`` named ``prefix*`` and last modified before ``older_than``."""
+    found = []
+    if not os.path.isdir(directory):
+        return found
+    for entry in os.scandir(directory):
+        if not entry.name.startswith(prefix) or not entry.is_file():
+            continue
+        try:
+            stat = entry.stat()
+        except OSError:
+            continue
+        if stat.st_mtime < older_than:
+            found.append((entry.path, stat.st_size))
+    return found
+
+# Global instance
+blob_gc = BlobGarbageCollector(
+    store=blob_store,
+    interval=float(os.getenv("BLOB_GC_INTERVAL_SECONDS", "3600")),
+    batch_size=int(os.getenv("BLOB_GC_BATCH_SIZE", "200")),
+    deletes_per_second=float(os.getenv("BLOB_GC_DELETES_PER_SECOND", "20")),
+    grace_seconds=float(os.getenv("BLOB_GC_GRACE_SECONDS", "3600")),
+    dry_run=os.getenv("BLOB_GC_DRY_RUN", "false").lower() == "true",
+    document_retention_seconds=float(os.getenv("GENERATED_DOCUMENT_RETENTION_DAYS", "30")) * 86400
+)
+
+async def _main(apply: bool):
+    from database import get_database_direct
+    blob_store.attach(await get_database_direct())
+    report = await blob_gc.sweep(dry_run=not apply)
+    print(json.dumps(report, indent=2))
+
+if __name__ == "__main__":
+    import argparse
+    parser = argparse.ArgumentParser(description="Report (or with --apply, delete) unreferenced stored files.")
+    parser.add_argument("--apply", action="store_true", help="delete instead of only reporting")
+    asyncio.run(_main(parser.parse_args().apply))
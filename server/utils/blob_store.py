@@ -0,0 +1,412 @@
+import os
+import re
+import asyncio
+import hashlib
+import logging
+import tempfile
+from datetime import datetime
+from typing import AsyncIterator, Optional, Tuple
+from dotenv import load_dotenv
+
+from utils.metrics import metrics
+
+# Load environment variables
+load_dotenv()
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+_BLOB_ID_RE = re.compile(r"^[0-9a-f]{64}$")
+
+def is_blob_id(value: str) -> bool:
+    """Whether ``value`` looks like a blob id (lowercase hex SHA-256)."""
+    return bool(value) and bool(_BLOB_ID_RE.match(value))
+
+class LocalBlobBackend:
+    """
+    Blobs as files under ``root``, sharded two levels deep by hash
+    (``ab/cd/abcd...``) so no directory grows too large. Point several API
+    nodes at one shared volume to share storage.
+    """
+
+    name = "local"
+
+    def __init__(self, root: str):
+        self.root = root
+
+    def path(self, blob_id: str) -> str:
+        return os.path.join(self.root, blob_id[:2], blob_id[2:4], blob_id)
+
+    async def exists(self, blob_id: str) -> bool:
+        return await asyncio.to_thread(os.path.exists, self.path(blob_id))
+
+    def _write(self, blob_id: str, data: bytes):
+        path = self.path(blob_id)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(path), prefix=".tmp-")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            # Atomic rename: readers never see a partial blob
+            os.replace(temp_path, path)
+        except Exception:
+            try:
+                os.unlink(temp_path)
+            except OSError:
+                pass
+            raise
+
+    async def write(self, blob_id: str, data: bytes) -> bool:
+        """Store ``data`` as ``blob_id``; False if another writer stored it first."""
+        await asyncio.to_thread(self._write, blob_id, data)
+        return True
+
+    def staging_dir(self) -> str:
+        # Same filesystem as the blobs, so adopting a staged file is a rename
+        return os.path.join(self.root, "staging")
+
+    def _adopt(self, blob_id: str, staged_path: str):
+        path = self.path(blob_id)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        os.replace(staged_path, path)
+
+    async def adopt(self, blob_id: str, staged_path: str) -> bool:
+        """Move a fully written file into place as ``blob_id``; False if another writer stored it first."""
+        await asyncio.to_thread(self._adopt, blob_id, staged_path)
+        return True
+
+    async def read(self, blob_id: str) -> bytes:
+        def _read():
+            with open(self.path(blob_id), "rb") as f:
+                return f.read()
+        return await asyncio.to_thread(_read)
+
+    def _delete(self, blob_id: str) -> int:
+        path = self.path(blob_id)
+        try:
+            size = os.path.getsize(path)
+            os.unlink(path)
+            return size
+        except FileNotFoundError:
+            return 0
+
+    async def delete(self, blob_id: str) -> int:
+        """Delete a blob; returns the bytes freed."""
+        return await asyncio.to_thread(self._delete, blob_id)
+
+    def _quarantine(self, blob_id: str) -> bool:
+        try:
+            os.replace(self.path(blob_id), self.path(blob_id) + ".gc")
+            return True
+        except FileNotFoundError:
+            return False
+
+    async def quarantine(self, blob_id: str) -> bool:
+        """Move a blob aside so it can still be restored; False if it doesn't exist."""
+        return await asyncio.to_thread(self._quarantine, blob_id)
+
+    async def restore(self, blob_id: str):
+        await asyncio.to_thread(os.replace, self.path(blob_id) + ".gc", self.path(blob_id))
+
+    async def purge(self, blob_id: str) -> int:
+        """Delete a quarantined blob; returns the bytes freed."""
+        return await self.delete(blob_id + ".gc")
+
+    async def entries(self) -> AsyncIterator[Tuple[str, int, datetime]]:
+        """Yield ``(blob_id, size, modified_at)`` for every stored blob."""
+        if not os.path.isdir(self.root):
+            return
+        for shard in sorted(os.listdir(self.root)):
+            shard_path = os.path.join(self.root, shard)
+            if not os.path.isdir(shard_path):
+                continue
+            for subshard in sorted(os.listdir(shard_path)):
+                subshard_path = os.path.join(shard_path, subshard)
+                if not os.path.isdir(subshard_path):
+                    continue
+                for entry in os.scandir(subshard_path):
+                    if is_blob_id(entry.name):
+                        stat = entry.stat()
+                        yield entry.name, stat.st_size, datetime.utcfromtimestamp(stat.st_mtime)
+            # Directory listings are blocking; let other tasks run between shards
+            await asyncio.sleep(0)
+
+class GridFSBlobBackend:
+    """
+    Blobs in a GridFS bucket of the application database, shared by every
+    API node. File names are blob ids, unique by index, so concurrent
+    uploads of the same content store it once.
+    """
+
+    name = "gridfs"
+
+    def __init__(self, bucket_name: str = "blob_data"):
+        self.bucket_name = bucket_name
+        self.bucket = None
+
+    def attach(self, db):
+        from motor.motor_asyncio import AsyncIOMotorGridFSBucket
+        self.bucket = AsyncIOMotorGridFSBucket(db, bucket_name=self.bucket_name)
+
+    async def ensure_indexes(self, db):
+        files = db[f"{self.bucket_name}.files"]
+        # Copies stored before the index existed would make it fail; keep the oldest of each
+        pipeline = [
+            {"$sort": {"uploadDate": 1}},
+            {"$group": {"_id": "$filename", "ids": {"$push": "$_id"}, "count": {"$sum": 1}}},
+            {"$match": {"count": {"$gt": 1}}}
+        ]
+        async for duplicate in files.aggregate(pipeline):
+            for file_id in duplicate["ids"][1:]:
+                await files.delete_one({"_id": file_id})
+                await db[f"{self.bucket_name}.chunks"].delete_many({"files_id": file_id})
+        await files.create_index("filename", unique=True, name="filename_unique")
+
+    def path(self, blob_id: str) -> Optional[str]:
+        return None
+
+    async def exists(self, blob_id: str) -> bool:
+        cursor = self.bucket.find({"filename": blob_id}, limit=1)
+        return bool(await cursor.to_list(length=1))
+
+    async def _upload(self, blob_id: str, source) -> bool:
+        from bson import ObjectId
+        from gridfs.errors import FileExists, NoFile
+        file_id = ObjectId()
+        try:
+            await self.bucket.upload_from_stream_with_id(file_id, blob_id, source)
+            return True
+        except FileExists:
+            # Another upload of the same content won; drop the chunks this one wrote
+            try:
+                await self.bucket.delete(file_id)
+            except NoFile:
+                pass
+            return False
+
+    async def write(self, blob_id: str, data: bytes) -> bool:
+        """Store ``data`` as ``blob_id``; False if another writer stored it first."""
+        return await self._upload(blob_id, data)
+
+    def staging_dir(self) -> str:
+        return tempfile.gettempdir()
+
+    async def adopt(self, blob_id: str, staged_path: str) -> bool:
+        """Upload a fully written file as ``blob_id`` and remove it; False if another writer stored it first."""
+        try:
+            with open(staged_path, "rb") as f:
+                return await self._upload(blob_id, f)
+        finally:
+            await asyncio.to_thread(os.unlink, staged_path)
+
+    async def read(self, blob_id: str) -> bytes:
+        from gridfs.errors import NoFile
+        try:
+            stream = await self.bucket.open_download_stream_by_name(blob_id)
+        except NoFile:
+            raise FileNotFoundError(blob_id)
+        return await stream.read()
+
+    async def delete(self, blob_id: str) -> int:
+        freed = 0
+        async for grid_file in self.bucket.find({"filename": blob_id}):
+            await self.bucket.delete(grid_file._id)
+            freed += grid_file.length
+        return freed
+
+    async def _rename(self, old_name: str, new_name: str) -> bool:
+        renamed = False
+        async for grid_file in self.bucket.find({"filename": old_name}):
+            await self.bucket.rename(grid_file._id, new_name)
+            renamed = True
+        return renamed
+
+    async def quarantine(self, blob_id: str) -> bool:
+        from pymongo.errors import DuplicateKeyError
+        try:
+            return await self._rename(blob_id, blob_id + ".gc")
+        except DuplicateKeyError:
+            # Left aside by an interrupted sweep
+            await self.purge(blob_id)
+            return await self._rename(blob_id, blob_id + ".gc")
+
+    async def restore(self, blob_id: str):
+        from pymongo.errors import DuplicateKeyError
+        try:
+            await self._rename(blob_id + ".gc", blob_id)
+        except DuplicateKeyError:
+            # A put stored the content again while it was aside
+            await self.purge(blob_id)
+
+    async def purge(self, blob_id: str) -> int:
+        return await self.delete(blob_id + ".gc")
+
+    async def entries(self) -> AsyncIterator[Tuple[str, int, datetime]]:
+        async for grid_file in self.bucket.find({}):
+            if is_blob_id(grid_file.filename):
+                yield grid_file.filename, grid_file.length, grid_file.upload_date.replace(tzinfo=None)
+
+class BlobStore:
+    """
+    Content-addressed, reference-counted blob storage.
+
+    Blob ids are the SHA-256 of the content, so identical files are stored
+    once. The ``blobs`` collection keeps each blob's size, content type and
+    reference count: ``put`` takes a reference and ``release`` drops one.
+    Blobs whose count reaches zero are left for the garbage collector.
+
+    Generated documents are recorded in ``generated_documents`` with their
+    owner; each record holds one reference, and downloads are authorized
+    against it.
+    """
+
+    def __init__(self, backend, collection_name: str = "blobs", documents_collection: str = "generated_documents"):
+        self.backend = backend
+        self.collection_name = collection_name
+        self.documents_collection = documents_collection
+        self.db = None
+
+        self.writes = metrics.counter("blob_store_writes_total", "Blobs written to the backend")
+        self.dedup_hits = metrics.counter("blob_store_dedup_hits_total", "Puts of content that was already stored")
+        self.bytes_written = metrics.counter("blob_store_bytes_written_total", "Bytes written to the backend")
+
+    def attach(self, db):
+        """Use ``db`` for reference counts (and for GridFS, storage)."""
+        self.db = db
+        if hasattr(self.backend, "attach"):
+            self.backend.attach(db)
+
+    async def ensure_indexes(self, db):
+        await db[self.collection_name].create_index([("refcount", 1), ("released_at", 1)])
+        await db[self.documents_collection].create_index([("owner", 1), ("blob", 1)])
+        await db[self.documents_collection].create_index("blob")
+        await db[self.documents_collection].create_index("created_at")
+        await db.users.create_index("resume_blob", sparse=True)
+        if hasattr(self.backend, "ensure_indexes"):
+            await self.backend.ensure_indexes(db)
+
+    @staticmethod
+    def blob_id(data: bytes) -> str:
+        return hashlib.sha256(data).hexdigest()
+
+    async def _reference(self, blob_id: str, size: int, content_type: str):
+        # Reference first, then bytes: the garbage collector only deletes
+        # bytes whose record it has just removed at zero references
+        if self.db is None:
+            return
+        await self.db[self.collection_name].update_one(
+            {"_id": blob_id},
+            {
+                "$setOnInsert": {"size": size, "content_type": content_type, "created_at": datetime.utcnow()},
+                "$inc": {"refcount": 1},
+                "$set": {"updated_at": datetime.utcnow()},
+                "$unset": {"released_at": ""}
+            },
+            upsert=True
+        )
+
+    async def put(self, data: bytes, content_type: str = "application/pdf") -> str:
+        """Store ``data`` (once per distinct content) and take a reference to it; returns the blob id."""
+        blob_id = self.blob_id(data)
+        await self._reference(blob_id, len(data), content_type)
+
+        if await self.backend.exists(blob_id) or not await self.backend.write(blob_id, data):
+            self.dedup_hits.inc()
+        else:
+            self.writes.inc()
+            self.bytes_written.inc(len(data))
+        return blob_id
+
+    def staging_dir(self) -> str:
+        """Where to spool incoming files so ``put_file`` can adopt them cheaply."""
+        return self.backend.staging_dir()
+
+    async def put_file(self, path: str, blob_id: str, size: int, content_type: str = "application/pdf") -> str:
+        """
+        Like ``put`` for a file already on disk whose SHA-256 the caller
+        computed while writing it; the file is moved into the store (or
+        deleted, if the content is already stored).
+        """
+        await self._reference(blob_id, size, content_type)
+
+        if await self.backend.exists(blob_id):
+            self.dedup_hits.inc()
+            await asyncio.to_thread(os.unlink, path)
+        elif not await self.backend.adopt(blob_id, path):
+            self.dedup_hits.inc()
+        else:
+            self.writes.inc()
+            self.bytes_written.inc(size)
+        return blob_id
+
+    async def release(self, blob_id: Optional[str]):
+        """Drop one reference to a blob."""
+        if not blob_id or self.db is None:
+            return
+        doc = await self.db[self.collection_name].find_one_and_update(
+            {"_id": blob_id, "refcount": {"$gt": 0}},
+            {"$inc": {"refcount": -1}},
+            return_document=True
+        )
+        if doc is not None and doc["refcount"] <= 0:
+            await self.db[self.collection_name].update_one(
+                {"_id": blob_id, "refcount": {"$lte": 0}},
+                {"$set": {"released_at": datetime.utcnow()}}
+            )
+
+    async def info(self, blob_id: str) -> Optional[dict]:
+        """Get a blob's size, content type and reference count."""
+        if self.db is None:
+            return None
+        return await self.db[self.collection_name].find_one({"_id": blob_id})
+
+    async def add_document(self, owner: str, blob_id: str, filename: str, document_type: str, content_type: str = "application/pdf"):
+        """Record that ``owner`` generated ``blob_id``; the record holds the reference ``put`` took."""
+        if self.db is None:
+            return
+        await self.db[self.documents_collection].insert_one({
+            "owner": owner,
+            "blob": blob_id,
+            "filename": filename,
+            "type": document_type,
+            "content_type": content_type,
+            "created_at": datetime.utcnow()
+        })
+
+    async def find_document(self, owner: str, blob_id: str) -> Optional[dict]:
+        """Get ``owner``'s most recent record of a generated document."""
+        if self.db is None:
+            return None
+        return await self.db[self.documents_collection].find_one(
+            {"owner": owner, "blob": blob_id}, sort=[("created_at", -1)]
+        )
+
+    async def release_documents(self, owner: str) -> int:
+        """Delete all of ``owner``'s generated documents and drop their references."""
+        if self.db is None:
+            return 0
+        released = 0
+        async for document in self.db[self.documents_collection].find({"owner": owner}, {"blob": 1}):
+            await self.db[self.documents_collection].delete_one({"_id": document["_id"]})
+            await self.release(document["blob"])
+            released += 1
+        return released
+
+    def local_path(self, blob_id: str) -> Optional[str]:
+        """Filesystem path of a blob, if the backend keeps blobs on local disk."""
+        path = self.backend.path(blob_id)
+        return path if path and os.path.exists(path) else None
+
+    async def read(self, blob_id: str) -> bytes:
+        return await self.backend.read(blob_id)
+
+def _create_backend():
+    backend = os.getenv("BLOB_BACKEND", "local").lower()
+    if backend == "gridfs":
+        return GridFSBlobBackend()
+    if backend != "local":
+        logger.warning(f"Unknown BLOB_BACKEND '{backend}', using local storage")
+    return LocalBlobBackend(os.getenv("BLOB_STORE_DIR", os.path.join(os.getcwd(), "server", "blobs")))
+
+# Global instance
+blob_store = BlobStore(_create_backend())
@@ -0,0 +1,208 @@
+import os
+import time
+import asyncio
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Callable, List, Optional
+from dotenv import load_dotenv
+
+from utils.metrics import metrics
+from utils.worker_pool import PoolOverloadedError
+
+# Load environment variables
+load_dotenv()
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+CHROME_DRIVER_PATH = os.getenv("CHROME_DRIVER_PATH", os.path.join(os.getcwd(), "chrome_driver", "chromedriver.exe"))
+
+class BrowserSession:
+    """A launched WebDriver and how many leases it has served."""
+
+    def __init__(self, driver: Any):
+        self.driver = driver
+        self.uses = 0
+
+def _launch_driver(driver_path: str) -> Any:
+    """Start a headless Chrome session."""
+    from selenium import webdriver
+    from selenium.webdriver.chrome.service import Service
+
+    if not os.path.exists(driver_path):
+        raise FileNotFoundError(f"Chrome driver not found at {driver_path}")
+
+    chrome_options = webdriver.ChromeOptions()
+    chrome_options.add_argument("--headless")
+    chrome_options.add_argument("--no-sandbox")
+    chrome_options.add_argument("--disable-dev-shm-usage")
+    chrome_options.add_argument("--disable-gpu")
+    chrome_options.add_argument("--window-size=1920,1080")
+    chrome_options.add_argument("--user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36")
+    return webdriver.Chrome(service=Service(driver_path), options=chrome_options)
+
+def _is_healthy(driver: Any) -> bool:
+    """Cheap round trip to the browser; fails if Chrome or the driver died."""
+    try:
+        driver.window_handles
+        return True
+    except Exception:
+        return False
+
+def _reset(driver: Any):
+    """Clear state left by the previous lease."""
+    driver.delete_all_cookies()
+    driver.get("about:blank")
+
+def _quit(driver: Any):
+    try:
+        driver.quit()
+    except Exception as e:
+        logger.warning(f"Error closing browser session: {e}")
+
+class BrowserPool:
+    """
+    Bounded pool of pre-launched headless browser sessions.
+
+    Selenium is blocking, so every driver call runs on a dedicated thread pool
+    with one thread per session, never on the event loop. Sessions are leased
+    from a queue (waiting at most ``lease_timeout`` seconds), health-checked
+    before use, and replaced after ``max_uses`` leases or any failure.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        size: int,
+        max_uses: int,
+        lease_timeout: float,
+        driver_path: str = CHROME_DRIVER_PATH,
+        launcher: Callable[[str], Any] = _launch_driver
+    ):
+        self.name = name
+        self.size = max(1, size)
+        self.max_uses = max(1, max_uses)
+        self.lease_timeout = lease_timeout
+        self.driver_path = driver_path
+        self.launcher = launcher
+        self._executor: Optional[ThreadPoolExecutor] = None
+        # Slots holding None have not been launched yet (or were discarded)
+        self._slots: Optional[asyncio.Queue] = None
+        self._in_use = 0
+
+        self.in_use = metrics.gauge(f"{name}_sessions_in_use", "Browser sessions currently leased")
+        self.lease_wait_seconds = metrics.histogram(f"{name}_lease_wait_seconds", "Time spent waiting for a free session")
+        self.launch_seconds = metrics.histogram(f"{name}_launch_seconds", "Browser startup time")
+        self.rejected = metrics.counter(f"{name}_rejected_total", "Leases that timed out waiting for a session")
+        self.recycles = metrics.counter(f"{name}_recycles_total", "Sessions replaced after max uses or a failure")
+
+    def _ensure_started(self):
+        if self._slots is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.size, thread_name_prefix=self.name)
+            self._slots = asyncio.Queue()
+            for _ in range(self.size):
+                self._slots.put_nowait(None)
+
+    async def _call(self, fn: Callable[..., Any], *args: Any) -> Any:
+        return await asyncio.get_running_loop().run_in_executor(self._executor, fn, *args)
+
+    async def _launch(self) -> BrowserSession:
+        start = time.perf_counter()
+        driver = await self._call(self.launcher, self.driver_path)
+        self.launch_seconds.observe(time.perf_counter() - start)
+        return BrowserSession(driver)
+
+    async def start(self):
+        """Launch every session up front so requests never pay browser startup."""
+        self._ensure_started()
+        slots: List[Optional[BrowserSession]] = [self._slots.get_nowait() for _ in range(self._slots.qsize())]
+
+        async def warm(slot: Optional[BrowserSession]) -> Optional[BrowserSession]:
+            if slot is not None:
+                return slot
+            try:
+                return await self._launch()
+            except Exception as e:
+                logger.warning(f"Browser pool '{self.name}' could not launch a session: {e}")
+                return None
+
+        warmed = await asyncio.gather(*[warm(slot) for slot in slots])
+        for slot in warmed:
+            self._slots.put_nowait(slot)
+        logger.info(f"Browser pool '{self.name}' started with {sum(slot is not None for slot in warmed)} warm session(s)")
+
+    async def shutdown(self):
+        """Quit every idle session and stop the driver threads."""
+        if self._slots is None:
+            return
+        while not self._slots.empty():
+            session = self._slots.get_nowait()
+            if session is not None:
+                await self._call(_quit, session.driver)
+        self._executor.shutdown(wait=False, cancel_futures=True)
+        self._slots = None
+        self._executor = None
+        logger.info(f"Browser pool '{self.name}' stopped")
+
+    async def _discard(self, session: BrowserSession):
+        self.recycles.inc()
+        await self._call(_quit, session.driver)
+
+    @asynccontextmanager
+    async def lease(self) -> AsyncIterator[BrowserSession]:
+        """
+        Lease a healthy session for the duration of the ``async with`` block.
+
+        Raises ``PoolOverloadedError`` if none frees up within ``lease_timeout``.
+        """
+        self._ensure_started()
+        slots = self._slots
+        start = time.perf_counter()
+        try:
+            session = await asyncio.wait_for(slots.get(), self.lease_timeout)
+        except asyncio.TimeoutError:
+            self.rejected.inc()
+            raise PoolOverloadedError(f"Browser pool '{self.name}' has no free session")
+        self.lease_wait_seconds.observe(time.perf_counter() - start)
+
+        self._in_use += 1
+        self.in_use.set(self._in_use)
+        healthy = False
+        try:
+            if session is not None and not await self._call(_is_healthy, session.driver):
+                await self._discard(session)
+                session = None
+            if session is None:
+                session = await self._launch()
+
+            session.uses += 1
+            yield session
+            healthy = True
+        finally:
+            self._in_use -= 1
+            self.in_use.set(self._in_use)
+            if session is not None and (not healthy or session.uses >= self.max_uses):
+                await self._discard(session)
+                session = None
+            elif session is not None:
+                try:
+                    await self._call(_reset, session.driver)
+                except Exception:
+                    await self._discard(session)
+                    session = None
+            # Always hand the slot back so the pool never shrinks
+            slots.put_nowait(session)
+
+    async def run(self, fn: Callable[..., Any], *args: Any) -> Any:
+        """Run ``fn(driver, *args)`` on a leased session off the event loop."""
+        async with self.lease() as session:
+            return await self._call(fn, session.driver, *args)
+
+# Global instance
+browser_pool = BrowserPool(
+    name="browser",
+    size=int(os.getenv("BROWSER_POOL_SIZE", "2")),
+    max_uses=int(os.getenv("BROWSER_MAX_USES", "50")),
+    lease_timeout=float(os.getenv("BROWSER_LEASE_TIMEOUT_SECONDS", "30"))
+)
@@ -0,0 +1,169 @@
+import os
+import re
+import logging
+from typing import Dict, Optional
+from urllib.parse import quote
+from fastapi import HTTPException, Request, status
+from fastapi.responses import FileResponse, Response
+from starlette.datastructures import Headers
+from dotenv import load_dotenv
+
+from utils.blob_store import blob_store
+from utils.metrics import metrics
+
+# Load environment variables
+load_dotenv()
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+# Content-addressed URLs never change meaning, so browsers may keep them for a year
+IMMUTABLE = "private, max-age=31536000, immutable"
+# Stable URLs whose content can change: cache, but revalidate with the ETag every time
+REVALIDATE = "private, no-cache"
+
+_RANGE_RE = re.compile(r"^bytes=(\d*)-(\d*)$")
+
+not_modified_responses = metrics.counter("file_serving_not_modified_total", "Conditional requests answered with 304")
+range_responses = metrics.counter("file_serving_partial_total", "Range requests answered with 206")
+
+class BlobFileResponse(FileResponse):
+    """
+    ``FileResponse`` with larger reads, handing whole-file bodies to the
+    server through the ASGI ``http.response.pathsend`` extension where the
+    server supports it (so it can use sendfile). Range requests and HEAD
+    are handled by Starlette; If-Range is checked against the ETag this
+    response actually sends, which for blobs is their SHA-256 rather than
+    Starlette's mtime and size hash.
+    """
+
+    chunk_size = int(os.getenv("FILE_SERVING_CHUNK_SIZE", str(256 * 1024)))
+
+    async def __call__(self, scope, receive, send):
+        self._pathsend = "http.response.pathsend" in scope.get("extensions", {})
+        if "range" in Headers(scope=scope):
+            range_responses.inc()
+        await super().__call__(scope, receive, send)
+
+    def _should_use_range(self, http_if_range: str, stat_result: os.stat_result) -> bool:
+        return http_if_range in (self.headers.get("etag"), self.headers.get("last-modified"))
+
+    async def _handle_simple(self, send, send_header_only: bool) -> None:
+        if send_header_only or not self._pathsend:
+            return await super()._handle_simple(send, send_header_only)
+        await send({"type": "http.response.start", "status": self.status_code, "headers": self.raw_headers})
+        await send({"type": "http.response.pathsend", "path": str(self.path)})
+
+def etag_matches(if_none_match: Optional[str], etag: Optional[str]) -> bool:
+    """Weak comparison of an If-None-Match header against an ETag (RFC 9110 13.1.2)."""
+    if not if_none_match or not etag:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    opaque = etag.removeprefix("W/")
+    return any(candidate.strip().removeprefix("W/") == opaque for candidate in if_none_match.split(","))
+
+def not_modified(request: Request, etag: str, cache_control: str, headers: Optional[Dict[str, str]] = None) -> Optional[Response]:
+    """A 304 response if the client's cached copy is current, otherwise None."""
+    if not etag_matches(request.headers.get("if-none-match"), etag):
+        return None
+    not_modified_responses.inc()
+    return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={
+        **(headers or {}), "ETag": etag, "Cache-Control": cache_control
+    })
+
+def content_disposition(disposition: str, filename: str) -> str:
+    """Content-Disposition value, RFC 5987-encoded for non-ASCII names (as FileResponse does)."""
+    quoted = quote(filename)
+    if quoted != filename:
+        return f"{disposition}; filename*=utf-8''{quoted}"
+    return f'{disposition}; filename="{filename}"'
+
+def blob_etag(blob_id: str) -> str:
+    # The blob id is the SHA-256 of the bytes: a strong validator for free
+    return f'"{blob_id}"'
+
+def _bytes_response(request: Request, data: bytes, media_type: str, headers: Dict[str, str]) -> Response:
+    """Serve in-memory bytes, honouring a single-range Range request."""
+    headers = {**headers, "Accept-Ranges": "bytes"}
+    requested = request.headers.get("range")
+    if_range = request.headers.get("if-range")
+    match = _RANGE_RE.match(requested.strip()) if requested else None
+    # Multi-range and stale If-Range requests get the whole body, as RFC 9110 allows
+    if not match or (if_range is not None and if_range != headers.get("ETag")):
+        return Response(content=data, media_type=media_type, headers=headers)
+
+    first, last = match.groups()
+    size = len(data)
+    if first:
+        start, end = int(first), min(int(last) + 1, size) if last else size
+    elif last:
+        start, end = max(size - int(last), 0), size
+    else:
+        start, end = size, size
+    if start >= end:
+        return Response(status_code=status.HTTP_416_REQUESTED_RANGE_NOT_SATISFIABLE, headers={"Content-Range": f"bytes */{size}"})
+
+    range_responses.inc()
+    return Response(
+        content=data[start:end],
+        status_code=status.HTTP_206_PARTIAL_CONTENT,
+        media_type=media_type,
+        headers={**headers, "Content-Range": f"bytes {start}-{end - 1}/{size}"}
+    )
+
+async def serve_blob(
+    request: Request,
+    blob_id: str,
+    filename: str,
+    media_type: str,
+    disposition: str,
+    cache_control: str,
+    headers: Optional[Dict[str, str]] = None
+) -> Response:
+    """Serve a blob with a strong ETag, conditional 304s and Range support."""
+    etag = blob_etag(blob_id)
+    cached = not_modified(request, etag, cache_control, headers)
+    if cached is not None:
+        return cached
+
+    response_headers = {**(headers or {}), "ETag": etag, "Cache-Control": cache_control}
+    path = blob_store.local_path(blob_id)
+    if path:
+        return BlobFileResponse(
+            path=path,
+            filename=filename,
+            media_type=media_type,
+            headers=response_headers,
+            content_disposition_type=disposition,
+            stat_result=os.stat(path)
+        )
+
+    # Remote backends: no file to send, serve from memory
+    try:
+        data = await blob_store.read(blob_id)
+    except FileNotFoundError:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="File not found")
+    response_headers["Content-Disposition"] = content_disposition(disposition, filename)
+    return _bytes_response(request, data, media_type, response_headers)
+
+def serve_file(
+    request: Request,
+    path: str,
+    filename: str,
+    media_type: str,
+    disposition: str,
+    cache_control: str,
+    headers: Optional[Dict[str, str]] = None
+) -> Response:
+    """Serve a file on disk; the ETag is Starlette's (mtime and size based)."""
+    response = BlobFileResponse(
+        path=path,
+        filename=filename,
+        media_type=media_type,
+        headers={**(headers or {}), "Cache-Control": cache_control},
+        content_disposition_type=disposition,
+        stat_result=os.stat(path)
+    )
+    cached = not_modified(request, response.headers["etag"], cache_control, headers)
+    return cached if cached is not None else response
@@ -1,20 +1,113 @@
 import os
-import requests
+import time
+import json
+import httpx
 import logging
-from typing import Dict, Any, Optional
+from typing import AsyncIterator, Dict, Any, Optional, Tuple
 from dotenv import load_dotenv
 
+try:
+    import h2  # noqa: F401  (enables HTTP/2 in httpx)
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+from utils.llm_cache import llm_cache
+from utils.metrics import metrics
+from utils.resilience import (
+    AdaptiveTokenBucket, CircuitBreaker, CircuitOpenError, RetryPolicy, call_with_resilience, parse_retry_after
+)
+
 # Load environment variables
 load_dotenv()
 
 # Configure logging
 logger = logging.getLogger(__name__)
 
+class GroqError(Exception):
+    """Base class for Groq API failures."""
+
+class GroqUnavailableError(GroqError):
+    """Raised when no API key is configured."""
+
+class GroqTimeoutError(GroqError):
+    """Raised when connecting to or reading from the API times out."""
+
+class GroqConnectionError(GroqError):
+    """Raised when the API cannot be reached."""
+
+class GroqAPIError(GroqError):
+    """Raised when the API answers with an error status or an unexpected body."""
+
+    def __init__(self, message: str, status_code: Optional[int] = None, retry_after: Optional[float] = None):
+        super().__init__(message)
+        self.status_code = status_code
+        self.retry_after = retry_after
+
+class GroqCircuitOpenError(GroqError):
+    """Raised without calling the API while it is considered degraded."""
+
+def _is_retryable(error: Exception) -> bool:
+    """Timeouts, connection failures, throttling and server errors are worth retrying."""
+    if isinstance(error, (GroqTimeoutError, GroqConnectionError)):
+        return True
+    return isinstance(error, GroqAPIError) and (error.status_code == 429 or (error.status_code or 0) >= 500)
+
+def _is_throttle(error: Exception) -> bool:
+    return isinstance(error, GroqAPIError) and error.status_code == 429
+
+def _retry_after(error: Exception) -> Optional[float]:
+    return getattr(error, "retry_after", None)
+
 class GroqService:
+    """
+    Async Groq chat-completions client.
+
+    All calls share one ``httpx.AsyncClient``, so TLS and HTTP/2 connections
+    are set up once and kept alive across requests; the pool is capped per
+    host and timeouts are split so a dead host fails fast while slow
+    generations are still allowed to finish.
+
+    Upstream calls go through a token-bucket limiter sized to the account's
+    quota, jittered retries that honor ``Retry-After``, and a circuit
+    breaker that fails fast (so routes fall back to templates) while the
+    API is degraded.
+    """
+
     def __init__(self):
         # Get Groq API key from environment variable
         self.api_key = os.getenv("GROQ_API_KEY")
         self.available = bool(self.api_key)
+        # Any OpenAI-compatible endpoint works, e.g. loadtest/fake_llm_server.py
+        self.api_base = os.getenv("GROQ_API_BASE", "https://api.groq.com/openai/v1").rstrip("/")
+        self.url = f"{self.api_base}/chat/completions"
+        self.model = os.getenv("GROQ_MODEL", "llama3-8b-8192")
+        self.limits = httpx.Limits(
+            max_connections=int(os.getenv("GROQ_MAX_CONNECTIONS", "20")),
+            max_keepalive_connections=int(os.getenv("GROQ_MAX_KEEPALIVE", "10")),
+            keepalive_expiry=30.0
+        )
+        self.timeout = httpx.Timeout(
+            connect=float(os.getenv("GROQ_CONNECT_TIMEOUT", "5")),
+            read=float(os.getenv("GROQ_READ_TIMEOUT", "60")),
+            write=10.0,
+            pool=float(os.getenv("GROQ_POOL_TIMEOUT", "10"))
+        )
+        self._client: Optional[httpx.AsyncClient] = None
+        
+        requests_per_minute = float(os.getenv("GROQ_RATE_LIMIT_RPM", "30"))
+        self.limiter = AdaptiveTokenBucket(
+            "groq",
+            rate=requests_per_minute / 60,
+            capacity=float(os.getenv("GROQ_RATE_LIMIT_BURST", "5"))
+        )
+        self.breaker = CircuitBreaker(
+            "groq",
+            failure_threshold=int(os.getenv("GROQ_BREAKER_FAILURES", "5")),
+            recovery_timeout=float(os.getenv("GROQ_BREAKER_RECOVERY_SECONDS", "30"))
+        )
+        self.retry = RetryPolicy(max_attempts=int(os.getenv("GROQ_MAX_ATTEMPTS", "3")))
+        self.retries = metrics.counter("groq_retries_total", "Groq API calls retried after a transient failure")
         
         if self.available:
             self.headers = {
@@ -27,48 +120,172 @@ class GroqService:
     def is_available(self) -> bool:
         return self.available
 
-    def generate_text(self, prompt: str, max_length: int = 1000) -> str:
+    @property
+    def client(self) -> httpx.AsyncClient:
+        """Shared client, created on first use."""
+        if self._client is None or self._client.is_closed:
+            self._client = httpx.AsyncClient(
+                headers=self.headers if self.available else None,
+                http2=HTTP2_AVAILABLE,
+                limits=self.limits,
+                timeout=self.timeout
+            )
+        return self._client
+
+    async def aclose(self):
+        """Close pooled connections (called on application shutdown)."""
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    async def generate_text(self, prompt: str, max_length: int = 1000) -> str:
         """
         Generate text using Groq API
+        
+        Identical requests are answered from the LLM cache, and concurrent
+        identical requests share a single upstream call.
         """
         if not self.available:
-            return "Groq service is not available. Please set GROQ_API_KEY environment variable."
+            raise GroqUnavailableError("Groq service is not available. Please set GROQ_API_KEY environment variable.")
         
-        try:
-            url = "https://api.groq.com/openai/v1/chat/completions"
-            data = {
-                "model": "llama3-8b-8192",
-                "messages": [{"role": "user", "content": prompt}],
-                "max_tokens": max_length
-            }
-            
-            response = requests.post(url, headers=self.headers, json=data, timeout=30)
-            
-            if response.status_code == 200:
-                result = response.json()
-                return result["choices"][0]["message"]["content"]
-            else:
-                logger.error(f"Groq API error: {response.status_code} - {response.text}")
-                return f"Error: API returned status {response.status_code}"
-                
-        except requests.exceptions.Timeout:
-            logger.error("Groq API timeout")
-            return "Error: Request timed out"
-        except requests.exceptions.RequestException as e:
-            logger.error(f"Groq API request error: {str(e)}")
-            return f"Error: {str(e)}"
-        except Exception as e:
-            logger.error(f"Groq API error: {str(e)}")
-            return f"Error: {str(e)}"
+        data = self._request_body(prompt, max_length)
+        return await llm_cache.get_or_generate(
+            llm_cache.make_key(data),
+            lambda: self._resilient(lambda: self._complete(data))
+        )
     
-    def generate_cover_letter(self, user_info: Dict[str, Any], job_description: str) -> str:
+    async def stream_text(self, prompt: str, max_length: int = 1000) -> AsyncIterator[str]:
         """
-        Generate a tailored cover letter
+        Generate text using Groq API, yielding chunks as tokens arrive
+        
+        Cached completions are yielded in one chunk. Only a stream that
+        reaches ``[DONE]`` with some text is cached; one that ends early or
+        empty raises ``GroqAPIError`` after the chunks already yielded.
         """
         if not self.available:
-            return "Groq service is not available. Please set GROQ_API_KEY environment variable."
+            raise GroqUnavailableError("Groq service is not available. Please set GROQ_API_KEY environment variable.")
+        
+        data = self._request_body(prompt, max_length)
+        key = llm_cache.make_key(data)
+        text = await llm_cache.cached(key)
+        if text is not None:
+            yield text
+            return
+        
+        llm_cache.record_miss()
+        start = time.perf_counter()
+        parts = []
+        tokens = 0
+        finished = False
+        # Only opening the stream is retried; once text reached the caller a retry would duplicate it
+        response = await self._resilient(lambda: self._open_stream(data))
+        try:
+            # Server-sent events: one "data: {chunk}" line per delta, then "data: [DONE]"
+            async for line in response.aiter_lines():
+                if not line.startswith("data:"):
+                    continue
+                payload = line[5:].strip()
+                if payload == "[DONE]":
+                    finished = True
+                    break
+                try:
+                    chunk = json.loads(payload)
+                except ValueError as e:
+                    raise GroqAPIError(f"Unexpected stream chunk: {str(e)}") from e
+                usage = chunk.get("usage") or (chunk.get("x_groq") or {}).get("usage")
+                if usage:
+                    tokens = int(usage.get("total_tokens", 0))
+                for choice in chunk.get("choices", []):
+                    delta = (choice.get("delta") or {}).get("content")
+                    if delta:
+                        parts.append(delta)
+                        yield delta
+        except httpx.HTTPError as e:
+            self.breaker.record_failure()
+            raise self._translate(e) from e
+        finally:
+            await response.aclose()
+        
+        if not finished:
+            self.breaker.record_failure()
+            raise GroqAPIError("Stream ended before the completion finished")
+        if not parts:
+            raise GroqAPIError("Stream completed without any text")
+        await llm_cache.put(key, "".join(parts), tokens, time.perf_counter() - start)
+    
+    async def _resilient(self, call):
+        """Run an upstream call through the circuit breaker, rate limiter and retry policy."""
+        try:
+            return await call_with_resilience(
+                call,
+                self.limiter,
+                self.breaker,
+                self.retry,
+                is_retryable=_is_retryable,
+                is_throttle=_is_throttle,
+                retry_after=_retry_after,
+                retries_counter=self.retries
+            )
+        except CircuitOpenError as e:
+            raise GroqCircuitOpenError(str(e)) from e
+    
+    @staticmethod
+    def _translate(error: httpx.HTTPError) -> GroqError:
+        """Map an httpx transport error to a GroqError."""
+        if isinstance(error, httpx.TimeoutException):
+            logger.error(f"Groq API timeout: {type(error).__name__}")
+            return GroqTimeoutError(f"Groq API timed out ({type(error).__name__})")
+        logger.error(f"Groq API request error: {str(error)}")
+        return GroqConnectionError(str(error))
+    
+    @staticmethod
+    def _status_error(response: httpx.Response, body: str) -> GroqAPIError:
+        logger.error(f"Groq API error: {response.status_code} - {body}")
+        return GroqAPIError(
+            f"API returned status {response.status_code}",
+            status_code=response.status_code,
+            retry_after=parse_retry_after(response.headers.get("retry-after"))
+        )
+    
+    async def _open_stream(self, data: Dict[str, Any]) -> httpx.Response:
+        """Start a streaming completion; the caller must close the response."""
+        request = self.client.build_request("POST", self.url, json={**data, "stream": True})
+        try:
+            response = await self.client.send(request, stream=True)
+        except httpx.RequestError as e:
+            raise self._translate(e) from e
+        if response.status_code != 200:
+            body = (await response.aread()).decode("utf-8", "replace")
+            await response.aclose()
+            raise self._status_error(response, body)
+        return response
+    
+    def _request_body(self, prompt: str, max_length: int) -> Dict[str, Any]:
+        return {
+            "model": self.model,
+            "messages": [{"role": "user", "content": prompt}],
+            "max_tokens": max_length
+        }
+    
+    async def _complete(self, data: Dict[str, Any]) -> Tuple[str, int]:
+        """Send one chat-completions request; returns the text and total tokens used."""
+        try:
+            response = await self.client.post(self.url, json=data)
+        except httpx.RequestError as e:
+            raise self._translate(e) from e
         
-        prompt = f"""
+        if response.status_code != 200:
+            raise self._status_error(response, response.text)
+        
+        try:
+            result = response.json()
+            text = result["choices"][0]["message"]["content"]
+        except (ValueError, KeyError, IndexError) as e:
+            raise GroqAPIError(f"Unexpected API response: {str(e)}", status_code=response.status_code) from e
+        return text, int((result.get("usage") or {}).get("total_tokens", 0))
+    
+    def cover_letter_prompt(self, user_info: Dict[str, Any], job_description: str) -> str:
+        return f"""
         Generate a professional cover letter for a job application. 
 
         User Information:
@@ -93,17 +310,21 @@ class GroqService:
 
         Please generate the cover letter:
         """
-        
-        return self.generate_text(prompt, max_length=800)
     
-    def generate_optimized_resume(self, user_info: Dict[str, Any], job_description: str) -> str:
+    async def generate_cover_letter(self, user_info: Dict[str, Any], job_description: str) -> str:
         """
-        Generate an optimized resume
+        Generate a tailored cover letter
         """
-        if not self.available:
-            return "Groq service is not available. Please set GROQ_API_KEY environment variable."
-        
-        prompt = f"""
+        return await self.generate_text(self.cover_letter_prompt(user_info, job_description), max_length=800)
+    
+    def stream_cover_letter(self, user_info: Dict[str, Any], job_description: str) -> AsyncIterator[str]:
+        """
+        Stream a tailored cover letter as it is generated
+        """
+        return self.stream_text(self.cover_letter_prompt(user_info, job_description), max_length=800)
+    
+    def optimized_resume_prompt(self, user_info: Dict[str, Any], job_description: str) -> str:
+        return f"""
         Generate an optimized resume for a job application.
 
         User Information:
@@ -127,8 +348,18 @@ class GroqService:
 
         Please generate the optimized resume:
         """
-        
-        return self.generate_text(prompt, max_length=1000)
+    
+    async def generate_optimized_resume(self, user_info: Dict[str, Any], job_description: str) -> str:
+        """
+        Generate an optimized resume
+        """
+        return await self.generate_text(self.optimized_resume_prompt(user_info, job_description), max_length=1000)
+    
+    def stream_optimized_resume(self, user_info: Dict[str, Any], job_description: str) -> AsyncIterator[str]:
+        """
+        Stream an optimized resume as it is generated
+        """
+        return self.stream_text(self.optimized_resume_prompt(user_info, job_description), max_length=1000)
 
 # Global instance
 _groq_service = None
@@ -141,4 +372,6 @@ def get_groq_service() -> GroqService:
         except Exception as e:
             logger.warning(f"Could not initialize Groq service: {e}")
             _groq_service = GroqService()  # Will be unavailable but won't crash
-    return _groq_service 
\ No newline at end of file
+    return _groq_service
+
+groq_service = get_groq_service()
@@ -0,0 +1,233 @@
+import os
+import json
+import time
+import asyncio
+import logging
+from datetime import datetime, timedelta
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+from dotenv import load_dotenv
+from pymongo.errors import DuplicateKeyError
+
+from utils.job_index import job_index
+from utils.jsearch_service import JSearchAPIError, jsearch_service
+from utils.metrics import metrics
+from utils.resilience import AdaptiveTokenBucket
+from utils.search_cache import JobSearchCache, job_search_cache
+
+# Load environment variables
+load_dotenv()
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+QueryBuilder = Callable[[Optional[str], Optional[str]], str]
+PageFetcher = Callable[[str, int, str, str], Awaitable[List[Dict[str, Any]]]]
+
+class JobHarvester:
+    """
+    Background pre-fetcher for the job searches users are most likely to run.
+
+    Every ``interval`` seconds it ranks the ``job_preference`` × ``location``
+    combinations in ``users`` by how many users share them, and refreshes
+    the first ``pages`` pages of the ``top_n`` most common ones into the
+    search cache, so their searches are answered without waiting on the API.
+    Pages that will still be fresh at the next run are skipped.
+
+    RapidAPI quota is protected three ways: each run makes at most
+    ``max_requests`` calls, paced by a token bucket that backs off on 429s;
+    a run stops early once the API reports ``quota_reserve`` requests or
+    fewer left, leaving them for user searches; and a lease in Mongo makes
+    only one worker harvest per interval.
+    """
+
+    def __init__(
+        self,
+        cache: JobSearchCache,
+        interval: float,
+        top_n: int,
+        pages: int,
+        max_requests: int,
+        requests_per_minute: float,
+        quota_reserve: int,
+        country: str = "ca",
+        collection_name: str = "job_harvests"
+    ):
+        self.cache = cache
+        self.interval = interval
+        self.top_n = top_n
+        self.pages = max(1, pages)
+        self.max_requests = max_requests
+        self.quota_reserve = quota_reserve
+        self.country = country
+        self.collection_name = collection_name
+        self.limiter = AdaptiveTokenBucket("job_harvest", rate=requests_per_minute / 60, capacity=1)
+        self._build_query: Optional[QueryBuilder] = None
+        self._fetch: Optional[PageFetcher] = None
+        self._task: Optional[asyncio.Task] = None
+
+        self.pages_refreshed = metrics.counter("job_harvest_pages_refreshed_total", "Search pages pre-fetched into the cache")
+        self.pages_skipped = metrics.counter("job_harvest_pages_skipped_total", "Popular pages skipped because they were still fresh")
+        self.failures = metrics.counter("job_harvest_failures_total", "Pre-fetches that failed")
+        self.run_seconds = metrics.histogram("job_harvest_run_seconds", "Duration of a harvest run")
+
+    @property
+    def db(self):
+        return self.cache.db
+
+    def register(self, build_query: QueryBuilder, fetch: PageFetcher):
+        """Set how searches are phrased and fetched (the job routes' own functions)."""
+        self._build_query = build_query
+        self._fetch = fetch
+
+    async def start(self):
+        """Harvest every ``interval`` seconds in the background (0 disables)."""
+        if self._task is not None or self.interval <= 0 or self._fetch is None:
+            return
+        if not jsearch_service.is_available():
+            logger.info("Job harvester disabled: RapidAPI key not configured")
+            return
+        self._task = asyncio.create_task(self._loop())
+        logger.info(f"Job harvester started (top {self.top_n} searches every {self.interval:.0f}s)")
+
+    async def shutdown(self):
+        if self._task is None:
+            return
+        self._task.cancel()
+        await asyncio.gather(self._task, return_exceptions=True)
+        self._task = None
+
+    async def _loop(self):
+        while True:
+            try:
+                if await self._claim():
+                    report = await self.harvest()
+                    logger.info(f"Job harvest: {json.dumps({k: v for k, v in report.items() if k != 'queries'})}")
+            except Exception as e:
+                logger.error(f"Job harvest failed: {e}")
+            await asyncio.sleep(self.interval)
+
+    async def _claim(self) -> bool:
+        """Take this interval's run unless another worker already has."""
+        now = datetime.utcnow()
+        try:
+            await self.db[self.collection_name].find_one_and_update(
+                {"_id": "schedule", "next_run_at": {"$lte": now}},
+                {"$set": {"next_run_at": now + timedelta(seconds=self.interval), "claimed_at": now}},
+                upsert=True
+            )
+            return True
+        except DuplicateKeyError:
+            return False
+
+    async def popular_queries(self) -> List[Dict[str, Any]]:
+        """The ``top_n`` job preference and location combinations, most users first."""
+        def normalized(field: str):
+            return {"$toLower": {"$trim": {"input": {"$ifNull": [f"${field}", ""]}}}}
+
+        pipeline = [
+            {"$match": {"job_preference": {"$type": "string", "$regex": r"\S"}}},
+            {"$group": {
+                "_id": {"title": normalized("job_preference"), "location": normalized("location")},
+                "users": {"$sum": 1},
+                "title": {"$first": "$job_preference"},
+                "location": {"$first": "$location"}
+            }},
+            {"$sort": {"users": -1, "_id.title": 1, "_id.location": 1}},
+            {"$limit": self.top_n}
+        ]
+        groups = await self.db.users.aggregate(pipeline).to_list(length=self.top_n)
+        return [
+            {"title": group["title"].strip(), "location": (group.get("location") or "").strip() or None, "users": group["users"]}
+            for group in groups
+        ]
+
+    async def harvest(self) -> Dict[str, Any]:
+        """Run one harvest now; returns counts and the queries considered."""
+        if self.db is None:
+            raise RuntimeError("Search cache is not attached to a database")
+        if self._fetch is None:
+            raise RuntimeError("No search fetcher registered")
+        report: Dict[str, Any] = {"pages_refreshed": 0, "pages_skipped": 0, "failures": 0, "stopped": None, "queries": []}
+        start = time.perf_counter()
+        # Pages that would go stale before the next run are refreshed now
+        due_by = datetime.utcnow() + timedelta(seconds=self.interval)
+        requests = 0
+
+        for query in await self.popular_queries():
+            search_query = self._build_query(query["title"], query["location"])
+            report["queries"].append({"search_query": search_query, "users": query["users"]})
+            for page in range(1, self.pages + 1):
+                key = self.cache.make_key(search_query, page, 1, self.country, "all")
+                entry = await self.cache.get(key)
+                if entry is not None and entry["fresh_until"] > due_by:
+                    report["pages_skipped"] += 1
+                    self.pages_skipped.inc()
+                    continue
+
+                if requests >= self.max_requests:
+                    report["stopped"] = "budget"
+                elif jsearch_service.quota_remaining is not None and jsearch_service.quota_remaining <= self.quota_reserve:
+                    report["stopped"] = "quota"
+                if report["stopped"]:
+                    break
+
+                await self.limiter.acquire()
+                requests += 1
+                try:
+                    results = await self._fetch(search_query, page, self.country, "all")
+                except JSearchAPIError as e:
+                    self.failures.inc()
+                    report["failures"] += 1
+                    if e.status_code == 429:
+                        self.limiter.on_throttle()
+                        report["stopped"] = "throttled"
+                        break
+                    logger.warning(f"Job harvest of '{search_query}' page {page} failed: {e}")
+                    continue
+                except Exception as e:
+                    self.failures.inc()
+                    report["failures"] += 1
+                    logger.warning(f"Job harvest of '{search_query}' page {page} failed: {e}")
+                    continue
+                self.limiter.on_success()
+                await self.cache.put(key, results, origin="harvest")
+                report["pages_refreshed"] += 1
+                self.pages_refreshed.inc()
+            if report["stopped"]:
+                break
+
+        report["requests"] = requests
+        self.run_seconds.observe(time.perf_counter() - start)
+        report["seconds"] = round(time.perf_counter() - start, 3)
+        return report
+
+# Global instance
+job_harvester = JobHarvester(
+    cache=job_search_cache,
+    interval=float(os.getenv("JOB_HARVEST_INTERVAL_SECONDS", "3600")),
+    top_n=int(os.getenv("JOB_HARVEST_TOP_QUERIES", "20")),
+    pages=int(os.getenv("JOB_HARVEST_PAGES", "1")),
+    max_requests=int(os.getenv("JOB_HARVEST_MAX_REQUESTS", "20")),
+    requests_per_minute=float(os.getenv("JOB_HARVEST_REQUESTS_PER_MINUTE", "6")),
+    quota_reserve=int(os.getenv("JOB_HARVEST_QUOTA_RESERVE", "100")),
+    country=os.getenv("JOB_HARVEST_COUNTRY", "ca")
+)
+
+async def _main(list_only: bool):
+    from database import get_database_direct
+    from routes import jobs  # noqa: F401  (registers the search fetcher)
+    db = await get_database_direct()
+    job_search_cache.attach(db)
+    job_index.attach(db)
+    if list_only:
+        report = {"queries": await job_harvester.popular_queries()}
+    else:
+        report = await job_harvester.harvest()
+    print(json.dumps(report, indent=2, default=str))
+    await jsearch_service.aclose()
+
+if __name__ == "__main__":
+    import argparse
+    parser = argparse.ArgumentParser(description="Pre-fetch the most common user job searches into the search cache.")
+    parser.add_argument("--list", action="store_true", help="only print the popular searches")
+    asyncio.run(_main(parser.parse_args().list))
@@ -0,0 +1,196 @@
+import os
+import hashlib
+import logging
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional, Tuple
+from dotenv import load_dotenv
+from pymongo import UpdateOne
+
+from utils.metrics import metrics
+
+# Load environment variables
+load_dotenv()
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+# Postings per JSearch page
+PAGE_SIZE = 10
+
+# Posting fields that name where a job is
+LOCATION_FIELDS = ("job_city", "job_state", "job_country")
+
+def job_fingerprint(job: Dict[str, Any]) -> str:
+    """Identity of a formatted posting: its normalized title, company and location."""
+    fields = ("job_title", "company_name", "job_city", "job_state", "job_country")
+    key = "|".join(" ".join(str(job.get(field) or "").lower().split()) for field in fields)
+    return hashlib.sha1(key.encode("utf-8")).hexdigest()
+
+def normalize_location(value: Optional[str]) -> str:
+    """Lowercased location with commas and runs of spaces collapsed ("Toronto,  ON" -> "toronto on")."""
+    return " ".join(str(value or "").lower().replace(",", " ").split())
+
+def split_query(search_query: str) -> Tuple[str, Optional[str]]:
+    """
+    The keywords and normalized location of a query built as
+    "<title> in <location>" (the location follows the last "in").
+    """
+    words = search_query.split()
+    lowered = [word.lower() for word in words]
+    if "in" in lowered:
+        at = len(lowered) - 1 - lowered[::-1].index("in")
+        location = normalize_location(" ".join(words[at + 1:]))
+        if location:
+            return " ".join(words[:at]), location
+    return search_query, None
+
+class JobIndex:
+    """
+    Local store of every posting fetched from JSearch, with full-text search.
+
+    Postings are upserted into the ``jobs`` collection keyed by their
+    fingerprint, so the same job seen in many searches is stored once.
+    ``last_seen_at`` records when the API last returned it: only postings
+    seen within ``fresh_seconds`` answer searches, and a TTL index drops
+    those not seen for ``retention_seconds``. A weighted text index covers
+    title, company, skills, location and description.
+
+    The location of a query ("... in Canada") is not a search term:
+    postings carry a ``locations`` list of their city, state and country
+    plus every location the API returned them for, and a search keeps the
+    postings whose list holds the query's location.
+    """
+
+    def __init__(self, fresh_seconds: int = 24 * 3600, retention_seconds: int = 14 * 24 * 3600,
+                 min_results: int = PAGE_SIZE, collection_name: str = "jobs"):
+        self.fresh_seconds = fresh_seconds
+        self.retention_seconds = retention_seconds
+        self.min_results = min_results
+        self.collection_name = collection_name
+        self.db = None
+
+        self.local_hits = metrics.counter("job_index_local_hits_total", "Searches answered from the local job index")
+        self.local_misses = metrics.counter("job_index_local_misses_total", "Searches the local index couldn't fill")
+        self.upserts = metrics.counter("job_index_postings_upserted_total", "Postings written to the local job index")
+        self.latency = metrics.histogram("job_index_search_seconds", "Local job index search time")
+
+    def attach(self, db):
+        """Use ``db`` for the index (searches fall through to the API until attached)."""
+        self.db = db
+
+    async def ensure_indexes(self, db):
+        collection = db[self.collection_name]
+        await collection.create_index(
+            [
+                ("job_title", "text"),
+                ("company_name", "text"),
+                ("job_required_skills", "text"),
+                ("job_city", "text"),
+                ("job_state", "text"),
+                ("job_description", "text")
+            ],
+            weights={"job_title": 10, "company_name": 5, "job_required_skills": 5, "job_city": 3, "job_state": 3},
+            default_language="english",
+            name="job_text"
+        )
+        await collection.create_index([("country", 1), ("last_seen_at", -1)])
+        await collection.create_index([("country", 1), ("locations", 1), ("last_seen_at", -1)])
+        await collection.create_index("expires_at", expireAfterSeconds=0)
+
+    @staticmethod
+    def job_locations(job: Dict[str, Any], searched: Optional[str]) -> List[str]:
+        locations = {normalize_location(job.get(field)) for field in LOCATION_FIELDS}
+        if searched:
+            locations.add(searched)
+        locations -= {"", "n/a"}
+        return sorted(locations)
+
+    async def upsert(self, jobs: List[Dict[str, Any]], country: str, search_query: Optional[str] = None):
+        """
+        Record formatted postings the API returned for ``search_query``,
+        refreshing their freshness and remembering the query's location.
+        """
+        if self.db is None or not jobs:
+            return
+        now = datetime.utcnow()
+        country = country.strip().lower()
+        searched = split_query(search_query)[1] if search_query else None
+        operations = [
+            UpdateOne(
+                {"_id": job_fingerprint(job)},
+                {
+                    "$set": {
+                        **job,
+                        "country": country,
+                        "last_seen_at": now,
+                        "expires_at": now + timedelta(seconds=self.retention_seconds)
+                    },
+                    "$setOnInsert": {"first_seen_at": now},
+                    "$addToSet": {"locations": {"$each": self.job_locations(job, searched)}}
+                },
+                upsert=True
+            )
+            for job in jobs
+        ]
+        try:
+            await self.db[self.collection_name].bulk_write(operations, ordered=False)
+            self.upserts.inc(len(operations))
+        except Exception as e:
+            logger.warning(f"Job index write failed: {e}")
+
+    @staticmethod
+    def text_query(keywords: str) -> str:
+        """``$text`` search string requiring every keyword (each is quoted)."""
+        return " ".join(f'"{term}"' for term in keywords.lower().replace('"', " ").split())
+
+    async def search(self, search_query: str, page: int, country: str, num_pages: int = 1) -> Optional[List[Dict[str, Any]]]:
+        """
+        Pages ``page`` to ``page + num_pages - 1`` of fresh postings matching
+        every keyword and the location of ``search_query``, best match
+        first, or None unless the index fills every page (the last with at
+        least ``min_results``), so that a search is answered wholly here
+        or wholly by the API.
+        """
+        if self.db is None:
+            return None
+        keywords, location = split_query(search_query)
+        text = self.text_query(keywords)
+        if not text and not location:
+            return None
+
+        query: Dict[str, Any] = {
+            "country": country.strip().lower(),
+            "last_seen_at": {"$gte": datetime.utcnow() - timedelta(seconds=self.fresh_seconds)}
+        }
+        if location:
+            query["locations"] = location
+        if text:
+            query["$text"] = {"$search": text}
+            projection = {"score": {"$meta": "textScore"}}
+            sort = [("score", {"$meta": "textScore"}), ("last_seen_at", -1), ("_id", 1)]
+        else:
+            projection, sort = None, [("last_seen_at", -1), ("_id", 1)]
+        limit = num_pages * PAGE_SIZE
+
+        with self.latency.time():
+            try:
+                cursor = self.db[self.collection_name].find(query, projection).sort(sort) \
+                    .skip((page - 1) * PAGE_SIZE).limit(limit)
+                docs = await cursor.to_list(length=limit)
+            except Exception as e:
+                logger.warning(f"Job index search failed: {e}")
+                return None
+
+        if len(docs) < limit - PAGE_SIZE + min(self.min_results, PAGE_SIZE):
+            self.local_misses.inc()
+            return None
+        self.local_hits.inc()
+        internal = ("_id", "score", "country", "locations", "first_seen_at", "last_seen_at", "expires_at")
+        return [{field: value for field, value in doc.items() if field not in internal} for doc in docs]
+
+# Global instance
+job_index = JobIndex(
+    fresh_seconds=int(os.getenv("JOB_INDEX_FRESH_SECONDS", str(24 * 3600))),
+    retention_seconds=int(os.getenv("JOB_INDEX_RETENTION_SECONDS", str(14 * 24 * 3600))),
+    min_results=int(os.getenv("JOB_INDEX_MIN_RESULTS", str(PAGE_SIZE)))
+)
@@ -0,0 +1,290 @@
+import os
+import time
+import asyncio
+import logging
+from datetime import datetime, timedelta
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional
+from bson import ObjectId
+from dotenv import load_dotenv
+
+from utils.metrics import metrics
+from utils.worker_pool import PoolOverloadedError
+
+# Load environment variables
+load_dotenv()
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+# Statuses after which a job never changes again
+TERMINAL_STATUSES = ("completed", "failed")
+
+ProgressReporter = Callable[..., Awaitable[None]]
+JobHandler = Callable[[Dict[str, Any], ProgressReporter], Awaitable[Dict[str, Any]]]
+
+class JobQueue:
+    """
+    Background jobs persisted in Mongo and run by a fixed number of asyncio workers.
+
+    A job document moves ``queued -> running -> completed | failed`` and
+    accumulates progress events on the way, so status can be read from any
+    API node. Workers claim jobs with an atomic status transition, so a job
+    runs once even if several nodes see it queued. Handlers are registered
+    per job kind and receive the job document plus a ``report`` coroutine
+    for progress events.
+
+    A running job holds a lease that its worker renews every third of
+    ``lease_seconds``. If the node dies, the lease runs out and a sweep on
+    any node (at startup, then every ``lease_seconds``) puts the job back
+    in the queue, or fails it after ``max_attempts`` runs, so its event
+    stream always ends. A job interrupted by a graceful shutdown is put
+    back in the queue the same way, for the next start to run.
+    """
+
+    def __init__(self, name: str, concurrency: int, max_pending: int, collection_name: str,
+                 lease_seconds: float = 120, max_attempts: int = 2):
+        self.name = name
+        self.concurrency = max(1, concurrency)
+        self.max_pending = max(self.concurrency, max_pending)
+        self.collection_name = collection_name
+        self.lease = timedelta(seconds=lease_seconds)
+        self.max_attempts = max(1, max_attempts)
+        self._handlers: Dict[str, JobHandler] = {}
+        self._queue: Optional[asyncio.Queue] = None
+        self._workers: List[asyncio.Task] = []
+        self._db = None
+        # Wakes local event-stream readers as soon as a job changes
+        self._listeners: Dict[str, List[asyncio.Event]] = {}
+
+        self.queue_depth = metrics.gauge(f"{name}_queue_depth", "Jobs waiting for a worker")
+        self.job_seconds = metrics.histogram(f"{name}_job_seconds", "Job run time, excluding queue wait")
+        self.rejected = metrics.counter(f"{name}_rejected_total", "Jobs rejected because the queue was full")
+        self.failures = metrics.counter(f"{name}_failures_total", "Jobs whose handler raised")
+        self.recovered = metrics.counter(f"{name}_recovered_total", "Jobs whose lease expired while running")
+
+    def register(self, kind: str, handler: JobHandler):
+        """Register the coroutine that runs jobs of ``kind``."""
+        self._handlers[kind] = handler
+
+    @property
+    def collection(self):
+        return self._db[self.collection_name]
+
+    async def ensure_indexes(self, db):
+        collection = db[self.collection_name]
+        await collection.create_index([("user_id", 1), ("created_at", -1)])
+        await collection.create_index([("status", 1), ("lease_expires_at", 1)])
+
+    async def start(self, db):
+        """
+        Start the workers and pick up jobs still queued, or left running by a
+        node that stopped, from before a restart.
+        """
+        if self._queue is not None:
+            return
+        self._db = db
+        self._queue = asyncio.Queue()
+        self._workers = [asyncio.create_task(self._worker(index)) for index in range(self.concurrency)]
+
+        await self._recover(enqueue=False)
+        async for doc in self.collection.find({"status": "queued"}, {"_id": 1}).sort("created_at", 1):
+            self._queue.put_nowait(doc["_id"])
+        self.queue_depth.set(self._queue.qsize())
+        self._workers.append(asyncio.create_task(self._recovery_loop()))
+        logger.info(f"Job queue '{self.name}' started with {self.concurrency} worker(s)")
+
+    async def _recover(self, enqueue: bool = True):
+        """Requeue (or, out of attempts, fail) running jobs whose lease has expired."""
+        now = datetime.utcnow()
+        stale = {
+            "status": "running",
+            "$or": [
+                {"lease_expires_at": {"$lt": now}},
+                # Claimed before leases existed
+                {"lease_expires_at": None, "started_at": {"$lt": now - self.lease}}
+            ]
+        }
+        async for doc in self.collection.find(stale, {"attempts": 1, "lease_expires_at": 1}):
+            # Only if no worker renewed the lease in the meantime
+            guard = {"_id": doc["_id"], "status": "running", "lease_expires_at": doc.get("lease_expires_at")}
+            retry = doc.get("attempts", 1) < self.max_attempts
+            if retry:
+                update = {"status": "queued", "updated_at": now}
+            else:
+                update = {"status": "failed", "error": "The server running this job stopped before it finished", "updated_at": now}
+            result = await self.collection.update_one(guard, {"$set": update})
+            if not result.modified_count:
+                continue
+            self.recovered.inc()
+            logger.warning(f"Job {doc['_id']} lost its worker; {'requeued' if retry else 'marked failed'}")
+            self._notify(doc["_id"])
+            if retry and enqueue:
+                self._queue.put_nowait(doc["_id"])
+                self.queue_depth.set(self._queue.qsize())
+
+    async def _recovery_loop(self):
+        while True:
+            await asyncio.sleep(self.lease.total_seconds())
+            try:
+                await self._recover()
+            except Exception as e:
+                logger.error(f"Job queue '{self.name}' recovery sweep failed: {e}")
+
+    async def _renew_lease(self, job_id: ObjectId):
+        while True:
+            await asyncio.sleep(self.lease.total_seconds() / 3)
+            try:
+                await self.collection.update_one(
+                    {"_id": job_id, "status": "running"},
+                    {"$set": {"lease_expires_at": datetime.utcnow() + self.lease}}
+                )
+            except Exception as e:
+                logger.warning(f"Job {job_id} lease renewal failed: {e}")
+
+    async def shutdown(self):
+        """Stop the workers; unfinished jobs stay in Mongo."""
+        for task in self._workers:
+            task.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+        self._queue = None
+        logger.info(f"Job queue '{self.name}' stopped")
+
+    async def enqueue(self, kind: str, user_id: str, payload: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Persist a new job and queue it for a worker.
+
+        Raises ``PoolOverloadedError`` when ``max_pending`` jobs are already waiting.
+        """
+        if kind not in self._handlers:
+            raise ValueError(f"Unknown job kind '{kind}'")
+        if self._queue is None:
+            raise RuntimeError(f"Job queue '{self.name}' is not running")
+        if self._queue.qsize() >= self.max_pending:
+            self.rejected.inc()
+            raise PoolOverloadedError(f"Job queue '{self.name}' is at capacity")
+
+        now = datetime.utcnow()
+        job = {
+            "_id": ObjectId(),
+            "kind": kind,
+            "user_id": ObjectId(user_id),
+            "payload": payload,
+            "status": "queued",
+            "events": [],
+            "result": None,
+            "error": None,
+            "created_at": now,
+            "updated_at": now
+        }
+        await self.collection.insert_one(job)
+        self._queue.put_nowait(job["_id"])
+        self.queue_depth.set(self._queue.qsize())
+        return job
+
+    async def get(self, job_id: str, user_id: str) -> Optional[Dict[str, Any]]:
+        """Get a job owned by ``user_id`` (None for unknown ids and other users' jobs)."""
+        if not ObjectId.is_valid(job_id):
+            return None
+        return await self.collection.find_one(
+            {"_id": ObjectId(job_id), "user_id": ObjectId(user_id)},
+            {"payload": 0}
+        )
+
+    async def _update(self, job_id: ObjectId, update: Dict[str, Any]):
+        update.setdefault("$set", {})["updated_at"] = datetime.utcnow()
+        await self.collection.update_one({"_id": job_id}, update)
+        self._notify(job_id)
+
+    def _notify(self, job_id: ObjectId):
+        for event in self._listeners.get(str(job_id), []):
+            event.set()
+
+    async def _worker(self, index: int):
+        while True:
+            job_id = await self._queue.get()
+            self.queue_depth.set(self._queue.qsize())
+            try:
+                await self._run(job_id)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Job queue '{self.name}' worker {index} error: {e}")
+
+    async def _run(self, job_id: ObjectId):
+        # Atomic claim: only one worker (on any node) moves a job out of "queued"
+        now = datetime.utcnow()
+        job = await self.collection.find_one_and_update(
+            {"_id": job_id, "status": "queued"},
+            {
+                "$set": {"status": "running", "started_at": now, "lease_expires_at": now + self.lease, "updated_at": now},
+                "$inc": {"attempts": 1}
+            }
+        )
+        if job is None:
+            return
+        self._notify(job_id)
+        heartbeat = asyncio.create_task(self._renew_lease(job_id))
+
+        async def report(stage: str, **data: Any):
+            await self._update(job_id, {"$push": {"events": {"stage": stage, "at": datetime.utcnow(), **data}}})
+
+        start = time.perf_counter()
+        try:
+            result = await self._handlers[job["kind"]](job, report)
+            await self._update(job_id, {"$set": {"status": "completed", "result": result}})
+        except asyncio.CancelledError:
+            if job.get("attempts", 0) + 1 < self.max_attempts:
+                await self._update(job_id, {"$set": {"status": "queued"}, "$unset": {"lease_expires_at": ""}})
+            else:
+                await self._update(job_id, {"$set": {"status": "failed", "error": "Server shut down before the job finished"}})
+            raise
+        except Exception as e:
+            self.failures.inc()
+            logger.error(f"Job {job_id} ({job['kind']}) failed: {e}")
+            await self._update(job_id, {"$set": {"status": "failed", "error": str(e)}})
+        finally:
+            heartbeat.cancel()
+            self.job_seconds.observe(time.perf_counter() - start)
+
+    async def watch(self, job_id: str, user_id: str, poll_interval: float = 1.0) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Yield the job document every time it changes, until it finishes.
+
+        Changes made on this node wake the reader immediately; polling at
+        ``poll_interval`` covers jobs running on other nodes.
+        """
+        event = asyncio.Event()
+        self._listeners.setdefault(job_id, []).append(event)
+        try:
+            last_update = None
+            while True:
+                event.clear()
+                job = await self.get(job_id, user_id)
+                if job is None:
+                    return
+                if job["updated_at"] != last_update:
+                    last_update = job["updated_at"]
+                    yield job
+                if job["status"] in TERMINAL_STATUSES:
+                    return
+                try:
+                    await asyncio.wait_for(event.wait(), poll_interval)
+                except asyncio.TimeoutError:
+                    pass
+        finally:
+            listeners = self._listeners.get(job_id, [])
+            if event in listeners:
+                listeners.remove(event)
+            if not listeners:
+                self._listeners.pop(job_id, None)
+
+# Global instance
+document_jobs = JobQueue(
+    name="document_jobs",
+    concurrency=int(os.getenv("DOCUMENT_JOB_WORKERS", "4")),
+    max_pending=int(os.getenv("DOCUMENT_JOB_MAX_PENDING", "100")),
+    collection_name="document_jobs",
+    lease_seconds=float(os.getenv("DOCUMENT_JOB_LEASE_SECONDS", "120")),
+    max_attempts=int(os.getenv("DOCUMENT_JOB_MAX_ATTEMPTS", "2"))
+)
@@ -0,0 +1,104 @@
+import os
+import httpx
+import logging
+from typing import Any, Dict, List, Optional
+from dotenv import load_dotenv
+
+try:
+    import h2  # noqa: F401  (enables HTTP/2 in httpx)
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+from utils.metrics import metrics
+
+# Load environment variables
+load_dotenv()
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+class JSearchError(Exception):
+    """Base class for JSearch API failures."""
+
+class JSearchAPIError(JSearchError):
+    """The JSearch API answered with a non-200 status."""
+
+    def __init__(self, message: str, status_code: int):
+        super().__init__(message)
+        self.status_code = status_code
+
+class JSearchService:
+    """
+    Client for the RapidAPI JSearch job search API.
+
+    One pooled ``httpx.AsyncClient`` is shared by all searches, so
+    connections (and their DNS, TCP and TLS setup) are reused across
+    requests; it is closed on application shutdown.
+    """
+
+    def __init__(self):
+        self.api_key = os.getenv("RAPIDAPI_KEY")
+        self.url = os.getenv("JSEARCH_API_URL", "https://jsearch.p.rapidapi.com/search")
+        self.host = httpx.URL(self.url).host
+        self.limits = httpx.Limits(
+            max_connections=int(os.getenv("JSEARCH_MAX_CONNECTIONS", "10")),
+            max_keepalive_connections=int(os.getenv("JSEARCH_MAX_KEEPALIVE", "10")),
+            keepalive_expiry=60.0
+        )
+        self.timeout = httpx.Timeout(
+            connect=float(os.getenv("JSEARCH_CONNECT_TIMEOUT", "5")),
+            read=float(os.getenv("JSEARCH_READ_TIMEOUT", "30")),
+            write=10.0,
+            pool=float(os.getenv("JSEARCH_POOL_TIMEOUT", "10"))
+        )
+        self._client: Optional[httpx.AsyncClient] = None
+        # Requests left in the RapidAPI quota period, as of the last response
+        self.quota_remaining: Optional[int] = None
+
+        self.requests = metrics.counter("jsearch_requests_total", "Requests sent to the JSearch API")
+        self.latency = metrics.histogram("jsearch_request_seconds", "JSearch API response time")
+        self.quota_gauge = metrics.gauge("jsearch_quota_remaining", "RapidAPI requests left in the quota period")
+
+    def is_available(self) -> bool:
+        return bool(self.api_key)
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        """Shared client, created on first use."""
+        if self._client is None or self._client.is_closed:
+            self._client = httpx.AsyncClient(
+                headers={"x-rapidapi-key": self.api_key or "", "x-rapidapi-host": self.host},
+                http2=HTTP2_AVAILABLE,
+                limits=self.limits,
+                timeout=self.timeout
+            )
+        return self._client
+
+    async def aclose(self):
+        """Close pooled connections (called on application shutdown)."""
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    async def search(self, query: str, page: int, num_pages: int, country: str, date_posted: str) -> List[Dict[str, Any]]:
+        """Raw postings for one search; httpx timeouts and request errors propagate."""
+        self.requests.inc()
+        with self.latency.time():
+            response = await self.client.get(self.url, params={
+                "query": query,
+                "page": str(page),
+                "num_pages": str(num_pages),
+                "country": country,
+                "date_posted": date_posted
+            })
+        remaining = response.headers.get("x-ratelimit-requests-remaining")
+        if remaining is not None and remaining.isdigit():
+            self.quota_remaining = int(remaining)
+            self.quota_gauge.set(self.quota_remaining)
+        if response.status_code != 200:
+            raise JSearchAPIError(f"RapidAPI error: {response.text}", response.status_code)
+        return response.json().get("data", [])
+
+# Global instance
+jsearch_service = JSearchService()
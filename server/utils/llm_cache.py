@@ -0,0 +1,122 @@
+import os
+import time
+import json
+import hashlib
+import logging
+from datetime import datetime, timedelta
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+from dotenv import load_dotenv
+
+from utils.metrics import metrics
+from utils.single_flight import SingleFlight
+from utils.tiered_cache import TieredCache
+
+# Load environment variables
+load_dotenv()
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+class LLMCache(TieredCache):
+    """
+    Two-tier cache of LLM completions keyed by a hash of the full request,
+    with single-flight coalescing.
+
+    The in-memory LRU and the Mongo collection (expired by a TTL index) work
+    like ParseCache. On a miss, concurrent requests for the same key share
+    one upstream call through ``SingleFlight``, which also hands the call to
+    a waiter if the caller making it is cancelled.
+    Each entry remembers the tokens and time the original call took, so hits
+    report how many tokens and how much latency the cache saved.
+    """
+
+    def __init__(self, max_entries: int = 512, ttl_seconds: int = 7 * 24 * 3600, collection_name: str = "llm_cache"):
+        super().__init__("LLM cache", max_entries, collection_name)
+        self.ttl_seconds = ttl_seconds
+        self._flights = SingleFlight()
+
+        self.memory_hits = metrics.counter("llm_cache_memory_hits_total", "Completions served from the in-memory LRU")
+        self.mongo_hits = metrics.counter("llm_cache_mongo_hits_total", "Completions served from the Mongo tier")
+        self.misses = metrics.counter("llm_cache_misses_total", "Completions that needed an upstream call")
+        self.coalesced = metrics.counter("llm_cache_coalesced_total", "Requests that joined an identical in-flight call")
+        self.hit_ratio = metrics.gauge("llm_cache_hit_ratio", "Share of requests not sent upstream")
+        self.tokens_saved = metrics.counter("llm_cache_tokens_saved_total", "Upstream tokens avoided by cache hits")
+        self.latency_saved = metrics.counter("llm_cache_latency_saved_seconds_total", "Upstream latency avoided by cache hits")
+
+    async def ensure_indexes(self, db):
+        await db[self.collection_name].create_index("expires_at", expireAfterSeconds=0)
+
+    @staticmethod
+    def make_key(request: Dict[str, Any]) -> str:
+        """SHA-256 of the canonical JSON of the request body (model, messages, limits)."""
+        return hashlib.sha256(json.dumps(request, sort_keys=True, separators=(",", ":")).encode("utf-8")).hexdigest()
+
+    def _record_hit(self, entry: Dict[str, Any]):
+        self.tokens_saved.inc(entry.get("tokens", 0))
+        self.latency_saved.inc(entry.get("latency", 0.0))
+        self._update_ratio()
+
+    def _update_ratio(self):
+        hits = self.memory_hits.value + self.mongo_hits.value + self.coalesced.value
+        total = hits + self.misses.value
+        self.hit_ratio.set(round(hits / total, 4) if total else 0.0)
+
+    async def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """Look a key up in memory first, then in Mongo."""
+        entry, tier = await self._load(key)
+        if tier == "memory":
+            self.memory_hits.inc()
+        elif tier == "mongo":
+            self.mongo_hits.inc()
+        return entry
+
+    async def put(self, key: str, text: str, tokens: int, latency: float):
+        """Store a completion in both tiers."""
+        await self._store(key, {
+            "text": text,
+            "tokens": tokens,
+            "latency": latency,
+            "expires_at": datetime.utcnow() + timedelta(seconds=self.ttl_seconds)
+        })
+
+    async def cached(self, key: str) -> Optional[str]:
+        """Get the cached text for ``key``, counting the hit and what it saved."""
+        entry = await self.get(key)
+        if entry is None:
+            return None
+        self._record_hit(entry)
+        return entry["text"]
+
+    def record_miss(self):
+        """Count a request that went upstream without ``get_or_generate`` (e.g. streaming)."""
+        self.misses.inc()
+        self._update_ratio()
+
+    async def get_or_generate(self, key: str, generate: Callable[[], Awaitable[Tuple[str, int]]]) -> str:
+        """
+        Return the cached completion for ``key`` or run ``generate``, which
+        returns ``(text, total_tokens)``. Failures are not cached.
+        """
+        text = await self.cached(key)
+        if text is not None:
+            return text
+
+        async def generate_and_store() -> Tuple[str, int, float]:
+            self.record_miss()
+            start = time.perf_counter()
+            text, tokens = await generate()
+            latency = time.perf_counter() - start
+            await self.put(key, text, tokens, latency)
+            return text, tokens, latency
+
+        (text, tokens, latency), shared = await self._flights.do(key, generate_and_store)
+        if shared:
+            self.coalesced.inc()
+            self._record_hit({"tokens": tokens, "latency": latency})
+        return text
+
+# Global instance
+llm_cache = LLMCache(
+    max_entries=int(os.getenv("LLM_CACHE_SIZE", "512")),
+    ttl_seconds=int(os.getenv("LLM_CACHE_TTL_SECONDS", str(7 * 24 * 3600)))
+)
@@ -0,0 +1,101 @@
+import os
+import hashlib
+import logging
+from typing import Any, Awaitable, Callable, Dict, Optional
+from dotenv import load_dotenv
+from pymongo.errors import OperationFailure
+
+from utils.metrics import metrics
+from utils.pdf_parser import PARSER_VERSION
+from utils.tiered_cache import TieredCache
+
+# Load environment variables
+load_dotenv()
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+class ParseCache(TieredCache):
+    """
+    Two-tier cache of ResumeParser results keyed by PDF content hash.
+
+    The in-memory LRU answers repeat uploads on the same API node; the Mongo
+    collection shares results across nodes and restarts. Keys include the
+    parser version, so a parser change naturally invalidates old entries;
+    a TTL index on ``created_at`` removes them from Mongo after ``ttl_seconds``.
+    """
+
+    def __init__(self, max_entries: int = 256, ttl_seconds: int = 30 * 24 * 3600, collection_name: str = "parse_cache"):
+        super().__init__("Parse cache", max_entries, collection_name)
+        self.ttl_seconds = ttl_seconds
+
+        self.memory_hits = metrics.counter("parse_cache_memory_hits_total", "Parses served from the in-memory LRU")
+        self.mongo_hits = metrics.counter("parse_cache_mongo_hits_total", "Parses served from the Mongo tier")
+        self.misses = metrics.counter("parse_cache_misses_total", "Parses that had to run the parser")
+
+    async def ensure_indexes(self, db):
+        # created_at (rather than an expires_at field) also expires entries written before the index existed
+        try:
+            await db[self.collection_name].create_index("created_at", expireAfterSeconds=self.ttl_seconds, name="created_at_ttl")
+        except OperationFailure:
+            # PARSE_CACHE_TTL_SECONDS changed since the index was created
+            await db.command("collMod", self.collection_name, index={"name": "created_at_ttl", "expireAfterSeconds": self.ttl_seconds})
+
+    @staticmethod
+    def make_key(pdf_content: bytes) -> str:
+        """Cache key: parser version plus SHA-256 of the PDF bytes."""
+        return ParseCache.key_for_digest(hashlib.sha256(pdf_content).hexdigest())
+
+    @staticmethod
+    def key_for_digest(sha256: str) -> str:
+        return f"{PARSER_VERSION}:{sha256}"
+
+    async def get(self, db, key: str) -> Optional[Dict[str, Any]]:
+        """Look a key up in memory first, then in Mongo."""
+        entry, tier = await self._load(key, db)
+        if tier == "memory":
+            self.memory_hits.inc()
+        elif tier == "mongo":
+            self.mongo_hits.inc()
+        return entry["result"] if entry is not None else None
+
+    async def put(self, db, key: str, result: Dict[str, Any]):
+        """Store a parse result in both tiers."""
+        await self._store(key, {"result": result}, db)
+
+    async def get_or_parse(
+        self,
+        db,
+        pdf_content: bytes,
+        parse: Callable[[bytes], Awaitable[Dict[str, Any]]]
+    ) -> Dict[str, Any]:
+        """Return the cached parse result for ``pdf_content`` or run ``parse`` and cache it."""
+        async def load() -> bytes:
+            return pdf_content
+        return await self.get_or_parse_digest(db, hashlib.sha256(pdf_content).hexdigest(), load, parse)
+
+    async def get_or_parse_digest(
+        self,
+        db,
+        sha256: str,
+        load: Callable[[], Awaitable[bytes]],
+        parse: Callable[[bytes], Awaitable[Dict[str, Any]]]
+    ) -> Dict[str, Any]:
+        """``get_or_parse`` for a PDF known by hash; ``load`` reads its bytes only on a miss."""
+        key = self.key_for_digest(sha256)
+        result = await self.get(db, key)
+        if result is not None:
+            return result
+
+        self.misses.inc()
+        result = await parse(await load())
+        # Only successful parses are cached; failures are cheap to reproduce
+        if result.get('parsed_successfully'):
+            await self.put(db, key, result)
+        return result
+
+# Global instance
+parse_cache = ParseCache(
+    max_entries=int(os.getenv("PARSE_CACHE_SIZE", "256")),
+    ttl_seconds=int(os.getenv("PARSE_CACHE_TTL_SECONDS", str(30 * 24 * 3600)))
+)
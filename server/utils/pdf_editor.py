@@ -1,25 +1,50 @@
 import os
 import logging
 import tempfile
+import threading
+from collections import OrderedDict
+from datetime import date
 from PyPDF2 import PdfReader, PdfWriter
 from reportlab.pdfgen import canvas
+from reportlab.pdfbase import pdfmetrics
 from reportlab.lib.pagesizes import letter, A4
 from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle
+from reportlab.platypus import BaseDocTemplate, PageTemplate, Frame, Paragraph, Spacer, Table, TableStyle
+from reportlab.platypus.paragraph import cleanBlockQuotedText
+from reportlab.platypus.paraparser import ParaParser
 from reportlab.lib.units import inch
 from reportlab.lib.colors import black, white
 from reportlab.lib import colors
 from reportlab.lib.enums import TA_LEFT, TA_CENTER, TA_RIGHT
 from io import BytesIO
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Tuple
 
 # Configure logging
 logger = logging.getLogger(__name__)
 
+# Parsed overlay template PDFs kept in memory
+TEMPLATE_CACHE_SIZE = 8
+
 class PDFEditor:
+    """
+    Renders cover letters and resumes with ReportLab.
+
+    Everything that doesn't depend on the document is built once per
+    instance: styles, the page template, font metrics and the parsed text
+    fragment of each style (plain-text paragraphs reuse it instead of going
+    through the markup parser). Renders are serialized by a lock because
+    the page template's frames hold layout state during a build.
+    """
+
     def __init__(self):
         self.styles = getSampleStyleSheet()
         self._setup_custom_styles()
+        self._lock = threading.Lock()
+        self._page_templates = [self._page_template()]
+        self._fragments: Dict[str, Any] = {}
+        self._date_line: Tuple[date, str] = (None, "")
+        self._overlay_templates: "OrderedDict[tuple, PdfReader]" = OrderedDict()
+        self._load_fonts()
         
     def _setup_custom_styles(self):
         """Setup custom paragraph styles for professional documents"""
@@ -68,64 +93,82 @@ class PDFEditor:
             leading=12
         ))
     
-    def create_cover_letter_pdf(self, content: str, user_name: str, filename: str) -> str:
+    def _page_template(self) -> PageTemplate:
+        """One-frame letter page with 1 inch margins, as SimpleDocTemplate lays it out"""
+        width, height = letter
+        frame = Frame(inch, inch, width - 2 * inch, height - 2 * inch, id='normal')
+        return PageTemplate(id='First', frames=[frame], pagesize=letter)
+    
+    def _load_fonts(self):
+        """Load the metrics of every font the styles use, so the first render doesn't pay for it"""
+        for style in self.styles.byName.values():
+            font_name = getattr(style, 'fontName', None)
+            if font_name:
+                pdfmetrics.getFont(font_name)
+    
+    def _paragraph(self, text: str, style_name: str) -> Paragraph:
+        style = self.styles[style_name]
+        if '<' in text or '&' in text:
+            return Paragraph(text, style)
+        # Plain text: clone the style's parsed fragment instead of running the markup parser
+        fragment = self._fragments.get(style_name)
+        if fragment is None:
+            fragment = self._fragments[style_name] = ParaParser().parse("x", style)[1][0]
+        text = cleanBlockQuotedText(text)
+        return Paragraph(text, style, frags=[fragment.clone(text=text)])
+    
+    def _current_date(self) -> str:
+        today = date.today()
+        if self._date_line[0] != today:
+            self._date_line = (today, today.strftime("%B %d, %Y"))
+        return self._date_line[1]
+    
+    def _build(self, story: list) -> bytes:
+        buffer = BytesIO()
+        # invariant=1 keeps the output deterministic so identical documents hash identically
+        doc = BaseDocTemplate(buffer, pagesize=letter, invariant=1, pageTemplates=self._page_templates)
+        with self._lock:
+            doc.build(story)
+        return buffer.getvalue()
+    
+    def render_cover_letter(self, content: str, user_name: str) -> bytes:
         """
-        Create a professional cover letter PDF
+        Render a professional cover letter PDF in memory
         """
         try:
-            # Create output directory if it doesn't exist
-            output_dir = os.path.join(os.getcwd(), "server", "resumes")
-            os.makedirs(output_dir, exist_ok=True)
-            
-            filepath = os.path.join(output_dir, filename)
-            
-            # Create PDF document
-            doc = SimpleDocTemplate(filepath, pagesize=letter)
             story = []
             
             # Add title
-            story.append(Paragraph("COVER LETTER", self.styles['CoverLetterTitle']))
+            story.append(self._paragraph("COVER LETTER", 'CoverLetterTitle'))
             story.append(Spacer(1, 20))
             
             # Add date
-            from datetime import datetime
-            current_date = datetime.now().strftime("%B %d, %Y")
-            story.append(Paragraph(current_date, self.styles['CoverLetterBody']))
+            story.append(self._paragraph(self._current_date(), 'CoverLetterBody'))
             story.append(Spacer(1, 20))
             
             # Add content
             paragraphs = content.split('\n\n')
             for paragraph in paragraphs:
                 if paragraph.strip():
-                    story.append(Paragraph(paragraph.strip(), self.styles['CoverLetterBody']))
+                    story.append(self._paragraph(paragraph.strip(), 'CoverLetterBody'))
                     story.append(Spacer(1, 12))
             
             # Build PDF
-            doc.build(story)
-            
-            return filepath
+            return self._build(story)
             
         except Exception as e:
             logger.error(f"Error creating cover letter PDF: {str(e)}")
             raise
     
-    def create_resume_pdf(self, content: str, user_name: str, filename: str) -> str:
+    def render_resume(self, content: str, user_name: str) -> bytes:
         """
-        Create a professional resume PDF
+        Render a professional resume PDF in memory
         """
         try:
-            # Create output directory if it doesn't exist
-            output_dir = os.path.join(os.getcwd(), "server", "resumes")
-            os.makedirs(output_dir, exist_ok=True)
-            
-            filepath = os.path.join(output_dir, filename)
-            
-            # Create PDF document
-            doc = SimpleDocTemplate(filepath, pagesize=letter)
             story = []
             
             # Add title
-            story.append(Paragraph(user_name.upper(), self.styles['ResumeTitle']))
+            story.append(self._paragraph(user_name.upper(), 'ResumeTitle'))
             story.append(Spacer(1, 15))
             
             # Parse content and create sections
@@ -133,7 +176,7 @@ class PDFEditor:
             
             for section_title, section_content in sections.items():
                 # Add section header
-                story.append(Paragraph(section_title.upper(), self.styles['ResumeSection']))
+                story.append(self._paragraph(section_title.upper(), 'ResumeSection'))
                 story.append(Spacer(1, 8))
                 
                 # Add section content
@@ -141,25 +184,56 @@ class PDFEditor:
                     # Handle bullet points
                     for item in section_content:
                         if item.strip():
-                            story.append(Paragraph(f"• {item.strip()}", self.styles['ResumeBody']))
+                            story.append(self._paragraph(f"• {item.strip()}", 'ResumeBody'))
                 else:
                     # Handle paragraph content
                     paragraphs = section_content.split('\n')
                     for paragraph in paragraphs:
                         if paragraph.strip():
-                            story.append(Paragraph(paragraph.strip(), self.styles['ResumeBody']))
+                            story.append(self._paragraph(paragraph.strip(), 'ResumeBody'))
                 
                 story.append(Spacer(1, 12))
             
             # Build PDF
-            doc.build(story)
-            
-            return filepath
+            return self._build(story)
             
         except Exception as e:
             logger.error(f"Error creating resume PDF: {str(e)}")
             raise
     
+    def render_many(self, jobs: List[Tuple[str, str, str]]) -> List[bytes]:
+        """
+        Render ``(document_type, content, user_name)`` jobs in one pass, for
+        bulk regeneration: one worker round trip for the whole batch
+        """
+        return [
+            self.render_cover_letter(content, user_name) if document_type == "cover_letter"
+            else self.render_resume(content, user_name)
+            for document_type, content, user_name in jobs
+        ]
+    
+    def _write(self, pdf_bytes: bytes, filename: str) -> str:
+        # Create output directory if it doesn't exist
+        output_dir = os.path.join(os.getcwd(), "server", "resumes")
+        os.makedirs(output_dir, exist_ok=True)
+        
+        filepath = os.path.join(output_dir, filename)
+        with open(filepath, "wb") as f:
+            f.write(pdf_bytes)
+        return filepath
+    
+    def create_cover_letter_pdf(self, content: str, user_name: str, filename: str) -> str:
+        """
+        Create a professional cover letter PDF file (prefer render_cover_letter)
+        """
+        return self._write(self.render_cover_letter(content, user_name), filename)
+    
+    def create_resume_pdf(self, content: str, user_name: str, filename: str) -> str:
+        """
+        Create a professional resume PDF file (prefer render_resume)
+        """
+        return self._write(self.render_resume(content, user_name), filename)
+    
     def _parse_resume_content(self, content: str) -> Dict[str, Any]:
         """Parse resume content into sections"""
         sections = {}
@@ -191,17 +265,33 @@ class PDFEditor:
         
         return sections
     
+    def _overlay_template(self, path: str) -> PdfReader:
+        stat = os.stat(path)
+        key = (os.path.abspath(path), stat.st_mtime_ns, stat.st_size)
+        with self._lock:
+            reader = self._overlay_templates.get(key)
+            if reader is not None:
+                self._overlay_templates.move_to_end(key)
+                return reader
+        with open(path, "rb") as f:
+            reader = PdfReader(BytesIO(f.read()))
+        with self._lock:
+            self._overlay_templates[key] = reader
+            while len(self._overlay_templates) > TEMPLATE_CACHE_SIZE:
+                self._overlay_templates.popitem(last=False)
+        return reader
+    
     def overlay_text_on_pdf(self, original_pdf_path: str, text_content: str, output_path: str) -> str:
         """
         Overlay text content on an existing PDF template
         """
         try:
-            # Read original PDF
-            reader = PdfReader(original_pdf_path)
+            # Parsed template, cached until the file changes
+            reader = self._overlay_template(original_pdf_path)
             writer = PdfWriter()
             
-            # Get first page
-            page = reader.pages[0]
+            # Copy the first page into the writer; merging into the copy leaves the cached page untouched
+            page = writer.add_page(reader.pages[0])
             
             # Create a new PDF with the text overlay
             packet = BytesIO()
@@ -228,11 +318,8 @@ class PDFEditor:
             # Merge the overlay with the original page
             page.merge_page(overlay_page)
             
-            # Add the merged page to the writer
-            writer.add_page(page)
-            
             # Write the result to a temporary file
-            with tempfile.NamedTemporaryFile(delete=False, suffix='.pdf') as temp_file:
+            with tempfile.NamedTemporaryFile(delete=False, prefix='bridgeai_', suffix='.pdf') as temp_file:
                 writer.write(temp_file)
                 temp_path = temp_file.name
             
@@ -244,4 +331,14 @@ class PDFEditor:
             return self.create_cover_letter_pdf(text_content, "User", "cover_letter.pdf")
 
 # Create a global instance
-pdf_editor = PDFEditor() 
\ No newline at end of file
+pdf_editor = PDFEditor()
+
+def render_document(document_type: str, content: str, user_name: str) -> bytes:
+    """Module-level entry point so the render pool workers can pickle the jobs."""
+    if document_type == "cover_letter":
+        return pdf_editor.render_cover_letter(content, user_name)
+    return pdf_editor.render_resume(content, user_name)
+
+def render_documents(jobs: List[Tuple[str, str, str]]) -> List[bytes]:
+    """Render a batch of ``(document_type, content, user_name)`` jobs in one worker call."""
+    return pdf_editor.render_many(jobs)
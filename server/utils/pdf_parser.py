@@ -1,140 +1,261 @@
 import PyPDF2
+import os
 import re
-from typing import Dict, List, Optional, Union, Any
+import math
+import asyncio
+from typing import Dict, List, Optional, Union, Any, Iterable, Iterator, Set, Tuple
 import io
+from dotenv import load_dotenv
+
+from utils.text_matcher import tokenize
+from utils.skills_taxonomy import SkillsTaxonomy, skills_taxonomy
+from utils.worker_pool import PoolOverloadedError, PoolTimeoutError
+
+# Load environment variables
+load_dotenv()
+
+# Bump whenever parsing output changes so cached parse results are invalidated
+PARSER_REVISION = "4"
+
+# Keywords come from the skills taxonomy, so its version is part of the parser version
+PARSER_VERSION = f"{PARSER_REVISION}-{skills_taxonomy.version}"
+
+# Pages beyond this are ignored so pathological PDFs can't monopolize a worker
+MAX_PAGES = int(os.getenv("PARSE_MAX_PAGES", "30"))
+
+# Files at least this large have their pages extracted in parallel
+PARALLEL_MIN_BYTES = int(os.getenv("PARSE_PARALLEL_MIN_BYTES", str(2 * 1024 * 1024)))
+
+_WHITESPACE_RE = re.compile(r'\s+')
+_SPECIAL_CHARS_RE = re.compile(r'[^\w\s\.\,\;\:\!\?\-\(\)]')
 
 class ResumeParser:
     """Parse PDF resumes and extract structured text content."""
-    
-    def __init__(self):
+
+    def __init__(self, taxonomy: SkillsTaxonomy = skills_taxonomy):
         self.sections = {
             'experience': ['experience', 'work history', 'employment', 'work experience', 'professional experience'],
             'education': ['education', 'academic', 'degree', 'university', 'college', 'school'],
             'skills': ['skills', 'competencies', 'technologies', 'technical skills', 'programming languages']
         }
-    
-    def extract_text_from_pdf(self, pdf_content: bytes) -> Dict[str, Union[str, Dict[str, str], bool]]:
+
+        self._section_priority = {section: index for index, section in enumerate(self.sections)}
+
+        # A handful of fixed headers: one precompiled regex beats the token automaton here
+        self._header_sections = {
+            header: section for section, headers in self.sections.items() for header in headers
+        }
+        self._header_re = re.compile(r'\b(?:%s)\b' % '|'.join(
+            r'\s+'.join(map(re.escape, header.split()))
+            for header in sorted(self._header_sections, key=len, reverse=True)
+        ))
+        self.taxonomy = taxonomy
+
+    def iter_page_texts(
+        self,
+        pdf_content: bytes,
+        start: int = 0,
+        stop: Optional[int] = None,
+        max_pages: Optional[int] = None
+    ) -> Iterator[str]:
         """
-        Extract structured text from PDF content.
-        
-        Args:
-            pdf_content: PDF file content as bytes
-            
-        Returns:
-            Dictionary with structured resume sections
+        Lazily yield the text of each page in ``[start, stop)``.
+
+        At most ``max_pages`` pages (default ``PARSE_MAX_PAGES``) are read.
         """
-        try:
-            # Open PDF from bytes
-            pdf_reader = PyPDF2.PdfReader(io.BytesIO(pdf_content))
-            
-            # Extract all text
-            full_text = ""
-            for page in pdf_reader.pages:
-                full_text += page.extract_text()
-            
-            # Parse into sections
-            structured_content = self._parse_sections(full_text)
-            
-            return {
-                'full_text': full_text,
-                'structured_content': structured_content,
-                'parsed_successfully': True
-            }
-            
-        except Exception as e:
-            return {
-                'full_text': '',
-                'structured_content': {},
-                'parsed_successfully': False,
-                'error': str(e)
-            }
-    
-    def _parse_sections(self, text: str) -> Dict[str, str]:
-        """Parse text into resume sections based on headers."""
-        sections = {
+        pdf_reader = PyPDF2.PdfReader(io.BytesIO(pdf_content))
+        if max_pages is None:
+            max_pages = MAX_PAGES
+        end = len(pdf_reader.pages) if stop is None else min(stop, len(pdf_reader.pages))
+        end = min(end, start + max_pages)
+        for index in range(start, end):
+            yield pdf_reader.pages[index].extract_text() or ''
+
+    def count_pages(self, pdf_content: bytes) -> int:
+        """Get the number of pages in a PDF."""
+        return len(PyPDF2.PdfReader(io.BytesIO(pdf_content)).pages)
+
+    def parse_pages(self, page_texts: Iterable[str], truncated: bool = False) -> Dict[str, Any]:
+        """
+        Single pass over page texts building sections, keywords and clean text together.
+        """
+        sections: Dict[str, List[str]] = {
             'general': [],
             'experience': [],
             'education': [],
             'skills': []
         }
-        
-        lines = text.split('\n')
         current_section = 'general'
-        
-        for line in lines:
-            line = line.strip()
-            if not line:
-                continue
-                
-            # Check if line is a section header
-            section_found = self._identify_section_header(line.lower())
-            
-            if section_found:
-                # Switch to new section
-                current_section = section_found
-            else:
-                # Add line to current section
-                sections[current_section].append(line)
-        
-        # Convert lists to strings
+        pages: List[str] = []
+        clean_parts: List[str] = []
+        skill_ids: Set[int] = set()
+        ends_with_space = False
+
+        for page_text in page_texts:
+            pages.append(page_text)
+
+            for line in page_text.split('\n'):
+                line = line.strip()
+                if not line:
+                    continue
+
+                line_lower = line.lower()
+                skill_ids.update(self.taxonomy.match_ids(tokenize(line_lower), tokenize(line)))
+
+                # Check if line is a section header
+                section_found = self._identify_section_header(line_lower)
+                if section_found:
+                    current_section = section_found
+                else:
+                    sections[current_section].append(line)
+
+            # Same cleaning as get_clean_text, carrying whitespace state across page boundaries
+            collapsed = _WHITESPACE_RE.sub(' ', page_text)
+            if ends_with_space and collapsed.startswith(' '):
+                collapsed = collapsed[1:]
+            if collapsed:
+                ends_with_space = collapsed.endswith(' ')
+            clean_parts.append(_SPECIAL_CHARS_RE.sub('', collapsed))
+
         return {
-            section: '\n'.join(content).strip() 
-            for section, content in sections.items() 
-            if content
+            'full_text': ''.join(pages),
+            'structured_content': {
+                section: '\n'.join(content).strip()
+                for section, content in sections.items()
+                if content
+            },
+            'clean_text': ''.join(clean_parts).strip(),
+            'keywords': sorted(self.taxonomy.names[skill_id] for skill_id in skill_ids),
+            'page_count': len(pages),
+            'truncated': truncated,
+            'parsed_successfully': True
         }
-    
+
+    def extract_text_from_pdf(self, pdf_content: bytes) -> Dict[str, Union[str, Dict[str, str], bool]]:
+        """
+        Extract structured text from PDF content.
+
+        Args:
+            pdf_content: PDF file content as bytes
+
+        Returns:
+            Dictionary with structured resume sections
+        """
+        result = self.parse_resume(pdf_content)
+        return {
+            key: result[key]
+            for key in ('full_text', 'structured_content', 'parsed_successfully', 'error')
+            if key in result
+        }
+
     def _identify_section_header(self, line: str) -> Optional[str]:
         """Identify if a line is a section header."""
-        # Common header patterns for the main sections
-        if any(keyword in line for keyword in ['experience', 'work history', 'employment', 'work experience', 'professional experience']):
-            return 'experience'
-        elif any(keyword in line for keyword in ['education', 'academic', 'degree', 'university', 'college', 'school']):
-            return 'education'
-        elif any(keyword in line for keyword in ['skills', 'competencies', 'technologies', 'technical skills', 'programming languages']):
-            return 'skills'
-        
-        return None
-    
+        # Experience wins over education, education over skills
+        sections = {
+            self._header_sections[' '.join(match.group().split())]
+            for match in self._header_re.finditer(line)
+        }
+        if not sections:
+            return None
+        return min(sections, key=self._section_priority.__getitem__)
+
     def extract_keywords(self, text: str) -> List[str]:
-        """Extract potential keywords from resume text."""
-        # Common job-related keywords
-        keywords = []
-        
-        # Technical skills
-        tech_keywords = [
-            'python', 'javascript', 'java', 'react', 'node.js', 'sql', 'mongodb',
-            'aws', 'docker', 'kubernetes', 'git', 'agile', 'scrum', 'api',
-            'html', 'css', 'typescript', 'angular', 'vue', 'php', 'c++', 'c#',
-            'machine learning', 'ai', 'data science', 'excel', 'word', 'powerpoint'
-        ]
-        
-        # Soft skills
-        soft_skills = [
-            'leadership', 'communication', 'teamwork', 'problem solving',
-            'analytical', 'creative', 'organized', 'detail-oriented',
-            'project management', 'customer service', 'sales', 'marketing'
-        ]
-        
-        # Check for keywords in text
-        text_lower = text.lower()
-        for keyword in tech_keywords + soft_skills:
-            if keyword in text_lower:
-                keywords.append(keyword)
-        
-        return list(set(keywords))  # Remove duplicates
-    
+        """Extract canonical skill names from resume text."""
+        return self.taxonomy.extract(text)
+
     def get_clean_text(self, text: str) -> str:
         """Clean and normalize resume text."""
         # Remove extra whitespace
-        text = re.sub(r'\s+', ' ', text)
-        
+        text = _WHITESPACE_RE.sub(' ', text)
+
         # Remove special characters but keep basic punctuation
-        text = re.sub(r'[^\w\s\.\,\;\:\!\?\-\(\)]', '', text)
-        
-        # Normalize line breaks
-        text = text.replace('\n', ' ').replace('\r', ' ')
-        
+        text = _SPECIAL_CHARS_RE.sub('', text)
+
         return text.strip()
 
+    def parse_resume(self, pdf_content: bytes, max_pages: Optional[int] = None) -> Dict[str, Any]:
+        """
+        Run the full parsing pipeline: text extraction, sections, clean text and keywords.
+        """
+        if max_pages is None:
+            max_pages = MAX_PAGES
+        try:
+            pdf_reader = PyPDF2.PdfReader(io.BytesIO(pdf_content))
+            page_count = len(pdf_reader.pages)
+            page_texts = (
+                pdf_reader.pages[index].extract_text() or ''
+                for index in range(min(page_count, max_pages))
+            )
+            return self.parse_pages(page_texts, truncated=page_count > max_pages)
+        except Exception as e:
+            return {
+                'full_text': '',
+                'structured_content': {},
+                'clean_text': '',
+                'keywords': [],
+                'parsed_successfully': False,
+                'error': str(e)
+            }
+
 # Global instance
-resume_parser = ResumeParser() 
\ No newline at end of file
+resume_parser = ResumeParser()
+
+# Module-level entry points so the parse pool workers can pickle the jobs
+
+def parse_resume_bytes(pdf_content: bytes) -> Dict[str, Any]:
+    return resume_parser.parse_resume(pdf_content)
+
+def count_pdf_pages(pdf_content: bytes) -> int:
+    return resume_parser.count_pages(pdf_content)
+
+def extract_page_range(pdf_content: bytes, start: int, stop: int) -> List[str]:
+    return list(resume_parser.iter_page_texts(pdf_content, start=start, stop=stop))
+
+def analyze_page_texts(page_texts: List[str], truncated: bool) -> Dict[str, Any]:
+    return resume_parser.parse_pages(page_texts, truncated=truncated)
+
+async def parse_in_pool(pool, pdf_content: bytes) -> Dict[str, Any]:
+    """
+    Parse a PDF using worker processes from ``pool``.
+
+    Small files are parsed by a single worker. Large files have their pages
+    split into contiguous ranges extracted by all workers at once, then the
+    page texts go through the single-pass pipeline in one more job.
+
+    Each range job is sent the whole PDF and re-opens it, since PyPDF2 can't
+    read a page without the document's cross-reference table. That costs one
+    copy and one xref parse per worker, which is small next to text
+    extraction for the large files that take this path.
+    """
+    if len(pdf_content) < PARALLEL_MIN_BYTES or pool.max_workers < 2:
+        return await pool.run(parse_resume_bytes, pdf_content)
+
+    try:
+        page_count = await pool.run(count_pdf_pages, pdf_content)
+        limit = min(page_count, MAX_PAGES)
+        chunk_size = max(1, math.ceil(limit / pool.max_workers))
+        jobs = [
+            asyncio.ensure_future(pool.run(extract_page_range, pdf_content, start, min(start + chunk_size, limit)))
+            for start in range(0, limit, chunk_size)
+        ]
+        try:
+            chunks = await asyncio.gather(*jobs)
+        finally:
+            # One bad range fails the parse; don't keep the other workers busy on it
+            for job in jobs:
+                job.cancel()
+    except (PoolOverloadedError, PoolTimeoutError):
+        # The caller maps these to 503 and 422
+        raise
+    except Exception as e:
+        return {
+            'full_text': '',
+            'structured_content': {},
+            'clean_text': '',
+            'keywords': [],
+            'parsed_successfully': False,
+            'error': str(e)
+        }
+
+    page_texts = [text for chunk in chunks for text in chunk]
+    return await pool.run(analyze_page_texts, page_texts, page_count > limit)
@@ -0,0 +1,221 @@
+import time
+import random
+import asyncio
+import logging
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Any, Awaitable, Callable, Optional
+
+from utils.metrics import metrics
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling an upstream whose circuit breaker is open."""
+
+class AdaptiveTokenBucket:
+    """
+    Client-side rate limiter for an upstream with a request quota.
+
+    Tokens refill at ``rate`` per second up to ``capacity`` (the allowed
+    burst); each call takes one, waiting in FIFO order when none are left.
+    The rate adapts AIMD-style: a throttling response halves it (down to
+    ``min_rate``) and every success adds back a twentieth of ``max_rate``,
+    so the client settles just under whatever quota the upstream enforces.
+    """
+
+    def __init__(self, name: str, rate: float, capacity: float, min_rate: Optional[float] = None):
+        self.name = name
+        self.max_rate = rate
+        self.min_rate = min_rate if min_rate is not None else rate / 10
+        self.rate = rate
+        self.capacity = max(1.0, capacity)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+        self.wait_seconds = metrics.histogram(f"{name}_limiter_wait_seconds", "Time calls waited for a rate-limit token")
+        self.rate_gauge = metrics.gauge(f"{name}_limiter_rate", "Current allowed requests per second")
+        self.throttled = metrics.counter(f"{name}_throttled_total", "Throttling responses received from the upstream")
+        self.rate_gauge.set(self.rate)
+
+    def _refill(self):
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    async def acquire(self):
+        """Wait until a token is available and take it."""
+        start = time.perf_counter()
+        async with self._lock:
+            self._refill()
+            while self._tokens < 1:
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+                self._refill()
+            self._tokens -= 1
+        self.wait_seconds.observe(time.perf_counter() - start)
+
+    def on_success(self):
+        self.rate = min(self.max_rate, self.rate + self.max_rate / 20)
+        self.rate_gauge.set(self.rate)
+
+    def on_throttle(self):
+        self._refill()
+        self.rate = max(self.min_rate, self.rate / 2)
+        self._tokens = min(self._tokens, 0.0)
+        self.rate_gauge.set(self.rate)
+        self.throttled.inc()
+        logger.warning(f"Rate limiter '{self.name}' throttled; now {self.rate:.3f} req/s")
+
+class CircuitBreaker:
+    """
+    Fail fast while an upstream is degraded.
+
+    Closed: calls pass, and ``failure_threshold`` consecutive failures open
+    the circuit. Open: calls are rejected with ``CircuitOpenError`` for
+    ``recovery_timeout`` seconds. Half-open: a single probe call is let
+    through; its success closes the circuit, its failure reopens it. A probe
+    that ends any other way (cancelled, or a caller error) is released so
+    the next call probes instead.
+    """
+
+    CLOSED, OPEN, HALF_OPEN = 0, 1, 2
+    STATE_NAMES = {CLOSED: "closed", OPEN: "open", HALF_OPEN: "half_open"}
+
+    def __init__(self, name: str, failure_threshold: int = 5, recovery_timeout: float = 30.0):
+        self.name = name
+        self.failure_threshold = max(1, failure_threshold)
+        self.recovery_timeout = recovery_timeout
+        self.state = self.CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probe_in_flight = False
+
+        self.state_gauge = metrics.gauge(f"{name}_circuit_state", "Circuit breaker state (0 closed, 1 open, 2 half-open)")
+        self.opens = metrics.counter(f"{name}_circuit_opens_total", "Times the circuit opened")
+        self.rejections = metrics.counter(f"{name}_circuit_rejections_total", "Calls rejected while the circuit was open")
+
+    def _set_state(self, state: int):
+        if state != self.state:
+            logger.warning(f"Circuit '{self.name}' {self.STATE_NAMES[self.state]} -> {self.STATE_NAMES[state]}")
+        self.state = state
+        self.state_gauge.set(state)
+
+    def allow(self) -> bool:
+        """Whether a call may go upstream now (claims the probe when half-open)."""
+        if self.state == self.OPEN and time.monotonic() - self._opened_at >= self.recovery_timeout:
+            self._set_state(self.HALF_OPEN)
+            self._probe_in_flight = False
+        if self.state == self.CLOSED:
+            return True
+        if self.state == self.HALF_OPEN and not self._probe_in_flight:
+            self._probe_in_flight = True
+            return True
+        self.rejections.inc()
+        return False
+
+    def check(self):
+        """Raise ``CircuitOpenError`` unless a call may go upstream."""
+        if not self.allow():
+            raise CircuitOpenError(f"Circuit '{self.name}' is open")
+
+    def record_success(self):
+        self._failures = 0
+        self._probe_in_flight = False
+        self._set_state(self.CLOSED)
+
+    def release_probe(self):
+        """Give up the half-open probe without judging the upstream."""
+        self._probe_in_flight = False
+
+    def record_failure(self):
+        self._failures += 1
+        self._probe_in_flight = False
+        if self.state == self.HALF_OPEN or self._failures >= self.failure_threshold:
+            self._opened_at = time.monotonic()
+            if self.state != self.OPEN:
+                self.opens.inc()
+            self._set_state(self.OPEN)
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Seconds to wait from a ``Retry-After`` header (delta-seconds or HTTP-date)."""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        when = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if when.tzinfo is None:
+        when = when.replace(tzinfo=timezone.utc)
+    return max(0.0, (when - datetime.now(timezone.utc)).total_seconds())
+
+class RetryPolicy:
+    """
+    Bounded retries with full-jitter exponential backoff.
+
+    A server-provided ``Retry-After`` replaces the computed delay; if it is
+    longer than ``max_retry_after`` the call is not retried at all, since
+    waiting that long is worse than failing over to a fallback.
+    """
+
+    def __init__(self, max_attempts: int = 3, base_delay: float = 0.5, max_delay: float = 8.0, max_retry_after: float = 20.0):
+        self.max_attempts = max(1, max_attempts)
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.max_retry_after = max_retry_after
+
+    def delay(self, attempt: int, retry_after: Optional[float] = None) -> Optional[float]:
+        """Seconds to wait before retry number ``attempt`` (0-based), or None to give up."""
+        if attempt + 1 >= self.max_attempts:
+            return None
+        if retry_after is not None:
+            return retry_after if retry_after <= self.max_retry_after else None
+        return random.uniform(0, min(self.max_delay, self.base_delay * (2 ** attempt)))
+
+async def call_with_resilience(
+    call: Callable[[], Awaitable[Any]],
+    limiter: AdaptiveTokenBucket,
+    breaker: CircuitBreaker,
+    retry: RetryPolicy,
+    is_retryable: Callable[[Exception], bool],
+    is_throttle: Callable[[Exception], bool],
+    retry_after: Callable[[Exception], Optional[float]],
+    retries_counter=None
+) -> Any:
+    """
+    Run ``call`` through the circuit breaker and rate limiter, retrying
+    retryable failures per ``retry``. Non-retryable errors (e.g. a 400) are
+    the caller's fault: they neither count against the breaker nor close it.
+    """
+    attempt = 0
+    while True:
+        breaker.check()
+        try:
+            await limiter.acquire()
+            result = await call()
+        except Exception as e:
+            if not is_retryable(e):
+                raise
+            breaker.record_failure()
+            if is_throttle(e):
+                limiter.on_throttle()
+            delay = retry.delay(attempt, retry_after(e))
+            if delay is None or breaker.state == CircuitBreaker.OPEN:
+                raise
+            if retries_counter is not None:
+                retries_counter.inc()
+            logger.info(f"Retrying after {type(e).__name__} in {delay:.2f}s (attempt {attempt + 2}/{retry.max_attempts})")
+            await asyncio.sleep(delay)
+            attempt += 1
+            continue
+        finally:
+            # Also on cancellation, so a half-open circuit is never left waiting on a dead probe
+            breaker.release_probe()
+        breaker.record_success()
+        limiter.on_success()
+        return result
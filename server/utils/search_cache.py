@@ -0,0 +1,152 @@
+import os
+import json
+import asyncio
+import hashlib
+import logging
+from datetime import datetime, timedelta
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set
+from dotenv import load_dotenv
+
+from utils.metrics import metrics
+from utils.single_flight import SingleFlight
+from utils.tiered_cache import TieredCache
+
+# Load environment variables
+load_dotenv()
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+class JobSearchCache(TieredCache):
+    """
+    Two-tier cache of job search results keyed by the normalized search
+    parameters, with stale-while-revalidate and single-flight coalescing.
+
+    An entry is fresh for ``ttl_seconds``; for ``stale_seconds`` after that it
+    is still served immediately while one background call refreshes it, so
+    only a search nobody has run within the whole window waits on the API.
+    Concurrent misses for the same key share one upstream call through
+    ``SingleFlight``, like LLMCache. The Mongo tier lets workers and
+    restarts share warm entries.
+    Entries remember whether a user search or the harvester fetched them,
+    so hits on pre-fetched entries are counted as served warm.
+    """
+
+    timestamp_field = "updated_at"
+
+    def __init__(self, max_entries: int = 256, ttl_seconds: int = 900, stale_seconds: int = 3600, collection_name: str = "job_search_cache"):
+        super().__init__("Job search cache", max_entries, collection_name)
+        self.ttl_seconds = ttl_seconds
+        self.stale_seconds = stale_seconds
+        self._flights = SingleFlight()
+        self._refreshes: Set[asyncio.Task] = set()
+
+        self.hits = metrics.counter("job_search_cache_hits_total", "Searches served fresh from the cache")
+        self.stale_hits = metrics.counter("job_search_cache_stale_hits_total", "Searches served stale while a refresh ran")
+        self.misses = metrics.counter("job_search_cache_misses_total", "Searches that waited on the JSearch API")
+        self.coalesced = metrics.counter("job_search_cache_coalesced_total", "Searches that joined an identical in-flight call")
+        self.refresh_failures = metrics.counter("job_search_cache_refresh_failures_total", "Background refreshes that failed")
+        self.hit_ratio = metrics.gauge("job_search_cache_hit_ratio", "Share of searches not waiting on the API")
+        self.warm_hits = metrics.counter("job_search_cache_warm_hits_total", "Searches served from entries the harvester pre-fetched")
+        self.warm_ratio = metrics.gauge("job_search_cache_warm_ratio", "Share of searches served from harvested entries")
+
+    async def ensure_indexes(self, db):
+        await db[self.collection_name].create_index("expires_at", expireAfterSeconds=0)
+
+    @staticmethod
+    def make_key(query: str, page: int, num_pages: int, country: str, date_posted: str) -> str:
+        """
+        Hash of the search parameters, normalized so that searches differing
+        only in case or spacing share an entry.
+        """
+        params = {
+            "query": " ".join(query.lower().split()),
+            "page": int(page),
+            "num_pages": int(num_pages),
+            "country": country.strip().lower(),
+            "date_posted": date_posted.strip().lower()
+        }
+        return hashlib.sha256(json.dumps(params, sort_keys=True, separators=(",", ":")).encode("utf-8")).hexdigest()
+
+    def _update_ratio(self):
+        served = self.hits.value + self.stale_hits.value + self.coalesced.value
+        total = served + self.misses.value
+        self.hit_ratio.set(round(served / total, 4) if total else 0.0)
+        self.warm_ratio.set(round(self.warm_hits.value / total, 4) if total else 0.0)
+
+    async def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """Entry for ``key`` still inside its stale window, from memory or Mongo."""
+        entry, _ = await self._load(key)
+        return entry
+
+    async def contains(self, keys: List[str]) -> bool:
+        """Whether every key has an entry still inside its stale window."""
+        for key in keys:
+            if await self.get(key) is None:
+                return False
+        return True
+
+    async def put(self, key: str, results: List[Dict[str, Any]], origin: str = "search"):
+        """Store fresh results in both tiers; ``origin`` is "search" or "harvest"."""
+        now = datetime.utcnow()
+        await self._store(key, {
+            "results": results,
+            "origin": origin,
+            "fresh_until": now + timedelta(seconds=self.ttl_seconds),
+            "expires_at": now + timedelta(seconds=self.ttl_seconds + self.stale_seconds)
+        })
+
+    async def _fetch(self, key: str, fetch: Callable[[], Awaitable[List[Dict[str, Any]]]]) -> List[Dict[str, Any]]:
+        results = await fetch()
+        await self.put(key, results)
+        return results
+
+    async def _revalidate(self, key: str, fetch: Callable[[], Awaitable[List[Dict[str, Any]]]]):
+        try:
+            await self._flights.do(key, lambda: self._fetch(key, fetch))
+        except Exception as e:
+            # The stale entry keeps being served until it expires
+            self.refresh_failures.inc()
+            logger.warning(f"Job search refresh failed: {e}")
+
+    def _refresh(self, key: str, fetch: Callable[[], Awaitable[List[Dict[str, Any]]]]):
+        if key in self._flights:
+            return
+        task = asyncio.create_task(self._revalidate(key, fetch))
+        self._refreshes.add(task)
+        task.add_done_callback(self._refreshes.discard)
+
+    async def get_or_fetch(self, key: str, fetch: Callable[[], Awaitable[List[Dict[str, Any]]]]) -> List[Dict[str, Any]]:
+        """
+        Return cached results for ``key``, refreshing them in the background
+        once stale, or run ``fetch`` on a miss. Failures are not cached.
+        """
+        entry = await self.get(key)
+        if entry is not None:
+            if entry["fresh_until"] > datetime.utcnow():
+                self.hits.inc()
+            else:
+                self.stale_hits.inc()
+                self._refresh(key, fetch)
+            if entry.get("origin") == "harvest":
+                self.warm_hits.inc()
+            self._update_ratio()
+            return entry["results"]
+
+        async def fetch_as_miss() -> List[Dict[str, Any]]:
+            self.misses.inc()
+            self._update_ratio()
+            return await self._fetch(key, fetch)
+
+        results, shared = await self._flights.do(key, fetch_as_miss)
+        if shared:
+            self.coalesced.inc()
+            self._update_ratio()
+        return results
+
+# Global instance
+job_search_cache = JobSearchCache(
+    max_entries=int(os.getenv("JOB_SEARCH_CACHE_SIZE", "256")),
+    ttl_seconds=int(os.getenv("JOB_SEARCH_CACHE_TTL_SECONDS", "900")),
+    stale_seconds=int(os.getenv("JOB_SEARCH_STALE_SECONDS", "3600"))
+)
@@ -0,0 +1,56 @@
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Tuple
+
+class _LeaderCancelled(Exception):
+    """The caller running a coalesced call was cancelled."""
+
+class SingleFlight:
+    """
+    Coalesces concurrent calls for the same key into one.
+
+    The first caller for a key (the leader) runs the call; callers arriving
+    while it runs await its result, or re-raise its exception. If the leader
+    is cancelled (e.g. its client disconnected), only it is: the waiters
+    wake and the first of them takes over the call.
+    """
+
+    def __init__(self):
+        self._inflight: Dict[str, asyncio.Future] = {}
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._inflight
+
+    async def do(self, key: str, call: Callable[[], Awaitable[Any]]) -> Tuple[Any, bool]:
+        """
+        Run ``call`` for ``key``, or join the call already running for it.
+        Returns ``(result, shared)``, where ``shared`` is True if another
+        caller's call produced the result.
+        """
+        while True:
+            inflight = self._inflight.get(key)
+            if inflight is None:
+                break
+            try:
+                return await asyncio.shield(inflight), True
+            except _LeaderCancelled:
+                # Nobody is running the call any more; the first waiter to get here takes over
+                continue
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            result = await call()
+            future.set_result(result)
+        except asyncio.CancelledError:
+            # Only this caller is cancelled; wake the waiters so one of them retries
+            future.set_exception(_LeaderCancelled())
+            future.exception()
+            raise
+        except BaseException as e:
+            future.set_exception(e)
+            # Waiters re-raise it; don't warn about an unretrieved exception when there are none
+            future.exception()
+            raise
+        finally:
+            self._inflight.pop(key, None)
+        return result, False
@@ -0,0 +1,147 @@
+import os
+import sys
+import glob
+import json
+import hashlib
+import logging
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+from dotenv import load_dotenv
+
+from utils.text_matcher import KeywordAutomaton, tokenize
+
+# Load environment variables
+load_dotenv()
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+# Directory of taxonomy JSON files (or a list of files/directories separated by os.pathsep)
+TAXONOMY_PATH = os.getenv(
+    "SKILLS_TAXONOMY_PATH",
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data", "taxonomy")
+)
+
+class SkillsTaxonomy:
+    """
+    Canonical skills with synonyms, abbreviations and occupation tags.
+
+    Every skill gets an integer id; names and occupation tags are interned
+    tuples indexed by that id, and all surface forms compile into two
+    automata mapping straight to ids:
+
+    - names and synonyms, matched case-insensitively on lowercased text
+    - abbreviations ("RN", "AI", "GD&T"), matched case-sensitively so short
+      forms don't fire on ordinary words
+
+    ``version`` changes whenever any source file's version changes, so it can
+    be folded into cache keys of anything derived from extraction results.
+    """
+
+    def __init__(self, sources: Iterable[Tuple[str, Dict]]):
+        names: List[str] = []
+        occupations: List[Set[str]] = []
+        ids: Dict[str, int] = {}
+        phrases: Dict[str, int] = {}
+        abbreviations: Dict[str, int] = {}
+        versions = []
+
+        for source_name, data in sources:
+            versions.append(f"{source_name}@{data.get('version', '0')}")
+            for entry in data.get("skills", []):
+                name = sys.intern(entry["name"].strip().lower())
+                skill_id = ids.get(name)
+                if skill_id is None:
+                    skill_id = len(names)
+                    ids[name] = skill_id
+                    names.append(name)
+                    occupations.append(set())
+                occupations[skill_id].update(sys.intern(tag) for tag in entry.get("occupations", []))
+
+                for phrase in [name] + entry.get("synonyms", []):
+                    self._register(phrases, " ".join(tokenize(phrase.lower())), skill_id, names, source_name)
+                for abbreviation in entry.get("abbreviations", []):
+                    self._register(abbreviations, " ".join(tokenize(abbreviation)), skill_id, names, source_name)
+
+        self.names: Tuple[str, ...] = tuple(names)
+        self.occupations: Tuple[Tuple[str, ...], ...] = tuple(tuple(sorted(tags)) for tags in occupations)
+        self.sources = tuple(versions)
+        self.version = hashlib.sha256("|".join(sorted(versions)).encode()).hexdigest()[:12]
+        self._name_ids = ids
+        self._phrases = phrases
+        self._abbreviations = abbreviations
+        self._phrase_matcher = KeywordAutomaton(phrases.items())
+        self._abbreviation_matcher = KeywordAutomaton(abbreviations.items())
+
+    @staticmethod
+    def _register(table: Dict[str, int], form: str, skill_id: int, names: List[str], source_name: str):
+        if not form:
+            return
+        existing = table.get(form)
+        if existing is not None and existing != skill_id:
+            logger.warning(f"Skill taxonomy '{source_name}': '{form}' already maps to '{names[existing]}'")
+            return
+        table[form] = skill_id
+
+    @classmethod
+    def load(cls, path: str = TAXONOMY_PATH) -> "SkillsTaxonomy":
+        """Load every taxonomy JSON file found in ``path``."""
+        files: List[str] = []
+        for entry in path.split(os.pathsep):
+            if os.path.isdir(entry):
+                files.extend(sorted(glob.glob(os.path.join(entry, "*.json"))))
+            elif entry:
+                files.append(entry)
+
+        sources = []
+        for file_path in files:
+            with open(file_path, encoding="utf-8") as f:
+                sources.append((os.path.splitext(os.path.basename(file_path))[0], json.load(f)))
+
+        taxonomy = cls(sources)
+        logger.info(f"Loaded skills taxonomy {taxonomy.version} with {len(taxonomy)} skills from {len(files)} file(s)")
+        return taxonomy
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def match_spans(self, tokens_lower: List[str], tokens: Optional[List[str]] = None) -> List[Tuple[int, int, int]]:
+        """
+        Get ``(start, end, skill_id)`` token spans in pre-tokenized text.
+
+        ``tokens_lower`` is matched against names and synonyms; ``tokens``
+        (original case) against abbreviations, when given.
+        """
+        spans = list(self._phrase_matcher.iter_tokens(tokens_lower))
+        if tokens is not None:
+            spans.extend(self._abbreviation_matcher.iter_tokens(tokens))
+        return spans
+
+    def match_ids(self, tokens_lower: List[str], tokens: Optional[List[str]] = None) -> Set[int]:
+        """Get skill ids found in pre-tokenized text (lowercased tokens, plus original-case tokens for abbreviations)."""
+        return {skill_id for _, _, skill_id in self.match_spans(tokens_lower, tokens)}
+
+    def extract_ids(self, text: str) -> Set[int]:
+        """Get the ids of every skill mentioned in ``text``."""
+        return self.match_ids(tokenize(text.lower()), tokenize(text))
+
+    def extract(self, text: str) -> List[str]:
+        """Get the canonical names of every skill mentioned in ``text``."""
+        return sorted(self.names[skill_id] for skill_id in self.extract_ids(text))
+
+    def id_of(self, name: str) -> Optional[int]:
+        """Get the id of a canonical skill name."""
+        return self._name_ids.get(name)
+
+    def normalize(self, term: str) -> Optional[str]:
+        """Map a skill name, synonym or abbreviation to its canonical name."""
+        skill_id = self._phrases.get(" ".join(tokenize(term.lower())))
+        if skill_id is None:
+            skill_id = self._abbreviations.get(" ".join(tokenize(term)))
+        return self.names[skill_id] if skill_id is not None else None
+
+    def skills_for_occupation(self, occupation: str) -> List[str]:
+        """Get the canonical names of all skills tagged with ``occupation``."""
+        return [name for name, tags in zip(self.names, self.occupations) if occupation in tags]
+
+# Global instance
+skills_taxonomy = SkillsTaxonomy.load()
@@ -0,0 +1,84 @@
+import re
+from collections import deque
+from typing import Any, Dict, Iterable, Iterator, List, Set, Tuple
+
+# Words and single punctuation characters; "node.js" -> ["node", ".", "js"]
+_TOKEN_RE = re.compile(r"\w+|[^\w\s]")
+
+def tokenize(text: str) -> List[str]:
+    """Split text into the tokens the automaton runs over."""
+    return _TOKEN_RE.findall(text)
+
+class KeywordAutomaton:
+    """
+    Aho–Corasick automaton matching many phrases in a single pass over the text.
+
+    The automaton runs over word tokens rather than characters, so matches are
+    always word-boundary aligned (``ai`` never matches inside ``maintain``) and
+    multi-word phrases match across any run of whitespace, including line breaks.
+    Punctuation is kept as single-character tokens, so ``c++`` and ``node.js``
+    work as patterns. Matching is case-sensitive; lowercase both the patterns
+    and the text for case-insensitive matching.
+    """
+
+    def __init__(self, patterns: Iterable[Tuple[str, Any]]):
+        # Per state: token transitions, failure link and (token length, value) outputs
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._outputs: List[List[Tuple[int, Any]]] = [[]]
+        self.pattern_count = 0
+
+        for pattern, value in patterns:
+            self._add(tokenize(pattern), value)
+        self._build()
+
+    def _add(self, tokens: List[str], value: Any):
+        if not tokens:
+            return
+        state = 0
+        for token in tokens:
+            next_state = self._goto[state].get(token)
+            if next_state is None:
+                next_state = len(self._goto)
+                self._goto[state][token] = next_state
+                self._goto.append({})
+                self._fail.append(0)
+                self._outputs.append([])
+            state = next_state
+        self._outputs[state].append((len(tokens), value))
+        self.pattern_count += 1
+
+    def _build(self):
+        """Compute failure links breadth-first and merge inherited outputs."""
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for token, next_state in self._goto[state].items():
+                queue.append(next_state)
+                fallback = self._fail[state]
+                while fallback and token not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                self._fail[next_state] = self._goto[fallback].get(token, 0)
+                self._outputs[next_state] = self._outputs[next_state] + self._outputs[self._fail[next_state]]
+
+    def iter_tokens(self, tokens: List[str]) -> Iterator[Tuple[int, int, Any]]:
+        """Yield ``(start, end, value)`` token spans for every match in ``tokens``."""
+        goto = self._goto
+        fail = self._fail
+        outputs = self._outputs
+        state = 0
+
+        for index, token in enumerate(tokens):
+            while state and token not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(token, 0)
+            for length, value in outputs[state]:
+                yield index + 1 - length, index + 1, value
+
+    def iter_matches(self, text: str) -> Iterator[Tuple[int, int, Any]]:
+        """Yield ``(start, end, value)`` token spans for every match in ``text``."""
+        return self.iter_tokens(tokenize(text))
+
+    def find_all(self, text: str) -> Set[Any]:
+        """Get the set of values whose patterns occur in ``text``."""
+        return {value for _, _, value in self.iter_tokens(tokenize(text))}
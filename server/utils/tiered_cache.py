@@ -0,0 +1,85 @@
+import logging
+from collections import OrderedDict
+from datetime import datetime
+from typing import Any, Dict, Optional, Tuple
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+class TieredCache:
+    """
+    Base for the two-tier caches: an in-memory LRU of ``max_entries`` in
+    front of a Mongo collection shared by every API node and restart.
+
+    Entries are dicts stored as the Mongo document (plus ``_id`` and a
+    ``timestamp_field``); one with an ``expires_at`` is ignored once that
+    has passed, in both tiers, even before the TTL monitor removes it.
+    Mongo errors are logged and treated as misses, so the cache never
+    fails a request.
+    """
+
+    # Written on every put; subclasses expire documents by it or by "expires_at"
+    timestamp_field = "created_at"
+
+    def __init__(self, label: str, max_entries: int, collection_name: str):
+        self.label = label
+        self.max_entries = max_entries
+        self.collection_name = collection_name
+        self.db = None
+        self._entries: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+
+    def attach(self, db):
+        """Use ``db`` for the persistent tier (memory-only until attached)."""
+        self.db = db
+
+    def _remember(self, key: str, entry: Dict[str, Any]):
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    @staticmethod
+    def _expired(entry: Dict[str, Any], now: datetime) -> bool:
+        expires_at = entry.get("expires_at")
+        return expires_at is not None and expires_at <= now
+
+    async def _load(self, key: str, db=None) -> Tuple[Optional[Dict[str, Any]], Optional[str]]:
+        """The entry for ``key`` and the tier it came from ("memory" or "mongo"), or ``(None, None)``."""
+        now = datetime.utcnow()
+        entry = self._entries.get(key)
+        if entry is not None:
+            if not self._expired(entry, now):
+                self._entries.move_to_end(key)
+                return entry, "memory"
+            del self._entries[key]
+
+        db = self.db if db is None else db
+        if db is None:
+            return None, None
+        try:
+            doc = await db[self.collection_name].find_one({"_id": key})
+        except Exception as e:
+            logger.warning(f"{self.label} lookup failed: {e}")
+            return None, None
+        if not doc:
+            return None, None
+        entry = {field: value for field, value in doc.items() if field not in ("_id", self.timestamp_field)}
+        if self._expired(entry, now):
+            return None, None
+        self._remember(key, entry)
+        return entry, "mongo"
+
+    async def _store(self, key: str, entry: Dict[str, Any], db=None):
+        """Store ``entry`` in both tiers."""
+        self._remember(key, entry)
+        db = self.db if db is None else db
+        if db is None:
+            return
+        try:
+            await db[self.collection_name].replace_one(
+                {"_id": key},
+                {"_id": key, **entry, self.timestamp_field: datetime.utcnow()},
+                upsert=True
+            )
+        except Exception as e:
+            logger.warning(f"{self.label} write failed: {e}")
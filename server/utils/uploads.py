@@ -0,0 +1,179 @@
+import os
+import asyncio
+import hashlib
+import logging
+import tempfile
+from typing import Dict, List, Optional
+from fastapi import HTTPException, Request, status
+from multipart.exceptions import MultipartParseError
+from multipart.multipart import MultipartParser, parse_options_header
+
+from utils.metrics import metrics
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+# Room for the multipart boundaries and part headers around the file itself
+MULTIPART_OVERHEAD = 16 * 1024
+# Cap on each text field read alongside the file
+MAX_FORM_FIELD_BYTES = int(os.getenv("MAX_FORM_FIELD_BYTES", str(64 * 1024)))
+
+upload_bytes = metrics.counter("upload_bytes_total", "File bytes received by streaming uploads")
+uploads_rejected = metrics.counter("upload_rejected_total", "Uploads rejected for size, type or malformed bodies")
+
+class ReceivedFile:
+    """A file spooled to disk by ``receive_file``, with its SHA-256, size and any requested text fields."""
+
+    def __init__(self, filename: str, path: str, sha256: str, size: int, fields: Optional[Dict[str, str]] = None):
+        self.filename = filename
+        self.path = path
+        self.sha256 = sha256
+        self.size = size
+        self.fields = fields or {}
+
+    def read(self) -> bytes:
+        with open(self.path, "rb") as f:
+            return f.read()
+
+    def discard(self):
+        try:
+            os.unlink(self.path)
+        except FileNotFoundError:
+            pass
+
+def _reject(status_code: int, detail: str):
+    uploads_rejected.inc()
+    raise HTTPException(status_code=status_code, detail=detail)
+
+async def receive_file(
+    request: Request,
+    field: str,
+    max_bytes: int,
+    spool_dir: str,
+    allowed_suffixes: tuple = (),
+    magic: Optional[bytes] = None,
+    fields: tuple = ()
+) -> ReceivedFile:
+    """
+    Stream one file field of a multipart request to a temporary file in
+    ``spool_dir``, hashing it on the way.
+
+    The request body is parsed as it arrives instead of being buffered, so
+    memory use is one network chunk regardless of upload size. The upload is
+    rejected as soon as it exceeds ``max_bytes`` (or declares a larger
+    Content-Length), its filename lacks an allowed suffix, or its first
+    bytes don't start with ``magic``. Text fields named in ``fields`` are
+    collected into ``ReceivedFile.fields`` (each capped at
+    ``MAX_FORM_FIELD_BYTES``); other form fields are ignored. The caller
+    owns the returned file and must move or ``discard`` it.
+    """
+    content_type, params = parse_options_header(request.headers.get("content-type", ""))
+    if content_type != b"multipart/form-data" or b"boundary" not in params:
+        _reject(status.HTTP_400_BAD_REQUEST, "Expected a multipart/form-data upload")
+
+    too_large = f"File size must be less than {max_bytes // (1024 * 1024)}MB"
+    wrong_type = f"Only {', '.join(suffix.lstrip('.').upper() for suffix in allowed_suffixes)} files are allowed"
+    declared = request.headers.get("content-length")
+    budget = max_bytes + MULTIPART_OVERHEAD + MAX_FORM_FIELD_BYTES * len(fields)
+    if declared and declared.isdigit() and int(declared) > budget:
+        _reject(status.HTTP_413_REQUEST_ENTITY_TOO_LARGE, too_large)
+
+    os.makedirs(spool_dir, exist_ok=True)
+    fd, path = tempfile.mkstemp(dir=spool_dir, prefix="bridgeai_upload_")
+    spool = os.fdopen(fd, "wb")
+    digest = hashlib.sha256()
+    state = {"header_field": b"", "header_value": b"", "disposition": b"", "in_file": False, "done": False, "field": None}
+    filename = None
+    size = 0
+    pending: List[bytes] = []
+    field_data: Dict[str, bytearray] = {}
+
+    def on_part_begin():
+        state["disposition"] = b""
+
+    def on_header_field(data, start, end):
+        state["header_field"] += data[start:end]
+
+    def on_header_value(data, start, end):
+        state["header_value"] += data[start:end]
+
+    def on_header_end():
+        if state["header_field"].lower() == b"content-disposition":
+            state["disposition"] = state["header_value"]
+        state["header_field"] = b""
+        state["header_value"] = b""
+
+    def on_headers_finished():
+        nonlocal filename
+        _, options = parse_options_header(state["disposition"])
+        name = options.get(b"name", b"").decode("utf-8", "replace")
+        # Only the first matching part is read
+        state["in_file"] = name == field and not state["done"] and b"filename" in options
+        if state["in_file"]:
+            filename = os.path.basename(options[b"filename"].decode("utf-8", "replace"))
+        elif name in fields and name not in field_data and b"filename" not in options:
+            state["field"] = name
+            field_data[name] = bytearray()
+
+    def on_part_data(data, start, end):
+        if state["in_file"]:
+            pending.append(data[start:end])
+        elif state["field"] is not None:
+            value = field_data[state["field"]]
+            value += data[start:end]
+            if len(value) > MAX_FORM_FIELD_BYTES:
+                _reject(status.HTTP_413_REQUEST_ENTITY_TOO_LARGE, f"Form field '{state['field']}' is too large")
+
+    def on_part_end():
+        if state["in_file"]:
+            state["in_file"] = False
+            state["done"] = True
+        state["field"] = None
+
+    parser = MultipartParser(params[b"boundary"], {
+        "on_part_begin": on_part_begin,
+        "on_header_field": on_header_field,
+        "on_header_value": on_header_value,
+        "on_header_end": on_header_end,
+        "on_headers_finished": on_headers_finished,
+        "on_part_data": on_part_data,
+        "on_part_end": on_part_end
+    })
+
+    try:
+        async for chunk in request.stream():
+            try:
+                parser.write(chunk)
+            except MultipartParseError:
+                _reject(status.HTTP_400_BAD_REQUEST, "Malformed multipart body")
+            # Reject by name before any of the file is written
+            if filename is not None and size == 0 and allowed_suffixes and not filename.lower().endswith(allowed_suffixes):
+                _reject(status.HTTP_400_BAD_REQUEST, wrong_type)
+            if not pending:
+                continue
+            data = b"".join(pending)
+            pending.clear()
+            if size == 0 and magic and not data.startswith(magic[:len(data)]):
+                _reject(status.HTTP_400_BAD_REQUEST, "File content does not match its type")
+            size += len(data)
+            if size > max_bytes:
+                _reject(status.HTTP_413_REQUEST_ENTITY_TOO_LARGE, too_large)
+            digest.update(data)
+            await asyncio.to_thread(spool.write, data)
+        parser.finalize()
+        spool.close()
+
+        if filename is None or not state["done"]:
+            _reject(status.HTTP_400_BAD_REQUEST, f"Missing file field '{field}'")
+        if allowed_suffixes and not filename.lower().endswith(allowed_suffixes):
+            _reject(status.HTTP_400_BAD_REQUEST, wrong_type)
+        upload_bytes.inc(size)
+        values = {name: bytes(value).decode("utf-8", "replace") for name, value in field_data.items()}
+        return ReceivedFile(filename, path, digest.hexdigest(), size, values)
+    except BaseException:
+        spool.close()
+        try:
+            os.unlink(path)
+        except FileNotFoundError:
+            pass
+        raise
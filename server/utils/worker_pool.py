@@ -0,0 +1,201 @@
+import os
+import time
+import signal
+import asyncio
+import logging
+import importlib
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, Optional, Sequence
+from dotenv import load_dotenv
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+from utils.metrics import metrics
+
+# Load environment variables
+load_dotenv()
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+class PoolOverloadedError(Exception):
+    """Raised when the pool queue is full and a job cannot be accepted."""
+
+class PoolTimeoutError(Exception):
+    """Raised when a job does not finish within its time budget."""
+
+class JobTimeout(Exception):
+    """Raised inside a worker process when the job's alarm fires."""
+
+def _init_worker(memory_limit_bytes: int, warmup_modules: Sequence[str]):
+    """Worker initializer: apply the memory limit and pre-import heavy modules."""
+    if memory_limit_bytes and resource is not None:
+        try:
+            resource.setrlimit(resource.RLIMIT_AS, (memory_limit_bytes, memory_limit_bytes))
+        except (ValueError, OSError) as e:
+            logger.warning(f"Could not set worker memory limit: {e}")
+
+    for module_name in warmup_modules:
+        importlib.import_module(module_name)
+
+def _on_alarm(signum, frame):
+    raise JobTimeout("Job exceeded its time limit")
+
+def _run_job(fn: Callable[..., Any], timeout: float, args: tuple) -> Any:
+    """Run a job inside a worker, aborting it with SIGALRM once the timeout elapses."""
+    use_alarm = timeout > 0 and hasattr(signal, "setitimer")
+    if use_alarm:
+        signal.signal(signal.SIGALRM, _on_alarm)
+        signal.setitimer(signal.ITIMER_REAL, timeout)
+    try:
+        return fn(*args)
+    finally:
+        if use_alarm:
+            signal.setitimer(signal.ITIMER_REAL, 0)
+
+def _ping(delay: float) -> int:
+    """No-op job used to spawn and warm every worker process."""
+    time.sleep(delay)
+    return os.getpid()
+
+class ProcessWorkerPool:
+    """
+    Bounded process pool for CPU-bound jobs that must not run on the event loop.
+
+    Jobs are rejected once ``max_queue`` jobs are pending, aborted inside the
+    worker after ``timeout`` seconds, and the whole pool is recycled if a worker
+    stops responding or dies (e.g. by hitting the memory limit).
+    """
+
+    def __init__(
+        self,
+        name: str,
+        max_workers: int,
+        max_queue: int,
+        timeout: float,
+        memory_limit_mb: int = 0,
+        warmup_modules: Sequence[str] = ()
+    ):
+        self.name = name
+        self.max_workers = max(1, max_workers)
+        self.max_queue = max(self.max_workers, max_queue)
+        self.timeout = timeout
+        self.memory_limit_bytes = memory_limit_mb * 1024 * 1024
+        self.warmup_modules = tuple(warmup_modules)
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._pending = 0
+
+        self.queue_depth = metrics.gauge(f"{name}_queue_depth", "Jobs submitted but not yet finished")
+        self.job_seconds = metrics.histogram(f"{name}_job_seconds", "Job latency including queue wait")
+        self.rejected = metrics.counter(f"{name}_rejected_total", "Jobs rejected because the queue was full")
+        self.timeouts = metrics.counter(f"{name}_timeouts_total", "Jobs aborted for exceeding the timeout")
+        self.recycles = metrics.counter(f"{name}_recycles_total", "Times the worker processes were replaced")
+
+    def _create_executor(self) -> ProcessPoolExecutor:
+        return ProcessPoolExecutor(
+            max_workers=self.max_workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_worker,
+            initargs=(self.memory_limit_bytes, self.warmup_modules)
+        )
+
+    async def start(self):
+        """Spawn the worker processes and wait until each one has warmed up."""
+        if self._executor is not None:
+            return
+        self._executor = self._create_executor()
+        loop = asyncio.get_running_loop()
+        # Keep every worker busy briefly so all of them get spawned and initialized
+        pings = [loop.run_in_executor(self._executor, _ping, 0.2) for _ in range(self.max_workers)]
+        pids = await asyncio.gather(*pings, return_exceptions=True)
+        warm = {pid for pid in pids if isinstance(pid, int)}
+        logger.info(f"Worker pool '{self.name}' started with {len(warm)} warm worker(s)")
+
+    def shutdown(self):
+        """Stop the pool, cancelling queued jobs."""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+            logger.info(f"Worker pool '{self.name}' stopped")
+
+    def _recycle(self, executor: Optional[ProcessPoolExecutor]):
+        """Replace the worker processes, killing any that are stuck."""
+        if executor is not self._executor:
+            # Another job already replaced this executor
+            return
+        self._executor = self._create_executor()
+        self.recycles.inc()
+        if executor is not None:
+            processes = list(getattr(executor, "_processes", {}).values())
+            executor.shutdown(wait=False, cancel_futures=True)
+            for process in processes:
+                if process.is_alive():
+                    process.terminate()
+        logger.warning(f"Worker pool '{self.name}' recycled")
+
+    @property
+    def pending(self) -> int:
+        return self._pending
+
+    async def run(self, fn: Callable[..., Any], *args: Any, timeout: Optional[float] = None) -> Any:
+        """
+        Run ``fn(*args)`` in a worker process.
+
+        ``fn`` and its arguments must be picklable. Cancelling the awaiting task
+        cancels the job if it has not started yet.
+        """
+        if self._pending >= self.max_queue:
+            self.rejected.inc()
+            raise PoolOverloadedError(f"Worker pool '{self.name}' is at capacity")
+        if self._executor is None:
+            await self.start()
+
+        job_timeout = self.timeout if timeout is None else timeout
+        loop = asyncio.get_running_loop()
+        executor = self._executor
+        self._pending += 1
+        self.queue_depth.set(self._pending)
+        start = time.perf_counter()
+        try:
+            future = loop.run_in_executor(executor, _run_job, fn, job_timeout, args)
+            # The in-worker alarm normally fires first; this is the safety net for hung workers
+            guard = job_timeout + 5 if job_timeout > 0 else None
+            return await asyncio.wait_for(future, guard)
+        except JobTimeout:
+            self.timeouts.inc()
+            raise PoolTimeoutError(f"Job exceeded {job_timeout}s")
+        except asyncio.TimeoutError:
+            self.timeouts.inc()
+            self._recycle(executor)
+            raise PoolTimeoutError(f"Job exceeded {job_timeout}s and its worker was restarted")
+        except BrokenProcessPool:
+            self._recycle(executor)
+            raise
+        finally:
+            self._pending -= 1
+            self.queue_depth.set(self._pending)
+            self.job_seconds.observe(time.perf_counter() - start)
+
+# Global instances
+parse_pool = ProcessWorkerPool(
+    name="pdf_parse",
+    max_workers=int(os.getenv("PARSE_POOL_SIZE", str(min(2, os.cpu_count() or 1)))),
+    max_queue=int(os.getenv("PARSE_POOL_MAX_QUEUE", "16")),
+    timeout=float(os.getenv("PARSE_TIMEOUT_SECONDS", "20")),
+    memory_limit_mb=int(os.getenv("PARSE_MEMORY_LIMIT_MB", "512")),
+    warmup_modules=("utils.pdf_parser", "utils.ats_engine")
+)
+
+render_pool = ProcessWorkerPool(
+    name="pdf_render",
+    max_workers=int(os.getenv("RENDER_POOL_SIZE", str(min(2, os.cpu_count() or 1)))),
+    max_queue=int(os.getenv("RENDER_POOL_MAX_QUEUE", "32")),
+    timeout=float(os.getenv("RENDER_TIMEOUT_SECONDS", "20")),
+    memory_limit_mb=int(os.getenv("RENDER_MEMORY_LIMIT_MB", "512")),
+    warmup_modules=("utils.pdf_editor",)
+)